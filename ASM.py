@@ -9,16 +9,17 @@ class Context:
         # data for write methods
         self.__data_size = None
 
+    # the parts of a string are joined once it is popped, adding them
+    # to one string copies it again for every line of the program
     def push_string(self):
-        string = ""
-        self.__strings.append(string)
+        self.__strings.append([])
 
     def pop_string(self):
-        last_string = self.__strings.pop()
+        last_string = "".join(self.__strings.pop())
         return last_string
 
     def append_string(self, string):
-        self.__strings[-1] += string
+        self.__strings[-1].append(string)
 
     def set_data_size(self, size):
         self.__data_size = size
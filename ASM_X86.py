@@ -85,26 +85,23 @@ class edx_Register(Register):
 
 
 class Registers:
-    __instance = None
+    def __init__(self):
+        self.__free_registers = None
+        self.__all_equired_registers = None
 
-    @classmethod
-    def get_instance(cls):
-        if cls.__instance is None:
-            cls.__instance = Registers()
+        self.reset()
 
-        return cls.__instance
+        self.__all_full_registers = {RegistersType.eax: eax_Register(),
+                                     RegistersType.ebx: ebx_Register(),
+                                     RegistersType.ecx: ecx_Register(),
+                                     RegistersType.edx: edx_Register()}
 
-    def __init__(self):
+    def reset(self):
         self.__free_registers = [RegistersType.eax,
                                  RegistersType.ebx,
                                  RegistersType.ecx,
                                  RegistersType.edx]
 
-        self.__all_full_registers = {RegistersType.eax: eax_Register(),
-                                     RegistersType.ebx: ebx_Register(),
-                                     RegistersType.ecx: ecx_Register(),
-                                     RegistersType.edx: edx_Register()}
-
         self.__all_equired_registers = []
 
     def get_free_register(self):
@@ -135,11 +132,15 @@ class Registers:
 class ASM_X86_Generator(ASM.ASM_Generator, IR_Writer):
     __data_types = {1: "BYTE", 4: "DWORD"}
 
-    def __init__(self):
+    def __init__(self, compilation_context):
 
         super().__init__()
 
-        self.__registers = Registers()
+        self.__registers = compilation_context.get_registers()
+        self.__functions_table = compilation_context.get_functions_table()
+
+        # function name -> the proc written for it
+        self.__functions_code = {}
 
         """
         The div_temps will hold the values of the eax edx and ecx registers  
@@ -187,16 +188,15 @@ class ASM_X86_Generator(ASM.ASM_Generator, IR_Writer):
 
         return context.pop_string()
 
-    @classmethod
-    def __write_call_to_main(cls):
+    def __write_call_to_main(self):
         main_function_name = \
-            SymbolTable.FunctionsTable.get_instance().get_function_table_name("main")
+            self.__functions_table.get_function_table_name("main")
 
         if main_function_name is None:
             Utils.Utils.handle_compiler_error("Every program needs to contains a main function entry")
 
         call_to_main = \
-            cls.__write_call(main_function_name)
+            self.__write_call(main_function_name)
 
         return call_to_main
 
@@ -411,8 +411,15 @@ class ASM_X86_Generator(ASM.ASM_Generator, IR_Writer):
         for function in all_functions:
             self.write(function, context)
 
+    def get_function_code(self, name):
+        return self.__functions_code.get(name)
+
     @writer(IR.IR_Function)
     def write(self, function, context):
+        # no temp lives across functions, starting every function with all
+        # the registers free makes its code independent of the others
+        self.__registers.reset()
+
         context.push_string()
 
         symbol_table = function.get_symbol_table()
@@ -432,6 +439,16 @@ class ASM_X86_Generator(ASM.ASM_Generator, IR_Writer):
                                    function_prototype.get_parameters().get_all_parameters(),
                                    code)
 
+        self.__functions_code[function.get_name()] = string
+
+        context.append_string(string)
+
+        return string
+
+    @writer(IR.IR_PrecompiledFunction)
+    def write(self, precompiled_function, context):
+        string = precompiled_function.get_code()
+
         context.append_string(string)
 
         return string
@@ -520,7 +537,7 @@ class ASM_X86_Generator(ASM.ASM_Generator, IR_Writer):
 
         register_enum = assign_temp.get_temp().get_value()
 
-        register = Registers.get_instance().get_register_class(register_enum)
+        register = self.__registers.get_register_class(register_enum)
 
         part_of_register = register.get_part_of_register(var_size_in_bites)
 
@@ -548,7 +565,7 @@ class ASM_X86_Generator(ASM.ASM_Generator, IR_Writer):
 
     @writer(IR.IR_TempValue)
     def write(self, temp_value, context):
-        return Registers.get_instance().get_register_class(temp_value.get_value()).\
+        return self.__registers.get_register_class(temp_value.get_value()).\
             get_part_of_register(context.get_data_size()).name
 
     @writer(IR.IR_AddOperation)
@@ -1,35 +1,47 @@
 from abc import abstractmethod
 
 import SymbolTable
+import Traversal
 
 
 class AST_Node:
-    pass
+    __slots__ = ()
 
 
 class AST_Program(AST_Node):
+    __slots__ = ("__functions",)
+
     def __init__(self):
         self.__functions = []
 
     def add_function(self, function):
         self.__functions.append(function)
 
+    def set_functions(self, functions):
+        self.__functions = functions
+
     def get_functions(self):
         return self.__functions
 
 
 class AST_CodeBlock(AST_Node):
+    __slots__ = ("__statements",)
+
     def __init__(self):
         self.__statements = []
 
     def add_statement(self, statement):
         self.__statements.append(statement)
 
+    def set_statement(self, index, statement):
+        self.__statements[index] = statement
+
     def get_all_statements(self):
         return self.__statements
 
 
 class AST_Value(AST_Node):
+    __slots__ = ()
 
     @abstractmethod
     def get_data_type(self):
@@ -41,6 +53,8 @@ class AST_Value(AST_Node):
 
 
 class AST_FunctionCallReturnValue(AST_Value):
+    __slots__ = ("__function_call", "__function_return_data_type")
+
     def __init__(self, function_call, function_return_data_type):
         self.__function_call = function_call
         self.__function_return_data_type = function_return_data_type
@@ -48,6 +62,9 @@ class AST_FunctionCallReturnValue(AST_Value):
     def get_data_type(self):
         return self.__function_return_data_type
 
+    def set_data_type(self, data_type):
+        self.__function_return_data_type = data_type
+
     def get_function_call(self):
         return self.__function_call
 
@@ -57,6 +74,8 @@ class AST_FunctionCallReturnValue(AST_Value):
 
 
 class AST_Integer(AST_Value):
+    __slots__ = ("__value", "__data_type")
+
     def __init__(self, value, data_type):
         self.__value = value
         self.__data_type = data_type
@@ -73,29 +92,60 @@ class AST_Integer(AST_Value):
 
 
 class AST_Variable(AST_Value):
-    def __init__(self, name, data_type):
+    __slots__ = ("__name", "__data_type", "__source_name")
+
+    def __init__(self, name, data_type, source_name=None):
         self.__name = name
         self.__data_type = data_type
 
+        # the name the variable has in the source file
+        self.__source_name = source_name
+
     def get_name(self):
         return self.__name
 
+    def set_name(self, name):
+        self.__name = name
+
     def get_data_type(self):
         return self.__data_type
 
+    def set_data_type(self, data_type):
+        self.__data_type = data_type
+
+    def get_source_name(self):
+        return self.__source_name
+
     def write(self):
-        string = SymbolTable.FunctionsTable.get_instance().get_current_table().get_old_name(self.__name)
+        if self.__source_name is None:
+            return self.__name
+
+        string = self.__source_name
         return string
 
 
 class AST_Array:
-    def __init__(self, name, data_type):
+    __slots__ = ("__name", "__data_type", "__source_name")
+
+    def __init__(self, name, data_type, source_name=None):
         self.__name = name
         self.__data_type = data_type
 
+        # the name the array has in the source file
+        self.__source_name = source_name
+
     def get_name(self):
         return self.__name
 
+    def set_name(self, name):
+        self.__name = name
+
+    def get_source_name(self):
+        return self.__source_name
+
+    def set_data_type(self, data_type):
+        self.__data_type = data_type
+
     def get_data_type(self):
         return self.__data_type.get_data_type()
 
@@ -104,13 +154,15 @@ class AST_Array:
 
 
 class AST_ArrayCell(AST_Value):
+    __slots__ = ("__array_name", "__index")
+
     def __init__(self, array_name, index):
         self.__array_name = array_name
         self.__index = index
-        self.__data_type = self.__array_name.get_data_type()
 
     def get_data_type(self):
-        return self.__data_type
+        # the array is only resolved by the semantic analysis
+        return self.__array_name.get_data_type()
 
     def get_array_name(self):
         return self.__array_name
@@ -118,6 +170,9 @@ class AST_ArrayCell(AST_Value):
     def get_index(self):
         return self.__index
 
+    def set_index(self, index):
+        self.__index = index
+
     def get_name(self):
         return self.__array_name.get_name()
 
@@ -126,6 +181,8 @@ class AST_ArrayCell(AST_Value):
 
 
 class AST_Expression(AST_Value):
+    __slots__ = ("__expression_1", "__operator", "__expression_2", "__data_type")
+
     def __init__(self, expression_1, operator, expression_2):
         self.__expression_1 = expression_1
         self.__operator = operator
@@ -141,6 +198,10 @@ class AST_Expression(AST_Value):
     def get_expression_2(self):
         return self.__expression_2
 
+    def set_expressions(self, expression_1, expression_2):
+        self.__expression_1 = expression_1
+        self.__expression_2 = expression_2
+
     def get_data_type(self):
         return self.__data_type
 
@@ -148,11 +209,24 @@ class AST_Expression(AST_Value):
         self.__data_type = data_type
 
     def write(self):
-        string = self.__expression_1.write() + self.__operator.write() + self.__expression_2.write()
+        # the nested expressions are flattened, long chains of operands would recurse too deep
+        parts = [node.write() for node in Traversal.iter_pre_order(self, _get_expression_parts)
+                 if not isinstance(node, AST_Expression)]
+
+        string = "".join(parts)
         return string
 
 
+def _get_expression_parts(node):
+    if isinstance(node, AST_Expression):
+        return node.get_expression_1(), node.get_operator(), node.get_expression_2()
+
+    return ()
+
+
 class AST_DefVar(AST_Node):
+    __slots__ = ("__name", "__assignment")
+
     def __init__(self, name, assignment):
         self.__name = name
         self.__assignment = assignment
@@ -160,11 +234,42 @@ class AST_DefVar(AST_Node):
     def get_name(self):
         return self.__name
 
+    def set_name(self, name):
+        self.__name = name
+
     def get_assignment(self):
         return self.__assignment
 
 
+class AST_DefArray(AST_Node):
+    """
+    Only lives until the semantic analysis, which adds the array to the symbol table
+    """
+
+    __slots__ = ("__name", "__data_type", "__size", "__line")
+
+    def __init__(self, name, data_type, size, line):
+        self.__name = name
+        self.__data_type = data_type
+        self.__size = size
+        self.__line = line
+
+    def get_name(self):
+        return self.__name
+
+    def get_data_type(self):
+        return self.__data_type
+
+    def get_size(self):
+        return self.__size
+
+    def get_line(self):
+        return self.__line
+
+
 class AST_Assignment(AST_Node):
+    __slots__ = ("__dest", "__value")
+
     def __init__(self, dest, value):
         self.__dest = dest
         self.__value = value
@@ -175,8 +280,13 @@ class AST_Assignment(AST_Node):
     def get_value(self):
         return self.__value
 
+    def set_value(self, value):
+        self.__value = value
+
 
 class AST_IfStatement(AST_Node):
+    __slots__ = ("__condition", "__then_part", "__else_part")
+
     def __init__(self, condition, then_part, else_statement):
         self.__condition = condition
         self.__then_part = then_part
@@ -193,6 +303,8 @@ class AST_IfStatement(AST_Node):
 
 
 class AST_ElseStatement(AST_Node):
+    __slots__ = ("__code_block",)
+
     def __init__(self, code_block):
         self.__code_block = code_block
 
@@ -201,6 +313,8 @@ class AST_ElseStatement(AST_Node):
 
 
 class AST_WhileLoopStatement(AST_Node):
+    __slots__ = ("__condition", "__code_block")
+
     def __init__(self, condition, repeat_part):
         self.__condition = condition
         self.__code_block = repeat_part
@@ -213,6 +327,8 @@ class AST_WhileLoopStatement(AST_Node):
 
 
 class AST_Condition(AST_Node):
+    __slots__ = ("__left_expression", "__right_expression", "__operator")
+
     def __init__(self, left_expression, operator, right_expression):
         self.__left_expression = left_expression
         self.__right_expression = right_expression
@@ -227,6 +343,10 @@ class AST_Condition(AST_Node):
     def get_expression_2(self):
         return self.__right_expression
 
+    def set_expressions(self, left_expression, right_expression):
+        self.__left_expression = left_expression
+        self.__right_expression = right_expression
+
     def write(self):
         string = self.__left_expression.write() + " " + self.__operator.write() + " " + self.__right_expression.write()
 
@@ -234,6 +354,8 @@ class AST_Condition(AST_Node):
 
 
 class AST_ComplexCondition(AST_Node):
+    __slots__ = ("__left_condition", "__right_condition", "__operator")
+
     def __init__(self, left_condition, operator, right_condition):
         self.__left_condition = left_condition
         self.__right_condition = right_condition
@@ -250,90 +372,134 @@ class AST_ComplexCondition(AST_Node):
 
 
 class AST_Operator(AST_Node):
+    """
+    The operators hold no state, so every operator has a single instance
+    """
+
+    __slots__ = ()
+
+    __instances = {}
+
+    def __new__(cls):
+        instance = AST_Operator.__instances.get(cls)
+
+        if instance is None:
+            instance = AST_Operator.__instances.setdefault(cls, super().__new__(cls))
+
+        return instance
+
     @abstractmethod
     def write(self):
         pass
 
 
 class AST_MathOperator(AST_Operator):
+    __slots__ = ()
+
     @abstractmethod
     def write(self):
         pass
 
 
 class AST_Add_Operator(AST_MathOperator):
+    __slots__ = ()
+
     def write(self):
         string = "+"
         return string
 
 
 class AST_Sub_Operator(AST_MathOperator):
+    __slots__ = ()
+
     def write(self):
         string = "-"
         return string
 
 
 class AST_Mul_Operator(AST_MathOperator):
+    __slots__ = ()
+
     def write(self):
         string = "*"
         return string
 
 
 class AST_Div_Operator(AST_MathOperator):
+    __slots__ = ()
+
     def write(self):
         string = "/"
         return string
 
 
 class AST_Remainder_Operator(AST_Operator):
+    __slots__ = ()
+
     def write(self):
         string = "%"
         return string
 
 
 class AST_ConditionOperator(AST_Operator):
+    __slots__ = ()
+
     @abstractmethod
     def write(self):
         pass
 
 
 class AST_LessOperator(AST_ConditionOperator):
+    __slots__ = ()
+
     def write(self):
         string = "<"
         return string
 
 
 class AST_GreaterOperator(AST_ConditionOperator):
+    __slots__ = ()
+
     def write(self):
         string = ">"
         return string
 
 
 class AST_EqualityOperator(AST_ConditionOperator):
+    __slots__ = ()
+
     def write(self):
         string = "=="
         return string
 
 
 class AST_NotEqualsOperator(AST_ConditionOperator):
+    __slots__ = ()
+
     def write(self):
         string = "!="
         return string
 
 
 class AST_AndOperator(AST_ConditionOperator):
+    __slots__ = ()
+
     def write(self):
         string = "&&"
         return string
 
 
 class AST_OrOperator(AST_ConditionOperator):
+    __slots__ = ()
+
     def write(self):
         string = "||"
         return string
 
 
 class AST_ReadLine(AST_Node):
+    __slots__ = ("__array_name", "__num_of_chars")
+
     def __init__(self, array_name, num_of_chars):
         self.__array_name = array_name
         self.__num_of_chars = num_of_chars
@@ -341,11 +507,19 @@ class AST_ReadLine(AST_Node):
     def get_array_name(self):
         return self.__array_name
 
+    def set_array_name(self, array_name):
+        self.__array_name = array_name
+
     def get_num_of_chars(self):
         return self.__num_of_chars
 
+    def set_num_of_chars(self, num_of_chars):
+        self.__num_of_chars = num_of_chars
+
 
 class AST_Print(AST_Node):
+    __slots__ = ("__value", "__print_format")
+
     def __init__(self, print_format, value):
         self.__value = value
         self.__print_format = print_format
@@ -356,16 +530,29 @@ class AST_Print(AST_Node):
     def get_print_format(self):
         return self.__print_format
 
+    def set_value(self, value):
+        self.__value = value
+
+    def set_print_format(self, print_format):
+        self.__print_format = print_format
+
 
 class AST_PrintArray(AST_Node):
+    __slots__ = ("__array_name",)
+
     def __init__(self, array_name):
         self.__array_name = array_name
 
     def get_array_name(self):
         return self.__array_name
 
+    def set_array_name(self, array_name):
+        self.__array_name = array_name
+
 
 class AST_PrintString(AST_Node):
+    __slots__ = ("__string",)
+
     def __init__(self, string):
         self.__string = string
 
@@ -374,18 +561,63 @@ class AST_PrintString(AST_Node):
 
 
 class AST_Exit(AST_Node):
+    __slots__ = ("__exit_code",)
+
     def __init__(self, exit_code):
         self.__exit_code = exit_code
 
     def get_exit_code(self):
         return self.__exit_code
 
+    def set_exit_code(self, exit_code):
+        self.__exit_code = exit_code
+
+
+class AST_FunctionDeclaration(AST_Node):
+    """
+    The prototype of a function as it is written, the parameters
+    are SymbolTable.FunctionParameter with their source names
+    """
+
+    __slots__ = ("__name", "__return_value_type", "__parameters")
+
+    def __init__(self, name, return_value_type):
+        self.__name = name
+        self.__return_value_type = return_value_type
+        self.__parameters = []
+
+    def get_name(self):
+        return self.__name
+
+    def get_return_value_type(self):
+        return self.__return_value_type
+
+    def set_parameters(self, parameters):
+        self.__parameters = parameters
+
+    def get_parameters(self):
+        return self.__parameters
+
 
 class AST_Function(AST_Node):
-    def __init__(self, symbol_table_function, code_block):
+    __slots__ = ("__declaration", "__code_block", "__symbol_table_function")
+
+    def __init__(self, declaration, code_block):
+        self.__declaration = declaration
         self.__code_block = code_block
+
+        # set by the semantic analysis
+        self.__symbol_table_function = None
+
+    def get_declaration(self):
+        return self.__declaration
+
+    def set_symbol_table_function(self, symbol_table_function):
         self.__symbol_table_function = symbol_table_function
 
+    def get_symbol_table_function(self):
+        return self.__symbol_table_function
+
     def get_code_block(self):
         return self.__code_block
 
@@ -400,20 +632,98 @@ class AST_Function(AST_Node):
 
 
 class AST_FunctionCall(AST_Node):
-    def __init__(self, name, parameters):
+    __slots__ = ("__name", "__parameters", "__line")
+
+    def __init__(self, name, parameters, line=None):
         self.__name = name
         self.__parameters = parameters
+        self.__line = line
 
     def get_name(self):
         return self.__name
 
+    def set_name(self, name):
+        self.__name = name
+
     def get_parameters(self):
         return self.__parameters
 
+    def get_line(self):
+        return self.__line
+
 
 class AST_ReturnStatement(AST_Node):
-    def __init__(self, value):
+    __slots__ = ("__value", "__line")
+
+    def __init__(self, value, line=None):
         self.__value = value
+        self.__line = line
 
     def get_value(self):
-        return self.__value
\ No newline at end of file
+        return self.__value
+
+    def get_line(self):
+        return self.__line
+
+    def set_value(self, value):
+        self.__value = value
+
+
+class AST_AssertStatement(AST_Node):
+    """
+    Only lives until the semantic analysis, which lowers it to an if statement
+    """
+
+    __slots__ = ("__condition", "__line")
+
+    def __init__(self, condition, line):
+        self.__condition = condition
+        self.__line = line
+
+    def get_condition(self):
+        return self.__condition
+
+    def get_line(self):
+        return self.__line
+
+
+# the name mangled slot names of every node class
+_node_slots = {}
+
+
+def _get_node_slots(node_class):
+    slots = _node_slots.get(node_class)
+
+    if slots is None:
+        slots = []
+
+        for cls in node_class.__mro__:
+            for slot in cls.__dict__.get("__slots__", ()):
+                slots.append("_" + cls.__name__.lstrip("_") + slot)
+
+        _node_slots[node_class] = slots
+
+    return slots
+
+
+def iter_nodes(root):
+    nodes = [root]
+
+    # the nodes keep their children in name mangled slots, so walk the slots
+    while len(nodes) != 0:
+        node = nodes.pop()
+
+        if isinstance(node, list):
+            nodes.extend(node)
+            continue
+
+        if isinstance(node, SymbolTable.FunctionCallParameters):
+            nodes.extend(node.get_all_parameters())
+            continue
+
+        if not isinstance(node, (AST_Node, AST_Array)):
+            continue
+
+        yield node
+
+        nodes.extend(getattr(node, slot, None) for slot in _get_node_slots(type(node)))
@@ -0,0 +1,746 @@
+import hashlib
+import struct
+import sys
+import threading
+from array import array
+
+import CompilationContext
+import Constance
+import DataTypes
+import LexAndYacc
+import SemanticAnalyzer
+import SymbolTable
+import Traversal
+import Utils
+from AST_Visitor import *
+
+# magic, format version, big endian flag, number of strings, size of the strings in bytes, number of ints
+HEADER = struct.Struct("<4sBB2xqqq")
+MAGIC = b"UAST"
+FORMAT_VERSION = 2
+
+# the nodes are written as a stream of ints, every node starts with its tag
+# and its fields follow in a fixed order. the strings are indexes into a
+# table of all the strings of the program, None is written as -1
+NODE_NONE = 0
+NODE_FUNCTION = 1
+NODE_CODE_BLOCK = 2
+NODE_INTEGER = 3
+NODE_ARRAY_CELL = 4
+NODE_VARIABLE = 5
+NODE_ARRAY = 6
+NODE_EXPRESSION = 7
+NODE_DEF_VAR = 8
+NODE_ASSIGNMENT = 9
+NODE_ADD_OPERATOR = 10
+NODE_SUB_OPERATOR = 11
+NODE_MUL_OPERATOR = 12
+NODE_DIV_OPERATOR = 13
+NODE_REMAINDER_OPERATOR = 14
+NODE_LESS_OPERATOR = 15
+NODE_GREATER_OPERATOR = 16
+NODE_EQUALITY_OPERATOR = 17
+NODE_NOT_EQUALS_OPERATOR = 18
+NODE_AND_OPERATOR = 19
+NODE_OR_OPERATOR = 20
+NODE_IF_STATEMENT = 21
+NODE_ELSE_STATEMENT = 22
+NODE_WHILE_LOOP_STATEMENT = 23
+NODE_CONDITION = 24
+NODE_COMPLEX_CONDITION = 25
+NODE_READ_LINE = 26
+NODE_PRINT = 27
+NODE_PRINT_ARRAY = 28
+NODE_PRINT_STRING = 29
+NODE_EXIT = 30
+NODE_FUNCTION_CALL = 31
+NODE_RETURN_STATEMENT = 32
+NODE_FUNCTION_CALL_RETURN_VALUE = 33
+
+NONE = -1
+
+# the values of the integers are kept as they were written, numbers are text and chars are ints
+INTEGER_TEXT = 0
+INTEGER_INT = 1
+
+SCALAR_TYPES = {DataTypes.VOID_TYPE_ID: DataTypes.void(),
+                DataTypes.INT_32_TYPE_ID: DataTypes.int_32(),
+                DataTypes.CHAR_TYPE_ID: DataTypes.char()}
+
+
+def write_program(main_AST):
+    """
+    Serializes an analyzed AST with the symbol tables of its functions
+    """
+
+    return AST_BinaryWriter().write(main_AST)
+
+
+def read_program(data):
+    """
+    Returns the AST in data and a new CompilationContext with its functions,
+    or None when data is not a valid serialized AST
+    """
+
+    if len(data) < HEADER.size:
+        return None
+
+    magic, format_version, big_endian, num_of_strings, strings_size, num_of_ints = HEADER.unpack_from(data)
+
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        return None
+
+    lengths = array("i")
+    ints = array("i")
+
+    if len(data) != HEADER.size + (num_of_strings + num_of_ints) * ints.itemsize + strings_size:
+        return None
+
+    offset = HEADER.size
+
+    lengths.frombytes(data[offset:offset + num_of_strings * lengths.itemsize])
+    offset += num_of_strings * lengths.itemsize
+
+    try:
+        text = data[offset:offset + strings_size].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+    offset += strings_size
+
+    ints.frombytes(data[offset:])
+
+    if big_endian != (sys.byteorder == "big"):
+        lengths.byteswap()
+        ints.byteswap()
+
+    strings = []
+    start = 0
+
+    for length in lengths:
+        strings.append(text[start:start + length])
+        start += length
+
+    compilation_context = CompilationContext.CompilationContext()
+
+    # a truncated stream ends the ints inside the generators of the reader, where
+    # the StopIteration becomes a RuntimeError. a corrupted one reads tags, types
+    # and indexes that don't exist or declares a function twice
+    try:
+        main_AST = AST_BinaryReader(strings, ints, compilation_context).read()
+    except (StopIteration, RuntimeError, IndexError, KeyError, ValueError, TypeError, Utils.CompilerError):
+        return None
+
+    return main_AST, compilation_context
+
+
+class AST_BinaryWriter(AST_Visitor):
+    def __init__(self):
+        self.__ints = array("i")
+        self.__strings = {}
+
+    def write(self, main_AST):
+        functions = main_AST.get_functions()
+
+        self.__ints.append(len(functions))
+
+        for function in functions:
+            Traversal.run(self.visit(function, None))
+
+        strings = list(self.__strings.keys())
+
+        lengths = array("i", [len(string) for string in strings])
+        text = "".join(strings).encode("utf-8")
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == "big",
+                             len(strings), len(text), len(self.__ints))
+
+        data = b"".join([header, lengths.tobytes(), text, self.__ints.tobytes()])
+        return data
+
+    def __write_string(self, string):
+        if string is None:
+            self.__ints.append(NONE)
+            return
+
+        index = self.__strings.get(string)
+
+        if index is None:
+            index = len(self.__strings)
+            self.__strings[string] = index
+
+        self.__ints.append(index)
+
+    def __write_int(self, value):
+        if value is None:
+            value = NONE
+
+        self.__ints.append(value)
+
+    def __write_data_type(self, data_type):
+        if data_type is None:
+            self.__ints.append(NONE)
+            return
+
+        self.__ints.append(data_type.type_id)
+
+    def __write_node(self, node):
+        if node is None:
+            self.__ints.append(NODE_NONE)
+            return
+
+        yield self.visit(node, None)
+
+    def __write_tables(self, tables):
+        self.__ints.append(len(tables))
+
+        for table in tables:
+            variables = list(table.get_all_vars())
+            arrays = list(table.get_all_arrays())
+
+            self.__ints.append(len(variables))
+
+            for var in variables:
+                self.__write_string(var.get_name())
+                self.__write_data_type(var.get_data_type())
+
+            self.__ints.append(len(arrays))
+
+            for symbol_table_array in arrays:
+                self.__write_string(symbol_table_array.get_name())
+                self.__write_data_type(symbol_table_array.get_data_type())
+                self.__ints.append(symbol_table_array.get_size())
+
+    @visitor(AST.AST_Function)
+    def visit(self, function, context):
+        declaration = function.get_declaration()
+        parameters = declaration.get_parameters()
+
+        self.__ints.append(NODE_FUNCTION)
+
+        self.__write_string(declaration.get_name())
+        self.__write_data_type(declaration.get_return_value_type())
+
+        self.__ints.append(len(parameters))
+
+        for parameter in parameters:
+            self.__write_string(parameter.get_name())
+            self.__write_data_type(parameter.get_data_type())
+
+        # the tables come before the code, the arrays of the code are looked up in them
+        self.__write_tables(function.get_all_tables())
+
+        yield self.visit(function.get_code_block(), None)
+
+    @visitor(AST.AST_CodeBlock)
+    def visit(self, code_block, context):
+        statements = code_block.get_all_statements()
+
+        self.__ints.append(NODE_CODE_BLOCK)
+        self.__ints.append(len(statements))
+
+        for statement in statements:
+            yield self.__write_node(statement)
+
+    @visitor(AST.AST_Integer)
+    def visit(self, integer, context):
+        value = integer.get_value()
+
+        self.__ints.append(NODE_INTEGER)
+
+        if isinstance(value, int):
+            self.__ints.append(INTEGER_INT)
+        else:
+            self.__ints.append(INTEGER_TEXT)
+
+        self.__write_string(str(value))
+        self.__write_data_type(integer.get_data_type())
+
+    @visitor(AST.AST_ArrayCell)
+    def visit(self, get_value_from_array, context):
+        self.__ints.append(NODE_ARRAY_CELL)
+
+        yield self.visit(get_value_from_array.get_array_name(), None)
+        yield self.visit(get_value_from_array.get_index(), None)
+
+    @visitor(AST.AST_Variable)
+    def visit(self, variable, context):
+        self.__ints.append(NODE_VARIABLE)
+
+        self.__write_string(variable.get_name())
+        self.__write_data_type(variable.get_data_type())
+        self.__write_string(variable.get_source_name())
+
+    @visitor(AST.AST_Array)
+    def visit(self, array, context):
+        self.__ints.append(NODE_ARRAY)
+
+        self.__write_string(array.get_name())
+        self.__write_string(array.get_source_name())
+
+    @visitor(AST.AST_Expression)
+    def visit(self, expression, context):
+        self.__ints.append(NODE_EXPRESSION)
+
+        yield self.visit(expression.get_expression_1(), None)
+        yield self.visit(expression.get_operator(), None)
+        yield self.visit(expression.get_expression_2(), None)
+        self.__write_data_type(expression.get_data_type())
+
+    @visitor(AST.AST_DefVar)
+    def visit(self, def_var, context):
+        self.__ints.append(NODE_DEF_VAR)
+
+        self.__write_string(def_var.get_name())
+        yield self.visit(def_var.get_assignment(), None)
+
+    @visitor(AST.AST_Assignment)
+    def visit(self, assignment, context):
+        self.__ints.append(NODE_ASSIGNMENT)
+
+        yield self.visit(assignment.get_dest(), None)
+        yield self.visit(assignment.get_value(), None)
+
+    @visitor(AST.AST_Add_Operator)
+    def visit(self, add_operator, context):
+        self.__ints.append(NODE_ADD_OPERATOR)
+
+    @visitor(AST.AST_Sub_Operator)
+    def visit(self, sub_operator, context):
+        self.__ints.append(NODE_SUB_OPERATOR)
+
+    @visitor(AST.AST_Mul_Operator)
+    def visit(self, mul_operator, context):
+        self.__ints.append(NODE_MUL_OPERATOR)
+
+    @visitor(AST.AST_Div_Operator)
+    def visit(self, dev_operator, context):
+        self.__ints.append(NODE_DIV_OPERATOR)
+
+    @visitor(AST.AST_Remainder_Operator)
+    def visit(self, dev_res_operator, context):
+        self.__ints.append(NODE_REMAINDER_OPERATOR)
+
+    @visitor(AST.AST_LessOperator)
+    def visit(self, less_operator, context):
+        self.__ints.append(NODE_LESS_OPERATOR)
+
+    @visitor(AST.AST_GreaterOperator)
+    def visit(self, greater_operator, context):
+        self.__ints.append(NODE_GREATER_OPERATOR)
+
+    @visitor(AST.AST_EqualityOperator)
+    def visit(self, equality_operator, context):
+        self.__ints.append(NODE_EQUALITY_OPERATOR)
+
+    @visitor(AST.AST_NotEqualsOperator)
+    def visit(self, not_equals_operator, context):
+        self.__ints.append(NODE_NOT_EQUALS_OPERATOR)
+
+    @visitor(AST.AST_AndOperator)
+    def visit(self, and_operator, context):
+        self.__ints.append(NODE_AND_OPERATOR)
+
+    @visitor(AST.AST_OrOperator)
+    def visit(self, or_operator, context):
+        self.__ints.append(NODE_OR_OPERATOR)
+
+    @visitor(AST.AST_IfStatement)
+    def visit(self, if_statement, context):
+        self.__ints.append(NODE_IF_STATEMENT)
+
+        yield self.visit(if_statement.get_condition(), None)
+        yield self.visit(if_statement.get_then_part(), None)
+        yield self.__write_node(if_statement.get_else_part())
+
+    @visitor(AST.AST_ElseStatement)
+    def visit(self, else_statement, context):
+        self.__ints.append(NODE_ELSE_STATEMENT)
+
+        yield self.visit(else_statement.get_code_block(), None)
+
+    @visitor(AST.AST_WhileLoopStatement)
+    def visit(self, while_loop_statement, context):
+        self.__ints.append(NODE_WHILE_LOOP_STATEMENT)
+
+        yield self.visit(while_loop_statement.get_condition(), None)
+        yield self.visit(while_loop_statement.get_code_block(), None)
+
+    @visitor(AST.AST_Condition)
+    def visit(self, condition, context):
+        self.__ints.append(NODE_CONDITION)
+
+        yield self.visit(condition.get_expression_1(), None)
+        yield self.visit(condition.get_operator(), None)
+        yield self.visit(condition.get_expression_2(), None)
+
+    @visitor(AST.AST_ComplexCondition)
+    def visit(self, condition, context):
+        self.__ints.append(NODE_COMPLEX_CONDITION)
+
+        yield self.visit(condition.get_condition_1(), None)
+        yield self.visit(condition.get_operator(), None)
+        yield self.visit(condition.get_condition_2(), None)
+
+    @visitor(AST.AST_ReadLine)
+    def visit(self, read_line_statement, context):
+        self.__ints.append(NODE_READ_LINE)
+
+        self.__write_string(read_line_statement.get_array_name())
+        yield self.visit(read_line_statement.get_num_of_chars(), None)
+
+    @visitor(AST.AST_Print)
+    def visit(self, print_statement, context):
+        self.__ints.append(NODE_PRINT)
+
+        self.__write_string(print_statement.get_print_format())
+        yield self.visit(print_statement.get_value(), None)
+
+    @visitor(AST.AST_PrintArray)
+    def visit(self, print_array, context):
+        self.__ints.append(NODE_PRINT_ARRAY)
+
+        self.__write_string(print_array.get_array_name())
+
+    @visitor(AST.AST_PrintString)
+    def visit(self, print_statement, context):
+        self.__ints.append(NODE_PRINT_STRING)
+
+        self.__write_string(print_statement.get_string())
+
+    @visitor(AST.AST_Exit)
+    def visit(self, exit_statement, context):
+        self.__ints.append(NODE_EXIT)
+
+        yield self.visit(exit_statement.get_exit_code(), None)
+
+    @visitor(AST.AST_FunctionCall)
+    def visit(self, function_call, context):
+        parameters = function_call.get_parameters().get_all_parameters()
+
+        self.__ints.append(NODE_FUNCTION_CALL)
+
+        self.__write_string(function_call.get_name())
+        self.__ints.append(len(parameters))
+
+        for parameter in parameters:
+            yield self.visit(parameter, None)
+
+        self.__write_int(function_call.get_line())
+
+    @visitor(AST.AST_ReturnStatement)
+    def visit(self, return_statement, context):
+        self.__ints.append(NODE_RETURN_STATEMENT)
+
+        yield self.__write_node(return_statement.get_value())
+        self.__write_int(return_statement.get_line())
+
+    @visitor(AST.AST_FunctionCallReturnValue)
+    def visit(self, function_call_return_value, context):
+        self.__ints.append(NODE_FUNCTION_CALL_RETURN_VALUE)
+
+        yield self.visit(function_call_return_value.get_function_call(), None)
+        self.__write_data_type(function_call_return_value.get_data_type())
+
+
+class AST_BinaryReader:
+    """
+    Builds the AST back from the ints written by AST_BinaryWriter. The functions
+    are declared again by the SemanticAnalyzer, so the functions table and the
+    prototypes get the same names, the scopes are filled from the stream.
+    """
+
+    def __init__(self, strings, ints, compilation_context):
+        self.__strings = strings
+        self.__next = iter(ints).__next__
+        self.__num_of_ints = len(ints)
+
+        self.__analyzer = SemanticAnalyzer.SemanticAnalyzer(compilation_context)
+
+        # the arrays of the function being read, by their symbol table name
+        self.__arrays = {}
+
+        # indexed by the node tags
+        self.__readers = (self.__read_none,
+                          self.__read_function,
+                          self.__read_code_block,
+                          self.__read_integer,
+                          self.__read_array_cell,
+                          self.__read_variable,
+                          self.__read_array,
+                          self.__read_expression,
+                          self.__read_def_var,
+                          self.__read_assignment,
+                          AST.AST_Add_Operator,
+                          AST.AST_Sub_Operator,
+                          AST.AST_Mul_Operator,
+                          AST.AST_Div_Operator,
+                          AST.AST_Remainder_Operator,
+                          AST.AST_LessOperator,
+                          AST.AST_GreaterOperator,
+                          AST.AST_EqualityOperator,
+                          AST.AST_NotEqualsOperator,
+                          AST.AST_AndOperator,
+                          AST.AST_OrOperator,
+                          self.__read_if_statement,
+                          self.__read_else_statement,
+                          self.__read_while_loop_statement,
+                          self.__read_condition,
+                          self.__read_complex_condition,
+                          self.__read_read_line,
+                          self.__read_print,
+                          self.__read_print_array,
+                          self.__read_print_string,
+                          self.__read_exit,
+                          self.__read_function_call,
+                          self.__read_return_statement,
+                          self.__read_function_call_return_value)
+
+    def read(self):
+        program = AST.AST_Program()
+
+        for i in range(self.__read_count()):
+            program.add_function(Traversal.run(self.__read_node()))
+
+        return program
+
+    def __read_node(self):
+        tag = self.__next()
+
+        if not 0 <= tag < len(self.__readers):
+            raise ValueError("Unknown node tag " + str(tag))
+
+        # the readers of the nodes with children are generators that yield the nodes they read
+        return self.__readers[tag]()
+
+    def __read_tag(self, tag):
+        if self.__next() != tag:
+            raise ValueError("Expected the node tag " + str(tag))
+
+    def __read_count(self):
+        count = self.__next()
+
+        # every counted item takes at least one int
+        if not 0 <= count <= self.__num_of_ints:
+            raise ValueError("Invalid count " + str(count))
+
+        return count
+
+    def __read_string(self):
+        index = self.__next()
+
+        if index == NONE:
+            return None
+
+        if not 0 <= index < len(self.__strings):
+            raise IndexError("Unknown string " + str(index))
+
+        return self.__strings[index]
+
+    def __read_int(self):
+        value = self.__next()
+
+        if value == NONE:
+            return None
+
+        return value
+
+    def __read_data_type(self):
+        type_id = self.__next()
+
+        if type_id == NONE:
+            return None
+
+        return SCALAR_TYPES[type_id]
+
+    def __read_none(self):
+        return None
+
+    def __read_tables(self, symbol_table_function):
+        num_of_tables = self.__read_count()
+
+        # a table for every scope, like the semantic analysis pushed them
+        for i in range(num_of_tables - 1):
+            symbol_table_function.push_table()
+
+        self.__arrays = {}
+
+        for table in symbol_table_function.get_all_tables():
+            for i in range(self.__read_count()):
+                var_name = self.__read_string()
+                table.add_var(var_name, self.__read_data_type())
+
+            for i in range(self.__read_count()):
+                var_name = self.__read_string()
+                data_type = self.__read_data_type()
+                size = self.__next()
+
+                table.add_array(var_name, DataTypes.Array(data_type, size))
+                self.__arrays[var_name] = table.get_array(var_name)
+
+    def __read_function(self):
+        declaration = AST.AST_FunctionDeclaration(self.__read_string(), self.__read_data_type())
+
+        parameters = []
+
+        for i in range(self.__read_count()):
+            parameter_name = self.__read_string()
+            parameters.append(SymbolTable.FunctionParameter(parameter_name, self.__read_data_type()))
+
+        declaration.set_parameters(parameters)
+
+        code_block = AST.AST_CodeBlock()
+        function = AST.AST_Function(declaration, code_block)
+
+        self.__analyzer.declare_function(function)
+        self.__read_tables(function.get_symbol_table_function())
+
+        self.__read_tag(NODE_CODE_BLOCK)
+
+        for i in range(self.__read_count()):
+            code_block.add_statement((yield self.__read_node()))
+
+        return function
+
+    def __read_code_block(self):
+        code_block = AST.AST_CodeBlock()
+
+        for i in range(self.__read_count()):
+            code_block.add_statement((yield self.__read_node()))
+
+        return code_block
+
+    def __read_integer(self):
+        kind = self.__next()
+        value = self.__read_string()
+
+        if kind == INTEGER_INT:
+            value = int(value)
+
+        return AST.AST_Integer(value, self.__read_data_type())
+
+    def __read_array_cell(self):
+        return AST.AST_ArrayCell((yield self.__read_node()), (yield self.__read_node()))
+
+    def __read_variable(self):
+        return AST.AST_Variable(self.__read_string(), self.__read_data_type(), self.__read_string())
+
+    def __read_array(self):
+        name = self.__read_string()
+        return AST.AST_Array(name, self.__arrays[name], self.__read_string())
+
+    def __read_expression(self):
+        expression = AST.AST_Expression((yield self.__read_node()), (yield self.__read_node()), (yield self.__read_node()))
+        expression.set_data_type(self.__read_data_type())
+
+        return expression
+
+    def __read_def_var(self):
+        return AST.AST_DefVar(self.__read_string(), (yield self.__read_node()))
+
+    def __read_assignment(self):
+        return AST.AST_Assignment((yield self.__read_node()), (yield self.__read_node()))
+
+    def __read_if_statement(self):
+        return AST.AST_IfStatement((yield self.__read_node()), (yield self.__read_node()), (yield self.__read_node()))
+
+    def __read_else_statement(self):
+        return AST.AST_ElseStatement((yield self.__read_node()))
+
+    def __read_while_loop_statement(self):
+        return AST.AST_WhileLoopStatement((yield self.__read_node()), (yield self.__read_node()))
+
+    def __read_condition(self):
+        return AST.AST_Condition((yield self.__read_node()), (yield self.__read_node()), (yield self.__read_node()))
+
+    def __read_complex_condition(self):
+        return AST.AST_ComplexCondition((yield self.__read_node()), (yield self.__read_node()), (yield self.__read_node()))
+
+    def __read_read_line(self):
+        return AST.AST_ReadLine(self.__read_string(), (yield self.__read_node()))
+
+    def __read_print(self):
+        return AST.AST_Print(self.__read_string(), (yield self.__read_node()))
+
+    def __read_print_array(self):
+        return AST.AST_PrintArray(self.__read_string())
+
+    def __read_print_string(self):
+        return AST.AST_PrintString(self.__read_string())
+
+    def __read_exit(self):
+        return AST.AST_Exit((yield self.__read_node()))
+
+    def __read_function_call(self):
+        name = self.__read_string()
+        parameters = SymbolTable.FunctionCallParameters()
+
+        for i in range(self.__read_count()):
+            parameters.add_parameter((yield self.__read_node()))
+
+        return AST.AST_FunctionCall(name, parameters, self.__read_int())
+
+    def __read_return_statement(self):
+        return AST.AST_ReturnStatement((yield self.__read_node()), self.__read_int())
+
+    def __read_function_call_return_value(self):
+        return AST.AST_FunctionCallReturnValue((yield self.__read_node()), self.__read_data_type())
+
+
+class ASTCache:
+    """
+    Keeps the analyzed ASTs of the compiled sources in the compile cache, so an
+    unchanged source starts at the IR generation without being scanned or parsed
+    """
+
+    def __init__(self, compile_cache):
+        self.__compile_cache = compile_cache
+
+        self.__hits = 0
+        self.__misses = 0
+
+        self.__lock = threading.Lock()
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
+
+    @classmethod
+    def make_key(cls, source):
+        key = hashlib.sha256()
+
+        key.update(b"ast\0")
+        key.update(Constance.COMPILER_VERSION.encode("utf-8") + b"\0")
+        key.update(LexAndYacc.get_grammar_hash().encode("utf-8") + b"\0")
+        key.update(source.get_buffer())
+
+        return key.hexdigest()
+
+    def load(self, source):
+        """
+        Returns the AST of source and its CompilationContext, or None
+        """
+
+        key = self.make_key(source)
+        data = self.__compile_cache.load_ast(key)
+
+        program = None
+        if data is not None:
+            program = read_program(data)
+
+            # an entry that can't be read is a miss and is dropped, the AST is stored again
+            if program is None:
+                self.__compile_cache.remove_ast(key)
+
+        with self.__lock:
+            if program is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+
+        return program
+
+    def store(self, source, main_AST):
+        self.__compile_cache.store_ast(self.make_key(source), write_program(main_AST))
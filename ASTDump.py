@@ -0,0 +1,281 @@
+import json
+from xml.sax.saxutils import quoteattr
+
+import DataTypes
+import Traversal
+from AST_Visitor import *
+
+DUMP_FORMAT_XML = "xml"
+DUMP_FORMAT_JSONL = "jsonl"
+
+DUMP_FORMATS = (DUMP_FORMAT_XML, DUMP_FORMAT_JSONL)
+DEFAULT_DUMP_FORMAT = DUMP_FORMAT_XML
+
+# deeper elements are not indented any further, the indentation
+# of a long expression chain would grow with the square of its length
+MAX_XML_INDENT = 64
+
+
+def write_data_type(data_type):
+    if data_type is None:
+        return None
+
+    if isinstance(data_type, DataTypes.Array):
+        string = write_data_type(data_type.get_data_type()) + "[" + str(data_type.get_array_size()) + "]"
+        return string
+
+    string = type(data_type).__name__
+    return string
+
+
+class XML_DumpFormat:
+    """
+    An element for every node, one per line and indented by a space for every
+    level up to MAX_XML_INDENT, the values of a node are its attributes
+    """
+
+    def __init__(self, file):
+        self.__file = file
+        self.__depth = 0
+
+    def start_dump(self):
+        self.__file.write('<?xml version="1.0" encoding="utf-8"?>\n')
+
+    def end_dump(self):
+        pass
+
+    def __write_tag(self, kind, attributes, end):
+        string = " " * min(self.__depth, MAX_XML_INDENT) + "<" + kind
+
+        for name, value in attributes.items():
+            if value is not None:
+                string += " " + name + "=" + quoteattr(str(value))
+
+        self.__file.write(string + end)
+
+    def start_node(self, kind, attributes):
+        self.__write_tag(kind, attributes, ">\n")
+        self.__depth += 1
+
+    def end_node(self, kind):
+        self.__depth -= 1
+        self.__file.write(" " * min(self.__depth, MAX_XML_INDENT) + "</" + kind + ">\n")
+
+    def write_leaf(self, kind, attributes):
+        self.__write_tag(kind, attributes, "/>\n")
+
+
+class JSONL_DumpFormat:
+    """
+    A json object for every node, one per line in pre order. Every node has
+    an id and the id of its parent, the children of a node are in their order.
+    """
+
+    def __init__(self, file):
+        self.__file = file
+        self.__next_id = 0
+
+        # the ids of the nodes from the root to the current node
+        self.__parents = []
+
+    def start_dump(self):
+        pass
+
+    def end_dump(self):
+        pass
+
+    def __write_record(self, kind, attributes):
+        node_id = self.__next_id
+        self.__next_id += 1
+
+        parent = None
+        if len(self.__parents) != 0:
+            parent = self.__parents[-1]
+
+        record = {"id": node_id, "parent": parent, "node": kind}
+
+        for name, value in attributes.items():
+            if value is not None:
+                record[name] = value
+
+        self.__file.write(json.dumps(record) + "\n")
+
+        return node_id
+
+    def start_node(self, kind, attributes):
+        self.__parents.append(self.__write_record(kind, attributes))
+
+    def end_node(self, kind):
+        self.__parents.pop()
+
+    def write_leaf(self, kind, attributes):
+        self.__write_record(kind, attributes)
+
+
+DUMP_FORMAT_CLASSES = {DUMP_FORMAT_XML: XML_DumpFormat,
+                       DUMP_FORMAT_JSONL: JSONL_DumpFormat}
+
+
+class AST_DumpWriter(AST_Visitor):
+    """
+    Writes the AST to a file object while it is visited, nothing is kept but the
+    path from the root to the current node, so the size of the dump doesn't matter
+    """
+
+    def __init__(self, file, dump_format=DEFAULT_DUMP_FORMAT):
+        if dump_format not in DUMP_FORMAT_CLASSES:
+            raise ValueError("unknown dump format " + str(dump_format))
+
+        self.__format = DUMP_FORMAT_CLASSES[dump_format](file)
+
+    def write(self, main_AST):
+        self.__format.start_dump()
+        Traversal.run(self.visit(main_AST, None))
+        self.__format.end_dump()
+
+    def __visit_node(self, kind, attributes, children):
+        self.__format.start_node(kind, attributes)
+
+        for child in children:
+            if child is not None:
+                yield self.visit(child, None)
+
+        self.__format.end_node(kind)
+
+    @visitor(AST.AST_Program)
+    def visit(self, program, context):
+        return self.__visit_node("program", {}, program.get_functions())
+
+    @visitor(AST.AST_Function)
+    def visit(self, function, context):
+        prototype = function.get_prototype()
+
+        self.__format.start_node("function",
+                                 {"name": function.get_name(),
+                                  "type": write_data_type(prototype.get_return_value_type())})
+
+        for parameter in prototype.get_parameters().get_all_parameters():
+            self.__format.write_leaf("parameter", {"name": parameter.get_name(),
+                                                   "type": write_data_type(parameter.get_data_type())})
+
+        yield self.visit(function.get_code_block(), None)
+
+        self.__format.end_node("function")
+
+    @visitor(AST.AST_CodeBlock)
+    def visit(self, code_block, context):
+        return self.__visit_node("code_block", {}, code_block.get_all_statements())
+
+    @visitor(AST.AST_Integer)
+    def visit(self, integer, context):
+        self.__format.write_leaf("integer", {"value": integer.get_value(),
+                                             "type": write_data_type(integer.get_data_type())})
+
+    @visitor(AST.AST_ArrayCell)
+    def visit(self, get_value_from_array, context):
+        return self.__visit_node("array_cell", {},
+                                 (get_value_from_array.get_array_name(), get_value_from_array.get_index()))
+
+    @visitor(AST.AST_Variable)
+    def visit(self, variable, context):
+        self.__format.write_leaf("variable", {"name": variable.get_name(),
+                                              "type": write_data_type(variable.get_data_type())})
+
+    @visitor(AST.AST_Array)
+    def visit(self, array, context):
+        self.__format.write_leaf("array", {"name": array.get_name()})
+
+    @visitor(AST.AST_Expression)
+    def visit(self, expression, context):
+        return self.__visit_node("expression", {"type": write_data_type(expression.get_data_type())},
+                                 (expression.get_expression_1(), expression.get_operator(),
+                                  expression.get_expression_2()))
+
+    @visitor(AST.AST_DefVar)
+    def visit(self, def_var, context):
+        return self.__visit_node("def_var", {"name": def_var.get_name()}, (def_var.get_assignment(),))
+
+    @visitor(AST.AST_DefArray)
+    def visit(self, def_array, context):
+        self.__format.write_leaf("def_array", {"name": def_array.get_name(),
+                                               "type": write_data_type(def_array.get_data_type()),
+                                               "size": def_array.get_size().get_value()})
+
+    @visitor(AST.AST_Assignment)
+    def visit(self, assignment, context):
+        return self.__visit_node("assignment", {}, (assignment.get_dest(), assignment.get_value()))
+
+    @visitor(AST.AST_Operator)
+    def visit(self, operator, context):
+        self.__format.write_leaf("operator", {"symbol": operator.write()})
+
+    @visitor(AST.AST_IfStatement)
+    def visit(self, if_statement, context):
+        return self.__visit_node("if", {}, (if_statement.get_condition(), if_statement.get_then_part(),
+                                            if_statement.get_else_part()))
+
+    @visitor(AST.AST_ElseStatement)
+    def visit(self, else_statement, context):
+        return self.__visit_node("else", {}, (else_statement.get_code_block(),))
+
+    @visitor(AST.AST_WhileLoopStatement)
+    def visit(self, while_loop_statement, context):
+        return self.__visit_node("while", {}, (while_loop_statement.get_condition(),
+                                               while_loop_statement.get_code_block()))
+
+    @visitor(AST.AST_Condition)
+    def visit(self, condition, context):
+        return self.__visit_node("condition", {}, (condition.get_expression_1(), condition.get_operator(),
+                                                   condition.get_expression_2()))
+
+    @visitor(AST.AST_ComplexCondition)
+    def visit(self, condition, context):
+        return self.__visit_node("complex_condition", {}, (condition.get_condition_1(), condition.get_operator(),
+                                                           condition.get_condition_2()))
+
+    @visitor(AST.AST_AssertStatement)
+    def visit(self, assert_statement, context):
+        return self.__visit_node("assert", {"line": assert_statement.get_line()},
+                                 (assert_statement.get_condition(),))
+
+    @visitor(AST.AST_ReadLine)
+    def visit(self, read_line_statement, context):
+        return self.__visit_node("read_line", {"array": read_line_statement.get_array_name()},
+                                 (read_line_statement.get_num_of_chars(),))
+
+    @visitor(AST.AST_Print)
+    def visit(self, print_statement, context):
+        return self.__visit_node("print", {"format": print_statement.get_print_format()},
+                                 (print_statement.get_value(),))
+
+    @visitor(AST.AST_PrintArray)
+    def visit(self, print_array, context):
+        self.__format.write_leaf("print_array", {"array": print_array.get_array_name()})
+
+    @visitor(AST.AST_PrintString)
+    def visit(self, print_statement, context):
+        self.__format.write_leaf("print_string", {"string": print_statement.get_string()})
+
+    @visitor(AST.AST_Exit)
+    def visit(self, exit_statement, context):
+        return self.__visit_node("exit", {}, (exit_statement.get_exit_code(),))
+
+    @visitor(AST.AST_FunctionCall)
+    def visit(self, function_call, context):
+        return self.__visit_node("function_call", {"name": function_call.get_name(),
+                                                   "line": function_call.get_line()},
+                                 function_call.get_parameters().get_all_parameters())
+
+    @visitor(AST.AST_ReturnStatement)
+    def visit(self, return_statement, context):
+        return self.__visit_node("return", {"line": return_statement.get_line()}, (return_statement.get_value(),))
+
+    @visitor(AST.AST_FunctionCallReturnValue)
+    def visit(self, function_call_return_value, context):
+        return self.__visit_node("function_call_value",
+                                 {"type": write_data_type(function_call_return_value.get_data_type())},
+                                 (function_call_return_value.get_function_call(),))
+
+
+def write_dump(main_AST, file, dump_format=DEFAULT_DUMP_FORMAT):
+    AST_DumpWriter(file, dump_format).write(main_AST)
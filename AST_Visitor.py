@@ -1,195 +1,192 @@
 from abc import abstractmethod
 import AST
+import Dispatch
 
-AST_visitor_methods = {}
-
-
-def _qualname(obj):
-    return obj.__module__ + '.' + obj.__qualname__
-
-
-def _declaring_class(obj):
-    name = _qualname(obj)
-    return name[:name.rfind('.')]
-
-
-def _visitor_impl(self, arg, arg2):
-    method = AST_visitor_methods[(_qualname(type(self)), type(arg))]
-    return method(self, arg, arg2)
+# the methods of every AST visitor, see Dispatch.Dispatcher
+AST_visitor_dispatcher = Dispatch.Dispatcher()
 
 
 def visitor(arg_type):
-    def decorator(fn):
-        declaring_class = _declaring_class(fn)
-        AST_visitor_methods[(declaring_class, arg_type)] = fn
-
-        return _visitor_impl
-
-    return decorator
+    return AST_visitor_dispatcher.register(arg_type)
 
 
 class AST_Visitor:
-    @abstractmethod
+    """
+    A visit of a node with children can be a generator that yields the visits of
+    the children, see Traversal.run
+    """
+
     @visitor(AST.AST_Program)
+    @abstractmethod
     def visit(self, program, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Function)
+    @abstractmethod
     def visit(self, function, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_CodeBlock)
+    @abstractmethod
     def visit(self, code_block, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Value)
+    @abstractmethod
     def visit(self, code_block, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Integer)
+    @abstractmethod
     def visit(self, integer, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_ArrayCell)
+    @abstractmethod
     def visit(self, get_value_from_array, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Variable)
+    @abstractmethod
     def visit(self, variable, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Array)
+    @abstractmethod
     def visit(self, array, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Expression)
+    @abstractmethod
     def visit(self, expression, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_DefVar)
+    @abstractmethod
     def visit(self, def_var, context):
         pass
 
+    @visitor(AST.AST_DefArray)
     @abstractmethod
+    def visit(self, def_array, context):
+        pass
+
     @visitor(AST.AST_Assignment)
+    @abstractmethod
     def visit(self, assignment, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Add_Operator)
+    @abstractmethod
     def visit(self, add_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Sub_Operator)
+    @abstractmethod
     def visit(self, sub_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Mul_Operator)
+    @abstractmethod
     def visit(self, mul_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Div_Operator)
+    @abstractmethod
     def visit(self, dev_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Remainder_Operator)
+    @abstractmethod
     def visit(self, dev_res_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_LessOperator)
+    @abstractmethod
     def visit(self, less_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_GreaterOperator)
+    @abstractmethod
     def visit(self, greater_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_LessOperator)
+    @abstractmethod
     def visit(self, equality_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_AndOperator)
+    @abstractmethod
     def visit(self, and_operator, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_IfStatement)
+    @abstractmethod
     def visit(self, if_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_WhileLoopStatement)
+    @abstractmethod
     def visit(self, while_loop_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_ElseStatement)
+    @abstractmethod
     def visit(self, else_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Condition)
+    @abstractmethod
     def visit(self, condition, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_ComplexCondition)
+    @abstractmethod
     def visit(self, condition, context):
         pass
 
+    @visitor(AST.AST_AssertStatement)
     @abstractmethod
+    def visit(self, assert_statement, context):
+        pass
+
     @visitor(AST.AST_ReadLine)
+    @abstractmethod
     def visit(self, read_line_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Print)
+    @abstractmethod
     def visit(self, print_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_PrintArray)
+    @abstractmethod
     def visit(self, print_array, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_PrintString)
+    @abstractmethod
     def visit(self, print_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_Exit)
+    @abstractmethod
     def visit(self, exit_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_FunctionCall)
+    @abstractmethod
     def visit(self, function_call, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_ReturnStatement)
+    @abstractmethod
     def visit(self, return_statement, context):
         pass
 
-    @abstractmethod
     @visitor(AST.AST_FunctionCallReturnValue)
+    @abstractmethod
     def visit(self, function_call_return_value, context):
         pass
@@ -0,0 +1,569 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SOURCE_FILE = os.path.join(REPO_DIR, "examples", "test_1.u")
+
+DEFAULT_SOURCE_SIZE_IN_MB = 4
+
+DEFAULT_NUM_OF_FUNCTIONS = 2000
+
+DEFAULT_NUM_OF_OPERANDS = 100000
+
+# runs in a fresh interpreter so nothing is imported or built yet
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import Compiler
+imported = time.perf_counter()
+
+with open(sys.argv[1], "r") as file:
+    code = file.read()
+
+Compiler.compile_source(code)
+compiled = time.perf_counter()
+
+print(json.dumps({"import": imported - start, "first compile": compiled - imported}))
+"""
+
+
+def run_startup(src_file, frozen_tables):
+    env = dict(os.environ)
+    env.pop("UCOMPILER_NO_FROZEN_TABLES", None)
+
+    if not frozen_tables:
+        env["UCOMPILER_NO_FROZEN_TABLES"] = "1"
+
+    ret = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, src_file],
+                         cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True)
+
+    return json.loads(ret.stdout.splitlines()[-1])
+
+
+def bench_startup(src_file, runs):
+    results = {}
+
+    for frozen_tables in (True, False):
+        timings = [run_startup(src_file, frozen_tables) for i in range(runs)]
+
+        mode = "frozen tables" if frozen_tables else "built tables"
+        results[mode] = {name: statistics.median([timing[name] for timing in timings])
+                         for name in timings[0].keys()}
+
+    return results
+
+
+def generate_source(size_in_bytes):
+    """
+    Repeats the examples until the text reaches size_in_bytes, the functions
+    are redefined so the text is only meant for the lexer
+    """
+
+    examples = []
+
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "examples", "*.u"))):
+        with open(path, "r") as file:
+            examples.append(file.read() + "\n")
+
+    parts = []
+    size = 0
+
+    while size < size_in_bytes:
+        for example in examples:
+            parts.append(example)
+            size += len(example)
+
+    return "".join(parts)
+
+
+def generate_program(num_of_functions):
+    """
+    Generates a valid program of expression heavy functions, each calling the previous one
+    """
+
+    parts = []
+
+    for i in range(num_of_functions):
+        parts.append("int_32 f_" + str(i) + "(int_32 a, int_32 b)\n"
+                     "{\n"
+                     "    int_32 c = a + b * 3;\n"
+                     "    int_32 d = c % 7;\n"
+                     "    int_32 g = a / 2 - b;\n"
+                     "    char e = 'x';\n"
+                     "    int_32 values[8];\n"
+                     "    values[1] = d;\n"
+                     "    while (c < d)\n"
+                     "    {\n"
+                     "        c = c + 1;\n"
+                     "        d = d - 1;\n"
+                     "    }\n"
+                     "    g = values[1];\n")
+
+        if i != 0:
+            parts.append("    c = f_" + str(i - 1) + "(c, d);\n")
+
+        parts.append("    return c + d;\n"
+                     "}\n")
+
+    parts.append("void main()\n"
+                 "{\n"
+                 "    int_32 res = f_" + str(num_of_functions - 1) + "(1, 2);\n"
+                 "    @print res;\n"
+                 "}\n")
+
+    return "".join(parts)
+
+
+def generate_duplicated_program(num_of_functions):
+    """
+    Generates a program of functions with the same code under different names, like generated helpers
+    """
+
+    parts = []
+
+    for i in range(num_of_functions):
+        parts.append("int_32 helper_" + str(i) + "(int_32 a, int_32 b)\n"
+                     "{\n"
+                     "    int_32 c = a + b * 3;\n"
+                     "    while (c < 100)\n"
+                     "    {\n"
+                     "        c = c + a % 7;\n"
+                     "    }\n"
+                     "    return c - b;\n"
+                     "}\n")
+
+    parts.append("void main()\n"
+                 "{\n")
+
+    for i in range(num_of_functions):
+        parts.append("    @print helper_" + str(i) + "(1, 2);\n")
+
+    parts.append("}\n")
+
+    return "".join(parts)
+
+
+def bench_dedup(num_of_functions, runs):
+    import Compiler
+    import Profiler
+
+    code = generate_duplicated_program(num_of_functions)
+
+    results = {}
+
+    for opt_level in Compiler.OPT_LEVELS:
+        profiler = Profiler.Profiler(trace_memory=False)
+        pipeline = Compiler.Pipeline(Compiler.EMIT_ASM, (), None, profiler, None, Compiler.PARSER_YACC, opt_level)
+
+        asm_code = None
+        for i in range(runs):
+            asm_code = pipeline.run(code).get_artifact(Compiler.STAGE_ASM)
+
+        timings = {stage.get_name() + " seconds": stage.get_wall_time() / runs for stage in profiler.get_stages()}
+        timings["asm KB"] = len(asm_code) / 1024
+
+        results["dedup O" + str(opt_level)] = timings
+
+    return results
+
+
+def generate_constant_program(num_of_functions):
+    """
+    Generates a program of functions full of constant expressions, like the
+    computed array indexes and scale factors of generated code
+    """
+
+    parts = []
+
+    for i in range(num_of_functions):
+        parts.append("int_32 scale_" + str(i) + "(int_32 a)\n"
+                     "{\n"
+                     "    int_32 values[16];\n"
+                     "    values[2 * 5 + 1] = a * 1 + 0;\n"
+                     "    values[16 / 4 - 1] = (60 * 60 * 24) % 1000 + " + str(i) + ";\n"
+                     "    int_32 b = values[3];\n"
+                     "    int_32 c = b * 1 - a * 0;\n"
+                     "    int_32 d = 2147483647 + 1;\n"
+                     "    c = a - a + c;\n"
+                     "    return (1 + 1) * c - d;\n"
+                     "}\n")
+
+    parts.append("void main()\n"
+                 "{\n")
+
+    for i in range(num_of_functions):
+        parts.append("    @print scale_" + str(i) + "(" + str(i) + " * 2);\n")
+
+    parts.append("}\n")
+
+    return "".join(parts)
+
+
+def bench_fold(num_of_functions, runs):
+    import Compiler
+    import Profiler
+
+    code = generate_constant_program(num_of_functions)
+
+    results = {}
+
+    for opt_level in Compiler.OPT_LEVELS:
+        profiler = Profiler.Profiler(trace_memory=False)
+        pipeline = Compiler.Pipeline(Compiler.EMIT_ASM, (), None, profiler, None, Compiler.PARSER_YACC, opt_level)
+
+        asm_code = None
+        for i in range(runs):
+            asm_code = pipeline.run(code).get_artifact(Compiler.STAGE_ASM)
+
+        timings = {stage.get_name() + " seconds": stage.get_wall_time() / runs for stage in profiler.get_stages()}
+        timings["asm KB"] = len(asm_code) / 1024
+        timings["ir statements"] = profiler.get_counts().get("ir statements", 0) / runs
+        timings["folded nodes"] = profiler.get_counts().get("folded nodes", 0) / runs
+
+        results["fold O" + str(opt_level)] = timings
+
+    return results
+
+
+def bench_compile(num_of_functions, runs, opt_level):
+    import Compiler
+    import Profiler
+
+    code = generate_program(num_of_functions)
+
+    profiler = Profiler.Profiler(trace_memory=False)
+    pipeline = Compiler.Pipeline(Compiler.EMIT_ASM, (), None, profiler, None, Compiler.PARSER_YACC, opt_level)
+
+    for i in range(runs):
+        pipeline.run(code)
+
+    results = {"compile": {stage.get_name() + " seconds": stage.get_wall_time() / runs
+                           for stage in profiler.get_stages()}}
+
+    return results
+
+
+def bench_dump(num_of_functions, runs):
+    import tempfile
+    import ASTDump
+    import Compiler
+
+    main_AST = Compiler.Pipeline(Compiler.EMIT_AST).run(generate_program(num_of_functions)).get_artifact(
+        Compiler.STAGE_PARSE)
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for dump_format in ASTDump.DUMP_FORMATS:
+            path = os.path.join(temp_dir, "dump." + dump_format)
+            timings = []
+
+            for i in range(runs):
+                with open(path, "w", encoding="utf-8") as file:
+                    start = time.perf_counter()
+                    ASTDump.write_dump(main_AST, file, dump_format)
+                    timings.append(time.perf_counter() - start)
+
+            seconds = statistics.median(timings)
+            size_in_mb = os.path.getsize(path) / (1024 * 1024)
+
+            results["dump " + dump_format] = {"MB": size_in_mb,
+                                              "seconds": seconds,
+                                              "MB per second": size_in_mb / seconds}
+
+    return results
+
+
+def generate_expression_program(num_of_operands):
+    # one long chain, the parser makes a left deep tree from it
+    string = "void main()\n{\nint_32 x = 1;\nint_32 y = " + " + ".join(["x"] * num_of_operands) + ";\n" \
+             "@print y;\n}\n"
+    return string
+
+
+def bench_deep(num_of_operands, runs):
+    import Compiler
+    import Profiler
+
+    code = generate_expression_program(num_of_operands)
+
+    results = {}
+
+    for parser in Compiler.PARSERS:
+        profiler = Profiler.Profiler(trace_memory=False)
+        pipeline = Compiler.Pipeline(Compiler.EMIT_ASM, (), None, profiler, None, parser)
+
+        for i in range(runs):
+            pipeline.run(code)
+
+        results["deep " + parser] = {stage.get_name() + " seconds": stage.get_wall_time() / runs
+                                     for stage in profiler.get_stages()}
+
+    return results
+
+
+def bench_parser(num_of_functions, runs):
+    import LexAndYacc
+    import RecursiveDescentParser
+
+    code = generate_program(num_of_functions)
+    lexer = LexAndYacc.Lex.get_instance()
+    yacc = LexAndYacc.Yacc.get_instance()
+
+    parsers = {"yacc": lambda token_stream: yacc.pars(token_stream),
+               "rd": lambda token_stream: RecursiveDescentParser.RecursiveDescentParser(token_stream).pars()}
+
+    timings = {name: [] for name in parsers.keys()}
+    num_of_tokens = 0
+
+    for i in range(runs):
+        for name, parse in parsers.items():
+            # a new token stream every run, so the token values are built by each parser
+            token_stream = lexer.parse_to_tokens(code)
+            num_of_tokens = token_stream.get_num_of_tokens()
+
+            start = time.perf_counter()
+            parse(token_stream)
+            timings[name].append(time.perf_counter() - start)
+
+    results = {"parser": {"tokens": num_of_tokens}}
+
+    for name in parsers.keys():
+        seconds = statistics.median(timings[name])
+
+        results["parser"][name + " seconds"] = seconds
+        results["parser"][name + " tokens per second"] = num_of_tokens / seconds
+
+    results["parser"]["rd speedup"] = results["parser"]["yacc seconds"] / results["parser"]["rd seconds"]
+
+    return results
+
+
+def bench_ast_cache(num_of_functions, runs):
+    import ASTCache
+    import CompilationContext
+    import LexAndYacc
+    import SemanticAnalyzer
+
+    code = generate_program(num_of_functions)
+    lexer = LexAndYacc.Lex.get_instance()
+    yacc = LexAndYacc.Yacc.get_instance()
+
+    def parse():
+        main_AST = yacc.pars(lexer.parse_to_tokens(code))
+        return SemanticAnalyzer.SemanticAnalyzer(CompilationContext.CompilationContext()).analyze(main_AST)
+
+    data = ASTCache.write_program(parse())
+
+    parse_timings = []
+    write_timings = []
+    load_timings = []
+
+    for i in range(runs):
+        start = time.perf_counter()
+        main_AST = parse()
+        parse_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ASTCache.write_program(main_AST)
+        write_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ASTCache.read_program(data)
+        load_timings.append(time.perf_counter() - start)
+
+    parse_seconds = statistics.median(parse_timings)
+    load_seconds = statistics.median(load_timings)
+
+    results = {"ast cache": {"serialized KB": len(data) / 1024,
+                             "front end seconds": parse_seconds,
+                             "write seconds": statistics.median(write_timings),
+                             "load seconds": load_seconds,
+                             "load speedup": parse_seconds / load_seconds}}
+
+    return results
+
+
+def bench_memory(num_of_functions):
+    import tracemalloc
+
+    import LexAndYacc
+    import Profiler
+
+    code = generate_program(num_of_functions)
+    token_stream = LexAndYacc.Lex.get_instance().parse_to_tokens(code)
+    yacc = LexAndYacc.Yacc.get_instance()
+
+    # the parser stacks are built on the first parse, they are not part of the AST
+    yacc.pars(LexAndYacc.Lex.get_instance().parse_to_tokens(generate_program(1)))
+
+    tracemalloc.start()
+    main_AST = yacc.pars(token_stream)
+    ast_size, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_of_nodes = Profiler.count_ast_nodes(main_AST)
+
+    results = {"memory": {"ast nodes": num_of_nodes,
+                          "ast KB": ast_size / 1024,
+                          "peak KB": peak_size / 1024,
+                          "bytes per node": ast_size / num_of_nodes}}
+
+    return results
+
+
+def bench_dispatch(num_of_functions, runs):
+    import AST
+    import AST_Visitor
+    import Compiler
+
+    class NodeVisitor(AST_Visitor.AST_Visitor):
+        # every node type falls back to the method of AST_Node
+        @AST_Visitor.visitor(AST.AST_Node)
+        def visit(self, node, context):
+            pass
+
+        @AST_Visitor.visitor(AST.AST_Array)
+        def visit(self, array, context):
+            pass
+
+    main_AST = Compiler.Pipeline(Compiler.EMIT_AST).run(generate_program(num_of_functions)).get_artifact(
+        Compiler.STAGE_PARSE)
+    nodes = list(AST.iter_nodes(main_AST))
+
+    node_visitor = NodeVisitor()
+    method = AST_Visitor.AST_visitor_dispatcher.get_table(NodeVisitor)[AST.AST_Node]
+
+    dispatch_timings = []
+    call_timings = []
+
+    for i in range(runs):
+        start = time.perf_counter()
+        for node in nodes:
+            node_visitor.visit(node, None)
+        dispatch_timings.append(time.perf_counter() - start)
+
+        # the same method called without the dispatch
+        start = time.perf_counter()
+        for node in nodes:
+            method(node_visitor, node, None)
+        call_timings.append(time.perf_counter() - start)
+
+    dispatch_seconds = statistics.median(dispatch_timings)
+    call_seconds = statistics.median(call_timings)
+
+    results = {"dispatch": {"nodes": len(nodes),
+                            "ns per visit": dispatch_seconds / len(nodes) * 1e9,
+                            "ns per direct call": call_seconds / len(nodes) * 1e9,
+                            "ns of dispatch": (dispatch_seconds - call_seconds) / len(nodes) * 1e9}}
+
+    return results
+
+
+def bench_lexer(size_in_mb, runs):
+    import LexAndYacc
+
+    text = generate_source(size_in_mb * 1024 * 1024)
+    lexer = LexAndYacc.Lex.get_instance()
+
+    timings = []
+    num_of_tokens = 0
+
+    for i in range(runs):
+        start = time.perf_counter()
+        num_of_tokens = lexer.parse_to_tokens(text).get_num_of_tokens()
+        timings.append(time.perf_counter() - start)
+
+    seconds = statistics.median(timings)
+
+    results = {"lexer": {"source MB": len(text) / (1024 * 1024),
+                         "tokens": num_of_tokens,
+                         "seconds": seconds,
+                         "tokens per second": num_of_tokens / seconds,
+                         "MB per second": len(text) / (1024 * 1024) / seconds}}
+
+    return results
+
+
+def write_report(results):
+    string = ""
+
+    for mode, timings in results.items():
+        string += mode + ":\n"
+
+        for name, value in timings.items():
+            if mode in ("lexer", "compile", "parser", "ast cache", "memory", "dispatch") or \
+                    mode.startswith(("deep", "dump", "dedup", "fold")):
+                string += "    " + name.ljust(24) + "{:12.2f}".format(value) + "\n"
+            else:
+                string += "    " + name.ljust(16) + "{:8.2f} ms".format(value * 1000) + "\n"
+
+    return string
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ucompiler benchmarks")
+
+    parser.add_argument("benchmark", nargs="?",
+                        choices=["startup", "lexer", "compile", "parser", "ast", "memory", "dispatch", "deep", "dump",
+                                 "dedup", "fold"],
+                        default="startup")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="number of runs, the median is reported")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as json")
+    parser.add_argument("--source", default=DEFAULT_SOURCE_FILE,
+                        help="the file compiled by the startup benchmark")
+    parser.add_argument("--size", type=int, default=DEFAULT_SOURCE_SIZE_IN_MB,
+                        help="the size in MB of the generated source of the lexer benchmark")
+    parser.add_argument("--functions", type=int, default=DEFAULT_NUM_OF_FUNCTIONS,
+                        help="the number of functions in the generated program of the compile, parser, ast, memory, "
+                             "dispatch, dump, dedup and fold benchmarks")
+    parser.add_argument("--operands", type=int, default=DEFAULT_NUM_OF_OPERANDS,
+                        help="the number of operands of the expression in the program of the deep benchmark")
+    parser.add_argument("-O", dest="opt_level", type=int, choices=[0, 1], default=1,
+                        help="the optimization level of the compile benchmark")
+
+    args = parser.parse_args()
+
+    if args.benchmark == "lexer":
+        results = bench_lexer(args.size, args.runs)
+    elif args.benchmark == "compile":
+        results = bench_compile(args.functions, args.runs, args.opt_level)
+    elif args.benchmark == "parser":
+        results = bench_parser(args.functions, args.runs)
+    elif args.benchmark == "ast":
+        results = bench_ast_cache(args.functions, args.runs)
+    elif args.benchmark == "memory":
+        results = bench_memory(args.functions)
+    elif args.benchmark == "dispatch":
+        results = bench_dispatch(args.functions, args.runs)
+    elif args.benchmark == "deep":
+        results = bench_deep(args.operands, args.runs)
+    elif args.benchmark == "dump":
+        results = bench_dump(args.functions, args.runs)
+    elif args.benchmark == "dedup":
+        results = bench_dedup(args.functions, args.runs)
+    elif args.benchmark == "fold":
+        results = bench_fold(args.functions, args.runs)
+    else:
+        results = bench_startup(args.source, args.runs)
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print(write_report(results), end="")
+
+
+if __name__ == "__main__":
+    main()
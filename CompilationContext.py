@@ -0,0 +1,19 @@
+import ASM_X86
+import SymbolTable
+
+
+class CompilationContext:
+    """
+    Holds the mutable state of a single compilation unit, every compilation
+    gets its own context so several of them can run in the same process
+    """
+
+    def __init__(self):
+        self.__functions_table = SymbolTable.FunctionsTable()
+        self.__registers = ASM_X86.Registers()
+
+    def get_functions_table(self):
+        return self.__functions_table
+
+    def get_registers(self):
+        return self.__registers
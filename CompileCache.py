@@ -0,0 +1,290 @@
+import hashlib
+import os
+import threading
+
+import Constance
+import LexAndYacc
+
+DEFAULT_MAX_SIZE_IN_BYTES = 256 * 1024 * 1024
+
+ASM_EXTENSION = ".asm"
+OBJECT_EXTENSION = ".obj"
+FUNCTION_EXTENSION = ".proc"
+TOKENS_EXTENSION = ".tokens"
+AST_EXTENSION = ".ast"
+
+ENTRY_EXTENSIONS = (ASM_EXTENSION, OBJECT_EXTENSION, FUNCTION_EXTENSION, TOKENS_EXTENSION, AST_EXTENSION)
+
+
+def get_default_cache_dir():
+    cache_dir = os.environ.get("UCOMPILER_CACHE_DIR")
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.expanduser("~"), ".ucompiler_cache")
+
+    return cache_dir
+
+
+class CacheStatistics:
+    def __init__(self):
+        self.__hits = 0
+        self.__misses = 0
+        self.__stores = 0
+        self.__evictions = 0
+
+    def add_hit(self):
+        self.__hits += 1
+
+    def add_miss(self):
+        self.__misses += 1
+
+    def add_store(self):
+        self.__stores += 1
+
+    def add_eviction(self):
+        self.__evictions += 1
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
+
+    def get_stores(self):
+        return self.__stores
+
+    def get_evictions(self):
+        return self.__evictions
+
+    def write(self):
+        string = "cache: " + str(self.__hits) + " hits, " + str(self.__misses) + " misses"
+        return string
+
+
+class CompileCache:
+    """
+    Content addressed store of compilation outputs. The key covers the
+    source text, the compiler version, the grammar and the options, the
+    least recently used entries are evicted when the cache grows past max_size.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE_IN_BYTES):
+        self.__cache_dir = cache_dir
+        self.__max_size = max_size
+        self.__statistics = CacheStatistics()
+
+        # path -> size of every entry, loaded on the first store
+        self.__entries = None
+        self.__total_size = 0
+
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def make_key(cls, code, options=()):
+        key = hashlib.sha256()
+
+        key.update(Constance.COMPILER_VERSION.encode("utf-8") + b"\0")
+        key.update(LexAndYacc.get_grammar_hash().encode("utf-8") + b"\0")
+        key.update(repr(tuple(options)).encode("utf-8") + b"\0")
+        # the code is either text or the bytes of a source buffer
+        if isinstance(code, str):
+            code = code.encode("utf-8")
+
+        key.update(code)
+
+        return key.hexdigest()
+
+    def get_cache_dir(self):
+        return self.__cache_dir
+
+    def get_max_size(self):
+        return self.__max_size
+
+    def get_statistics(self):
+        return self.__statistics
+
+    def __get_path(self, key, extension):
+        return os.path.join(self.__cache_dir, key[:2], key + extension)
+
+    def __touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def load_asm(self, key):
+        path = self.__get_path(key, ASM_EXTENSION)
+
+        try:
+            with open(path, "r") as file:
+                asm_code = file.read()
+        except OSError:
+            self.__statistics.add_miss()
+            return None
+
+        self.__statistics.add_hit()
+        self.__touch(path)
+
+        return asm_code
+
+    def load_object(self, key, dest_path):
+        import shutil
+
+        path = self.__get_path(key, OBJECT_EXTENSION)
+
+        try:
+            shutil.copyfile(path, dest_path)
+        except OSError:
+            return False
+
+        self.__touch(path)
+
+        return True
+
+    # the procs of single functions, keyed by the function fingerprint
+    def load_function(self, fingerprint):
+        path = self.__get_path(fingerprint, FUNCTION_EXTENSION)
+
+        try:
+            with open(path, "r") as file:
+                code = file.read()
+        except OSError:
+            return None
+
+        self.__touch(path)
+
+        return code
+
+    def store_function(self, fingerprint, code):
+        self.__store(self.__get_path(fingerprint, FUNCTION_EXTENSION), code.encode("utf-8"))
+
+    # serialized token streams, keyed by TokenCache
+    def load_tokens(self, key):
+        path = self.__get_path(key, TOKENS_EXTENSION)
+
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        self.__touch(path)
+
+        return data
+
+    def store_tokens(self, key, data):
+        self.__store(self.__get_path(key, TOKENS_EXTENSION), data)
+
+    def remove_tokens(self, key):
+        self.__remove(self.__get_path(key, TOKENS_EXTENSION))
+
+    # serialized ASTs, keyed by ASTCache
+    def load_ast(self, key):
+        path = self.__get_path(key, AST_EXTENSION)
+
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        self.__touch(path)
+
+        return data
+
+    def store_ast(self, key, data):
+        self.__store(self.__get_path(key, AST_EXTENSION), data)
+
+    def remove_ast(self, key):
+        self.__remove(self.__get_path(key, AST_EXTENSION))
+
+    def store_asm(self, key, asm_code):
+        self.__store(self.__get_path(key, ASM_EXTENSION), asm_code.encode("utf-8"))
+
+    def store_object(self, key, obj_path):
+        with open(obj_path, "rb") as file:
+            data = file.read()
+
+        self.__store(self.__get_path(key, OBJECT_EXTENSION), data)
+
+    def __store(self, path, data):
+        import tempfile
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # write to a temp file first so other processes never read half an entry
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+
+        os.replace(temp_path, path)
+
+        self.__statistics.add_store()
+
+        with self.__lock:
+            self.__load_entries()
+
+            self.__total_size -= self.__entries.get(path, 0)
+            self.__entries[path] = len(data)
+            self.__total_size += len(data)
+
+            if self.__total_size > self.__max_size:
+                self.__evict()
+
+    def __remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+
+        self.__statistics.add_eviction()
+
+        with self.__lock:
+            if self.__entries is not None:
+                self.__total_size -= self.__entries.pop(path, 0)
+
+    def __load_entries(self):
+        if self.__entries is not None:
+            return
+
+        self.__entries = {}
+        self.__total_size = 0
+
+        for root, dirs, files in os.walk(self.__cache_dir):
+            for file in files:
+                if not file.endswith(ENTRY_EXTENSIONS):
+                    continue
+
+                path = os.path.join(root, file)
+
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+
+                self.__entries[path] = size
+                self.__total_size += size
+
+    def __evict(self):
+        by_last_use = []
+
+        for path in self.__entries.keys():
+            try:
+                by_last_use.append((os.path.getmtime(path), path))
+            except OSError:
+                by_last_use.append((0, path))
+
+        by_last_use.sort()
+
+        for last_use, path in by_last_use:
+            if self.__total_size <= self.__max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            self.__total_size -= self.__entries.pop(path)
+            self.__statistics.add_eviction()
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import socket
+
+import ASTDump
+import Compiler
+import FunctionCache
+import LexAndYacc
+import Utils
+
+# requests and responses are single lines of json
+MAX_MESSAGE_SIZE_IN_BYTES = 64 * 1024 * 1024
+
+
+def make_request(code, emit, dumps, parser=Compiler.PARSER_YACC, opt_level=Compiler.DEFAULT_OPT_LEVEL,
+                 ast_dump_format=ASTDump.DEFAULT_DUMP_FORMAT):
+    request = {"code": code, "emit": emit, "dumps": list(dumps), "parser": parser, "opt_level": opt_level,
+               "ast_dump_format": ast_dump_format}
+    return request
+
+
+def compile_request(request, function_cache=None, token_cache=None, ast_cache=None):
+    """
+    Runs the pipeline for one request and returns the response,
+    compilation errors are reported in the response instead of raised
+    """
+
+    emit = request.get("emit", Compiler.EMIT_ASM)
+    dumps = request.get("dumps", [])
+    parser = request.get("parser", Compiler.PARSER_YACC)
+    opt_level = request.get("opt_level", Compiler.DEFAULT_OPT_LEVEL)
+    ast_dump_format = request.get("ast_dump_format", ASTDump.DEFAULT_DUMP_FORMAT)
+
+    # the server never assembles, the client does it next to the source file
+    if emit == Compiler.EMIT_EXE:
+        emit = Compiler.EMIT_ASM
+
+    response = {"dumps": {}, "asm": None, "error": None}
+
+    try:
+        pipeline = Compiler.Pipeline(emit, dumps, function_cache, None, token_cache, parser, opt_level,
+                                     ast_cache, ast_dump_format)
+        result = pipeline.run(request["code"])
+    except (Utils.CompilerError, ValueError, KeyError) as error:
+        response["error"] = str(error)
+        return response
+    except RecursionError:
+        response["error"] = "Compiler error: the program is nested too deeply"
+        return response
+
+    response["dumps"] = result.get_all_dumps()
+    response["asm"] = result.get_artifact(Compiler.STAGE_ASM)
+
+    return response
+
+
+class CompileServer:
+    """
+    Keeps the lexer, the parser and the function cache warm and compiles
+    the requests of local clients, each request runs on a worker thread
+    so several clients are served at once
+    """
+
+    def __init__(self, socket_path, cache=None, cache_tokens=False, cache_ast=False):
+        self.__socket_path = socket_path
+        self.__function_cache = FunctionCache.FunctionCache(cache)
+
+        self.__token_cache = None
+        if cache is not None and cache_tokens:
+            import TokenCache
+            self.__token_cache = TokenCache.TokenCache(cache)
+
+        self.__ast_cache = None
+        if cache is not None and cache_ast:
+            import ASTCache
+            self.__ast_cache = ASTCache.ASTCache(cache)
+
+    def get_socket_path(self):
+        return self.__socket_path
+
+    def serve_forever(self):
+        LexAndYacc.Lex.get_instance()
+        LexAndYacc.Yacc.get_instance()
+
+        try:
+            asyncio.run(self.__serve())
+        except KeyboardInterrupt:
+            pass
+
+    async def __serve(self):
+        # a socket file left by a server that didn't shut down cleanly
+        if os.path.exists(self.__socket_path) and not is_server_running(self.__socket_path):
+            os.remove(self.__socket_path)
+
+        server = await asyncio.start_unix_server(self.__handle_client, path=self.__socket_path,
+                                                 limit=MAX_MESSAGE_SIZE_IN_BYTES)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
+
+    async def __handle_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    response = {"dumps": {}, "asm": None, "error": "bad request: " + str(error)}
+                else:
+                    response = await loop.run_in_executor(None, compile_request, request,
+                                                          self.__function_cache, self.__token_cache,
+                                                          self.__ast_cache)
+
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class CompileClient:
+    """
+    Forwards compilations to a running CompileServer, the connection
+    is opened on the first request and kept for the next ones
+    """
+
+    def __init__(self, socket_path):
+        self.__socket_path = socket_path
+        self.__socket = None
+        self.__file = None
+
+    def get_socket_path(self):
+        return self.__socket_path
+
+    def __connect(self):
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            self.__socket.connect(self.__socket_path)
+        except OSError:
+            self.close()
+            raise
+
+        self.__file = self.__socket.makefile("rwb")
+
+    def compile(self, code, emit=Compiler.EMIT_ASM, dumps=(), parser=Compiler.PARSER_YACC,
+                opt_level=Compiler.DEFAULT_OPT_LEVEL, ast_dump_format=ASTDump.DEFAULT_DUMP_FORMAT):
+        """
+        Returns the response of the server, raises OSError when
+        no server is listening on the socket
+        """
+
+        if self.__socket is None:
+            self.__connect()
+
+        try:
+            request = make_request(code, emit, dumps, parser, opt_level, ast_dump_format)
+            self.__file.write(json.dumps(request).encode("utf-8") + b"\n")
+            self.__file.flush()
+
+            line = self.__file.readline()
+        except OSError:
+            self.close()
+            raise
+
+        if not line:
+            self.close()
+            raise ConnectionError("the compile server closed the connection")
+
+        return json.loads(line)
+
+    def close(self):
+        if self.__file is not None:
+            try:
+                self.__file.close()
+            except OSError:
+                pass
+
+        if self.__socket is not None:
+            self.__socket.close()
+
+        self.__file = None
+        self.__socket = None
+
+
+def is_server_running(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+    return True
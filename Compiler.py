@@ -1,47 +1,771 @@
+import io
 import os
 
 import LexAndYacc
 import ASM_X86
+import ASTDump
+import CompilationContext
+import CompileCache
+import ConstantFolding
+import Fingerprint
+import FunctionCache
+import FunctionDedup
 import IR
-import XML_Writer
+import Profiler
+import RecursiveDescentParser
+import SemanticAnalyzer
+import SourceBuffer
+import Utils
 
+STAGE_LEX = "lex"
+STAGE_PARSE = "parse"
+STAGE_IR = "ir"
+STAGE_ASM = "asm"
+STAGE_ASSEMBLE = "assemble"
 
-class Compiler:
-    def __init__(self, src_file):
+STAGES = (STAGE_LEX, STAGE_PARSE, STAGE_IR, STAGE_ASM, STAGE_ASSEMBLE)
+
+EMIT_TOKENS = "tokens"
+EMIT_AST = "ast"
+EMIT_IR = "ir"
+EMIT_ASM = "asm"
+EMIT_EXE = "exe"
+
+# the last stage that has to run to produce each artifact
+EMIT_STAGES = {EMIT_TOKENS: STAGE_LEX,
+               EMIT_AST: STAGE_PARSE,
+               EMIT_IR: STAGE_IR,
+               EMIT_ASM: STAGE_ASM,
+               EMIT_EXE: STAGE_ASSEMBLE}
+
+# the stage after which each dump can be written
+DUMP_STAGES = {EMIT_TOKENS: STAGE_LEX,
+               EMIT_AST: STAGE_PARSE,
+               EMIT_IR: STAGE_IR,
+               EMIT_ASM: STAGE_ASM}
+
+PARSER_YACC = "yacc"
+PARSER_RD = "rd"
+
+# the front ends build the same AST and symbol tables, rd is the hand written parser
+PARSERS = (PARSER_YACC, PARSER_RD)
+
+# at -O0 the functions are lowered to IR while they are parsed, see DirectLowering
+OPT_LEVELS = (0, 1)
+DEFAULT_OPT_LEVEL = 1
+
+ML_PATH = "C:\\masm32\\bin\\ml"
+LINK_PATH = "C:\\masm32\\bin\\link"
+
+
+def write_tokens(token_stream):
+    # the lines are joined once, adding them to a string one by one is quadratic
+    lines = [str(token.lineno) + " " + token.type + " " + token.get_text() + "\n"
+             for token in token_stream.iter_tokens()]
+
+    string = "".join(lines)
+    return string
+
+
+def write_ast(main_AST, dump_format=ASTDump.DEFAULT_DUMP_FORMAT):
+    file = io.StringIO()
+    ASTDump.write_dump(main_AST, file, dump_format)
+
+    return file.getvalue()
+
+
+def write_ir(ir_program):
+    bb_text = "".join(function.write_basic_blocks() + "\n" for function in ir_program.get_all_functions())
+
+    return bb_text
+
+
+def assemble(asm_file):
+    import subprocess
+
+    # ml writes the .obj and .exe files to its working directory,
+    # so run it next to the asm file instead of changing our own
+    try:
+        ret = subprocess.run([ML_PATH, "/coff", asm_file, "-link", "/subsystem:console"],
+                             cwd=os.path.dirname(asm_file))
+    except OSError:
+        Utils.Utils.handle_compiler_error("Failed to run the assembler" + " " + ML_PATH)
+        return -1
+
+    return ret.returncode
+
+
+def link(obj_file):
+    import subprocess
+
+    try:
+        ret = subprocess.run([LINK_PATH, "/subsystem:console", obj_file],
+                             cwd=os.path.dirname(obj_file))
+    except OSError:
+        Utils.Utils.handle_compiler_error("Failed to run the linker" + " " + LINK_PATH)
+        return -1
+
+    return ret.returncode
+
+
+class CompilationResult:
+    def __init__(self):
+        self.__artifacts = {}
+        self.__dumps = {}
+
+    def set_artifact(self, stage, artifact):
+        self.__artifacts[stage] = artifact
+
+    def get_artifact(self, stage):
+        return self.__artifacts.get(stage)
+
+    def add_dump(self, kind, text):
+        self.__dumps[kind] = text
+
+    def get_dump(self, kind):
+        return self.__dumps.get(kind)
+
+    def get_all_dumps(self):
+        return self.__dumps
+
+
+class FunctionLowering:
+    """
+    Generates the IR of one analyzed function at a time, the unchanged
+    functions are taken from the function cache when there is one
+    """
+
+    def __init__(self, compilation_context, function_cache=None):
+        self.__ir_gen = IR.IR_Generator(compilation_context)
+        self.__function_cache = function_cache
+        self.__fingerprint = None
+
+        if function_cache is not None:
+            self.__fingerprint = Fingerprint.AST_Fingerprint(compilation_context.get_functions_table())
+
+    def gen_function(self, function):
+        if self.__function_cache is None:
+            return self.__ir_gen.gen_function(function)
+
+        function_fingerprint = self.__fingerprint.fingerprint(function)
+        entry = self.__function_cache.get(function_fingerprint)
+
+        if entry is not None:
+            return IR.IR_PrecompiledFunction(function.get_name(), entry.get_ir_function(), entry.get_code())
+
+        ir_function = self.__ir_gen.gen_function(function)
+        ir_function.set_fingerprint(function_fingerprint)
+
+        return ir_function
+
+
+class DirectLowering:
+    """
+    Takes the place of the AST_Program in the parse of a -O0 build. Every
+    function is analyzed and lowered to IR as soon as the parser reduces it,
+    so the AST of the whole program is never built and the AST of a function
+    can be freed before the next one is parsed.
+    """
+
+    def __init__(self, compilation_context, function_cache=None):
+        self.__analyzer = SemanticAnalyzer.SemanticAnalyzer(compilation_context)
+        self.__lowering = FunctionLowering(compilation_context, function_cache)
+        self.__ir_program = IR.IR_Program()
+
+    def add_function(self, function):
+        self.__analyzer.declare_function(function)
+        self.__analyzer.analyze_function(function)
+
+        self.__ir_program.add_function(self.__lowering.gen_function(function))
+
+    def get_ir_program(self):
+        return self.__ir_program
+
+
+class Pipeline:
+    """
+    Runs the compiler stages in order and stops after the stage the
+    emitted artifact needs. A dump is only built when it was requested.
+    With an ast_cache an unchanged source starts at the IR generation.
+    With an ast_dump_file the AST dump is streamed to it instead of being kept
+    in the result, in ast_dump_format (see ASTDump).
+    """
+
+    def __init__(self, emit=EMIT_ASM, dumps=(), function_cache=None, profiler=None, token_cache=None,
+                 parser=PARSER_YACC, opt_level=DEFAULT_OPT_LEVEL, ast_cache=None,
+                 ast_dump_format=ASTDump.DEFAULT_DUMP_FORMAT, ast_dump_file=None):
+        if emit not in EMIT_STAGES:
+            raise ValueError("unknown emit kind " + str(emit))
+
+        if parser not in PARSERS:
+            raise ValueError("unknown parser " + str(parser))
 
-        with open(src_file, "r") as source_file:
-            code = source_file.read()
+        if opt_level not in OPT_LEVELS:
+            raise ValueError("unknown optimization level " + str(opt_level))
 
-        LexAndYacc.Lex.get_instance().parse_to_tokens(code)
-        main_AST = LexAndYacc.Yacc.get_instance().pars(code)
+        for kind in dumps:
+            if kind not in DUMP_STAGES:
+                raise ValueError("unknown dump kind " + str(kind))
 
-        program_in_xml = XML_Writer.AST_XML_Program()
+        if ast_dump_format not in ASTDump.DUMP_FORMATS:
+            raise ValueError("unknown ast dump format " + str(ast_dump_format))
 
-        ast_text = program_in_xml.write_xml(main_AST)
-        print(ast_text)
+        if ast_dump_file is not None and EMIT_AST not in dumps:
+            dumps = tuple(dumps) + (EMIT_AST,)
 
-        ir_gen = IR.IR_Generator()
-        ir_program = ir_gen.gen(main_AST)
+        self.__last_stage = STAGES.index(EMIT_STAGES[emit])
+        self.__dumps = dumps
+        self.__function_cache = function_cache
+        self.__token_cache = token_cache
+        self.__ast_cache = ast_cache
+        self.__parser = parser
+        self.__opt_level = opt_level
+        self.__ast_dump_format = ast_dump_format
+        self.__ast_dump_file = ast_dump_file
 
-        all_function = ir_program.get_all_functions()
+        if profiler is None:
+            profiler = Profiler.NullProfiler()
 
-        bb_text = ""
+        self.__profiler = profiler
 
-        for function in all_function:
-            bb_text += function.write_basic_blocks() + "\n"
+    def __should_run(self, stage):
+        return STAGES.index(stage) <= self.__last_stage
 
-        print(bb_text)
+    def __should_dump(self, kind):
+        return kind in self.__dumps
 
-        asm = ASM_X86.ASM_X86_Generator()
+    def run_lex(self, source):
+        return LexAndYacc.Lex.get_instance().scan(source, self.__token_cache)
+
+    def run_parse(self, token_stream, program=None):
+        if self.__parser == PARSER_RD:
+            return RecursiveDescentParser.RecursiveDescentParser(token_stream, program).pars()
+
+        return LexAndYacc.Yacc.get_instance().pars(token_stream, program)
+
+    def run_analyze(self, main_AST, compilation_context):
+        return SemanticAnalyzer.SemanticAnalyzer(compilation_context).analyze(main_AST)
+
+    def __should_use_ast_cache(self):
+        # the tokens are not cached with the AST
+        return self.__ast_cache is not None and self.__should_run(STAGE_PARSE) and \
+            not self.__should_dump(EMIT_TOKENS)
+
+    def __should_use_function_cache(self):
+        # functions loaded from the disk cache have no IR to dump
+        return self.__function_cache is not None and not self.__should_dump(EMIT_IR)
+
+    def __get_function_cache(self):
+        if not self.__should_use_function_cache():
+            return None
+
+        return self.__function_cache
+
+    def __should_lower_directly(self):
+        # the AST is only needed whole for its dump and artifact
+        return self.__opt_level == 0 and self.__should_run(STAGE_IR) and not self.__should_dump(EMIT_AST)
+
+    def run_fold(self, main_AST):
+        return ConstantFolding.ConstantFolder().fold(main_AST)
+
+    def run_dedup(self, main_AST, compilation_context):
+        return FunctionDedup.FunctionDeduplicator(compilation_context).deduplicate(main_AST)
+
+    def run_ir(self, main_AST, compilation_context):
+        if not self.__should_use_function_cache():
+            return IR.IR_Generator(compilation_context).gen(main_AST)
+
+        lowering = FunctionLowering(compilation_context, self.__function_cache)
+        ir_program = IR.IR_Program()
+
+        for function in main_AST.get_functions():
+            ir_program.add_function(lowering.gen_function(function))
+
+        return ir_program
+
+    def run_direct_ir(self, token_stream, compilation_context):
+        direct_lowering = DirectLowering(compilation_context, self.__get_function_cache())
+        self.run_parse(token_stream, direct_lowering)
+
+        return direct_lowering.get_ir_program()
+
+    def run_asm(self, ir_program, compilation_context):
+        asm = ASM_X86.ASM_X86_Generator(compilation_context)
         asm_code = asm.gen(ir_program)
-        print(asm_code)
 
-        file_name = os.path.join(os.getcwd(), src_file.rsplit('.', maxsplit=1)[0] + ".asm")
-        os.chdir(os.path.dirname(src_file))
-        with open(file_name, "w") as file:
-            file.write(asm_code)
+        if self.__should_use_function_cache():
+            for function in ir_program.get_all_functions():
+                if not isinstance(function, IR.IR_Function) or function.get_fingerprint() is None:
+                    continue
+
+                self.__function_cache.put(function.get_fingerprint(), function,
+                                          asm.get_function_code(function.get_name()))
+
+        return asm_code
+
+    def run_assemble(self, asm_file):
+        return assemble(asm_file)
+
+    def run(self, code):
+        """
+        Compiles code, the source text or a SourceBuffer
+        """
+
+        if isinstance(code, str):
+            code = SourceBuffer.SourceBuffer.from_text(code)
+
+        # every compilation unit starts with empty tables, the lexer and
+        # the parser are shared since they are expensive to build
+        compilation_context = CompilationContext.CompilationContext()
+
+        result = CompilationResult()
+        profiler = self.__profiler
+
+        if self.__should_use_ast_cache():
+            with profiler.stage("ast cache lookup"):
+                program = self.__ast_cache.load(code)
+
+            if program is not None:
+                main_AST, compilation_context = program
+                return self.__run_from_ast(main_AST, compilation_context, result)
+
+        with profiler.stage(STAGE_LEX):
+            token_stream = self.run_lex(code)
+        result.set_artifact(STAGE_LEX, token_stream)
+
+        profiler.add_count("tokens", token_stream.get_num_of_tokens())
+
+        if self.__should_dump(EMIT_TOKENS):
+            with profiler.stage("dump " + EMIT_TOKENS):
+                result.add_dump(EMIT_TOKENS, write_tokens(token_stream))
+
+        if not self.__should_run(STAGE_PARSE):
+            return result
+
+        if self.__should_lower_directly():
+            # there is no AST artifact, the parse stage also analyzes and lowers the functions
+            with profiler.stage(STAGE_PARSE + " and " + STAGE_IR):
+                ir_program = self.run_direct_ir(token_stream, compilation_context)
+
+            return self.__run_from_ir(ir_program, compilation_context, result)
+
+        with profiler.stage(STAGE_PARSE):
+            main_AST = self.run_parse(token_stream)
+
+        # the AST artifact and dump are the analyzed AST, with the symbol table names
+        with profiler.stage("analyze"):
+            main_AST = self.run_analyze(main_AST, compilation_context)
+
+        if self.__should_use_ast_cache():
+            with profiler.stage("ast cache store"):
+                self.__ast_cache.store(code, main_AST)
+
+        return self.__run_from_ast(main_AST, compilation_context, result)
+
+    def __run_from_ast(self, main_AST, compilation_context, result):
+        profiler = self.__profiler
+
+        result.set_artifact(STAGE_PARSE, main_AST)
+
+        profiler.count_ast(main_AST)
+
+        if self.__should_dump(EMIT_AST):
+            with profiler.stage("dump " + EMIT_AST):
+                if self.__ast_dump_file is not None:
+                    ASTDump.write_dump(main_AST, self.__ast_dump_file, self.__ast_dump_format)
+                else:
+                    result.add_dump(EMIT_AST, write_ast(main_AST, self.__ast_dump_format))
+
+        if not self.__should_run(STAGE_IR):
+            return result
+
+        if self.__opt_level >= 1:
+            # before the dedup, functions that only differ in foldable expressions get the same code
+            with profiler.stage("fold"):
+                eliminated_nodes = self.run_fold(main_AST)
+
+            profiler.add_count("folded nodes", eliminated_nodes)
+
+            with profiler.stage("dedup"):
+                removed_functions = self.run_dedup(main_AST, compilation_context)
+
+            profiler.add_count("deduplicated functions", removed_functions)
+
+        with profiler.stage(STAGE_IR):
+            ir_program = self.run_ir(main_AST, compilation_context)
+
+        return self.__run_from_ir(ir_program, compilation_context, result)
+
+    def __run_from_ir(self, ir_program, compilation_context, result):
+        profiler = self.__profiler
+
+        result.set_artifact(STAGE_IR, ir_program)
+
+        profiler.count_ir(ir_program)
+
+        if self.__should_dump(EMIT_IR):
+            with profiler.stage("dump " + EMIT_IR):
+                result.add_dump(EMIT_IR, write_ir(ir_program))
+
+        if not self.__should_run(STAGE_ASM):
+            return result
+
+        with profiler.stage(STAGE_ASM):
+            asm_code = self.run_asm(ir_program, compilation_context)
+        result.set_artifact(STAGE_ASM, asm_code)
+
+        if self.__should_dump(EMIT_ASM):
+            result.add_dump(EMIT_ASM, asm_code)
+
+        return result
+
+    def get_profiler(self):
+        return self.__profiler
+
+    def get_parser(self):
+        return self.__parser
+
+    def get_opt_level(self):
+        return self.__opt_level
+
+    def get_ast_dump_format(self):
+        return self.__ast_dump_format
+
+    def needs_assemble(self):
+        return self.__should_run(STAGE_ASSEMBLE)
+
+    def get_options(self):
+        # the settings that change the generated code, they are part of the cache key
+        return (self.__opt_level,)
+
+
+def compile_source(code, emit=EMIT_ASM, cache=None, function_cache=None, parser=PARSER_YACC,
+                   opt_level=DEFAULT_OPT_LEVEL, ast_dump_format=ASTDump.DEFAULT_DUMP_FORMAT):
+    """
+    Compiles the source text in memory and returns the requested artifact
+    ("tokens", "ast", "ir" or "asm") as a string, without touching the filesystem.
+    The asm is looked up in and stored to cache when one is given, unchanged
+    functions are taken from function_cache.
+    """
+
+    if emit not in DUMP_STAGES:
+        raise ValueError("can't emit " + str(emit) + " in memory")
+
+    pipeline = Pipeline(emit, (emit,), function_cache, None, None, parser, opt_level, None, ast_dump_format)
+
+    key = None
+
+    if cache is not None and emit == EMIT_ASM:
+        key = CompileCache.CompileCache.make_key(code, pipeline.get_options())
+
+        asm_code = cache.load_asm(key)
+        if asm_code is not None:
+            return asm_code
+
+    result = pipeline.run(code)
+
+    if key is not None:
+        cache.store_asm(key, result.get_dump(emit))
+
+    return result.get_dump(emit)
+
+
+class Compiler:
+    def __init__(self, emit=EMIT_EXE, dumps=(), cache=None, client=None, profiler=None, cache_tokens=False,
+                 parser=PARSER_YACC, opt_level=DEFAULT_OPT_LEVEL, cache_ast=False,
+                 ast_dump_format=ASTDump.DEFAULT_DUMP_FORMAT, ast_dump_file=None):
+        # artifacts that are not written to a file are printed like a dump
+        if emit not in (EMIT_ASM, EMIT_EXE) and emit not in dumps:
+            dumps = tuple(dumps) + (emit,)
+
+        # the ast dump file is written by the pipeline of this process
+        if ast_dump_file is not None and EMIT_AST not in dumps:
+            dumps = tuple(dumps) + (EMIT_AST,)
+
+        function_cache = None
+        token_cache = None
+        ast_cache = None
+
+        if cache is not None:
+            function_cache = FunctionCache.FunctionCache(cache)
+
+            if cache_tokens:
+                import TokenCache
+                token_cache = TokenCache.TokenCache(cache)
+
+            if cache_ast:
+                import ASTCache
+                ast_cache = ASTCache.ASTCache(cache)
+
+        self.__emit = emit
+        self.__dumps = tuple(dumps)
+        self.__pipeline = Pipeline(emit, dumps, function_cache, profiler, token_cache, parser, opt_level,
+                                   ast_cache, ast_dump_format, ast_dump_file)
+        self.__cache = cache
+        self.__cache_tokens = cache_tokens
+        self.__cache_ast = cache_ast
+
+        # a CompileServer.CompileClient, the stages up to the asm run on the server
+        self.__client = client
+
+    def get_emit(self):
+        return self.__emit
+
+    def get_dumps(self):
+        return self.__dumps
+
+    def get_cache(self):
+        return self.__cache
+
+    def get_cache_tokens(self):
+        return self.__cache_tokens
+
+    def get_cache_ast(self):
+        return self.__cache_ast
+
+    def get_client(self):
+        return self.__client
+
+    def get_parser(self):
+        return self.__pipeline.get_parser()
+
+    def get_opt_level(self):
+        return self.__pipeline.get_opt_level()
+
+    def get_ast_dump_format(self):
+        return self.__pipeline.get_ast_dump_format()
+
+    def get_profiler(self):
+        return self.__pipeline.get_profiler()
+
+    def compile_file(self, src_file):
+        ret, output, cache_hit = self.__compile(src_file)
+
+        if output:
+            print(output)
+
+        return ret
+
+    def __can_use_cache(self):
+        if self.__cache is None:
+            return False
+
+        if self.__emit not in (EMIT_ASM, EMIT_EXE):
+            return False
+
+        # the asm dump is the cached artifact itself, the others need the stages to run
+        for kind in self.__dumps:
+            if kind != EMIT_ASM:
+                return False
+
+        return True
+
+    def __run(self, source):
+        if self.__client is not None:
+            try:
+                response = self.__client.compile(source.get_text(), self.__emit, self.__dumps,
+                                                 self.__pipeline.get_parser(), self.__pipeline.get_opt_level(),
+                                                 self.__pipeline.get_ast_dump_format())
+            except OSError:
+                # no server is running, compile in this process from now on
+                self.__client = None
+            else:
+                if response["error"] is not None:
+                    Utils.Utils.handle_compiler_error(response["error"])
+
+                return response["dumps"], response["asm"]
+
+        result = self.__pipeline.run(source)
+        return result.get_all_dumps(), result.get_artifact(STAGE_ASM)
+
+    def __compile(self, src_file):
+        # large sources are mapped instead of read, the tokens point into the mapping
+        with SourceBuffer.SourceBuffer.from_file(src_file) as source:
+            return self.__compile_source(src_file, source)
+
+    def __compile_source(self, src_file, source):
+        key = None
+        cache_hit = None
+        asm_code = None
+
+        profiler = self.__pipeline.get_profiler()
+
+        if self.__can_use_cache():
+            with profiler.stage("cache lookup"):
+                key = CompileCache.CompileCache.make_key(source.get_buffer(), self.__pipeline.get_options())
+                asm_code = self.__cache.load_asm(key)
+            cache_hit = asm_code is not None
+
+        if asm_code is None:
+            dumps, asm_code = self.__run(source)
+            output = "\n".join(dumps.values())
+
+            if self.__emit not in (EMIT_ASM, EMIT_EXE):
+                return 0, output, cache_hit
+
+            if key is not None:
+                with profiler.stage("cache store"):
+                    self.__cache.store_asm(key, asm_code)
+
+        elif EMIT_ASM in self.__dumps:
+            output = asm_code
+        else:
+            output = ""
+
+        base_name = os.path.abspath(src_file.rsplit('.', maxsplit=1)[0])
+
+        file_name = base_name + ".asm"
+        with profiler.stage("write output"):
+            with open(file_name, "w") as file:
+                file.write(asm_code)
+
+        if not self.__pipeline.needs_assemble():
+            return 0, output, cache_hit
+
+        obj_file = base_name + ".obj"
+
+        if cache_hit and self.__cache.load_object(key, obj_file):
+            return link(obj_file), output, cache_hit
+
+        with profiler.stage(STAGE_ASSEMBLE):
+            ret = self.__pipeline.run_assemble(file_name)
+
+        if ret == 0 and key is not None and os.path.exists(obj_file):
+            self.__cache.store_object(key, obj_file)
+
+        return ret, output, cache_hit
+
+    def compile_unit(self, src_file):
+        """
+        Compiles a single file and returns its UnitResult, the dumps are
+        kept in the result instead of being printed
+        """
+
+        try:
+            ret, output, cache_hit = self.__compile(src_file)
+        except Utils.CompilerError as error:
+            return UnitResult(src_file, -1, str(error), "", None)
+        except OSError as error:
+            return UnitResult(src_file, -1, str(error), "", None)
+        except RecursionError:
+            return UnitResult(src_file, -1, "Compiler error: the program is nested too deeply", "", None)
+        except Exception as error:
+            # a bug in one unit must not stop the other files of the batch or the worker running them
+            return UnitResult(src_file, -1, "Compiler error: " + type(error).__name__ + ": " + str(error), "", None)
+
+        return UnitResult(src_file, ret, None, output, cache_hit)
+
+    def compile_files(self, src_files, jobs=1):
+        """
+        Compiles all the files, a failing file doesn't stop the others.
+        With more than one job the files are spread over a process pool,
+        the results are returned in the order of src_files either way.
+        """
+
+        if jobs <= 1 or len(src_files) <= 1:
+            return [self.compile_unit(src_file) for src_file in src_files]
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        cache_dir = None
+        cache_max_size = None
+        server_path = None
+
+        if self.__cache is not None:
+            cache_dir = self.__cache.get_cache_dir()
+            cache_max_size = self.__cache.get_max_size()
+
+        if self.__client is not None:
+            server_path = self.__client.get_socket_path()
+
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 initializer=_init_worker,
+                                 initargs=(self.__emit, self.__dumps, cache_dir, cache_max_size,
+                                           server_path, self.__cache_tokens,
+                                           self.__pipeline.get_parser(),
+                                           self.__pipeline.get_opt_level(),
+                                           self.__cache_ast,
+                                           self.__pipeline.get_ast_dump_format())) as executor:
+            return list(executor.map(_compile_unit_in_worker, src_files))
+
+
+class UnitResult:
+    def __init__(self, path, return_code, error, output, cache_hit):
+        self.__path = path
+        self.__return_code = return_code
+        self.__error = error
+        self.__output = output
+
+        # None when the cache wasn't used for this file
+        self.__cache_hit = cache_hit
+
+    def get_path(self):
+        return self.__path
+
+    def get_return_code(self):
+        return self.__return_code
+
+    def get_error(self):
+        return self.__error
+
+    def get_output(self):
+        return self.__output
+
+    def get_cache_hit(self):
+        return self.__cache_hit
+
+    def succeeded(self):
+        return self.__return_code == 0
+
+
+# the compiler of a process pool worker, built once per worker
+_worker_compiler = None
+
+
+def _init_worker(emit, dumps, cache_dir, cache_max_size, server_path, cache_tokens, parser, opt_level, cache_ast,
+                 ast_dump_format):
+    global _worker_compiler
+
+    cache = None
+    if cache_dir is not None:
+        cache = CompileCache.CompileCache(cache_dir, cache_max_size)
+
+    client = None
+    if server_path is not None:
+        import CompileServer
+        client = CompileServer.CompileClient(server_path)
+
+    _worker_compiler = Compiler(emit, dumps, cache, client, None, cache_tokens, parser, opt_level, cache_ast,
+                                ast_dump_format)
+
+    # build the lexer and parser tables before the first file arrives
+    LexAndYacc.Lex.get_instance()
+
+    if parser == PARSER_YACC:
+        LexAndYacc.Yacc.get_instance()
+
+
+def _compile_unit_in_worker(src_file):
+    return _worker_compiler.compile_unit(src_file)
+
+
+def find_source_files(paths):
+    """
+    Expands the directories in paths to the .u files under them
+    """
+
+    src_files = []
+
+    for path in paths:
+        if not os.path.isdir(path):
+            src_files.append(path)
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
 
-        ret = os.system("C:\\masm32\\bin\\ml /coff" + " " + file_name + " " + "-link /subsystem:console")
+            for file in sorted(files):
+                if file.endswith(".u"):
+                    src_files.append(os.path.join(root, file))
 
-        if ret != 0:
-            exit(-1)
+    return src_files
@@ -1,3 +1,6 @@
 from typing import Final
 
 MAX_ARRAY_SIZE: Final[int] = 1000
+
+# part of every cache key, bump it when the generated code changes
+COMPILER_VERSION: Final[str] = "1.2"
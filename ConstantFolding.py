@@ -0,0 +1,313 @@
+import DataTypes
+import Traversal
+from AST_Visitor import *
+
+INT_32_BITS = 32
+INT_32_MIN = -2 ** (INT_32_BITS - 1)
+INT_32_MAX = 2 ** (INT_32_BITS - 1) - 1
+
+
+def wrap_int_32(value):
+    value &= 2 ** INT_32_BITS - 1
+
+    if value > INT_32_MAX:
+        value -= 2 ** INT_32_BITS
+
+    return value
+
+
+def fold_operation(operator, value_1, value_2):
+    """
+    Computes value_1 operator value_2 like the generated code does: the int_32
+    operations wrap around, the division and the remainder are the ones of idiv,
+    the quotient is truncated toward zero and the remainder has the sign of
+    value_1. Returns None when idiv would fault, on a zero divisor and on
+    INT_32_MIN / -1, those are left to the run time.
+    """
+
+    if isinstance(operator, AST.AST_Add_Operator):
+        return wrap_int_32(value_1 + value_2)
+
+    if isinstance(operator, AST.AST_Sub_Operator):
+        return wrap_int_32(value_1 - value_2)
+
+    if isinstance(operator, AST.AST_Mul_Operator):
+        return wrap_int_32(value_1 * value_2)
+
+    if value_2 == 0 or (value_1 == INT_32_MIN and value_2 == -1):
+        return None
+
+    quotient = abs(value_1) // abs(value_2)
+    if (value_1 < 0) != (value_2 < 0):
+        quotient = -quotient
+
+    if isinstance(operator, AST.AST_Div_Operator):
+        return quotient
+
+    return value_1 - value_2 * quotient
+
+
+class ConstantFolder(AST_Visitor):
+    """
+    Replaces the expressions of int_32 literals with their value and drops the
+    operations that don't change their operand (x + 0, x - 0, x * 1, x / 1).
+    x * 0 and x % 1 become 0 when x has no calls and no division, which could
+    fault, so nothing the program does is lost. v - v of a variable becomes 0 too.
+    An expression keeps its data type, an operand only replaces it when it has
+    the same one.
+    Runs on the analyzed AST, every visit returns the node that replaces the
+    visited one.
+    """
+
+    def __init__(self):
+        self.__num_of_eliminated_nodes = 0
+
+    def fold(self, main_AST):
+        """
+        Returns the number of AST nodes removed from main_AST
+        """
+
+        self.__num_of_eliminated_nodes = 0
+
+        Traversal.run(self.visit(main_AST, None))
+
+        return self.__num_of_eliminated_nodes
+
+    def __replace(self, node, num_of_eliminated_nodes):
+        self.__num_of_eliminated_nodes += num_of_eliminated_nodes
+
+        return node
+
+    @staticmethod
+    def __get_int_32_value(node):
+        if not isinstance(node, AST.AST_Integer) or node.get_data_type() is not DataTypes.int_32():
+            return None
+
+        # the lexer keeps the text of the literal
+        return wrap_int_32(int(node.get_value()))
+
+    @staticmethod
+    def __count_pure_nodes(node):
+        """
+        Returns the number of nodes of node, or None when it calls a function or divides
+        """
+
+        count = 0
+
+        for child in AST.iter_nodes(node):
+            if isinstance(child, (AST.AST_FunctionCall, AST.AST_Div_Operator, AST.AST_Remainder_Operator)):
+                return None
+
+            count += 1
+
+        return count
+
+    def __simplify(self, expression):
+        operator = expression.get_operator()
+        expression_1 = expression.get_expression_1()
+        expression_2 = expression.get_expression_2()
+        data_type = expression.get_data_type()
+
+        value_1 = self.__get_int_32_value(expression_1)
+        value_2 = self.__get_int_32_value(expression_2)
+
+        if value_1 is not None and value_2 is not None and data_type is DataTypes.int_32():
+            value = fold_operation(operator, value_1, value_2)
+
+            if value is not None:
+                # the expression, its operator and both literals become one literal
+                return self.__replace(AST.AST_Integer(str(value), data_type), 3)
+
+        # the operand that is the value of the expression
+        operand = None
+
+        if isinstance(operator, AST.AST_Add_Operator):
+            if value_2 == 0:
+                operand = expression_1
+            elif value_1 == 0:
+                operand = expression_2
+
+        elif isinstance(operator, AST.AST_Sub_Operator):
+            if value_2 == 0:
+                operand = expression_1
+            elif isinstance(expression_1, AST.AST_Variable) and isinstance(expression_2, AST.AST_Variable) and \
+                    expression_1.get_name() == expression_2.get_name():
+                return self.__replace(AST.AST_Integer("0", data_type), 3)
+
+        elif isinstance(operator, AST.AST_Mul_Operator):
+            if value_2 == 1:
+                operand = expression_1
+            elif value_1 == 1:
+                operand = expression_2
+            elif value_1 == 0 or value_2 == 0:
+                other = expression_2 if value_1 == 0 else expression_1
+                num_of_nodes = self.__count_pure_nodes(other)
+
+                if num_of_nodes is not None:
+                    return self.__replace(AST.AST_Integer("0", data_type), num_of_nodes + 2)
+
+        elif isinstance(operator, AST.AST_Div_Operator):
+            if value_2 == 1:
+                operand = expression_1
+
+        elif isinstance(operator, AST.AST_Remainder_Operator):
+            if value_2 == 1:
+                num_of_nodes = self.__count_pure_nodes(expression_1)
+
+                if num_of_nodes is not None:
+                    return self.__replace(AST.AST_Integer("0", data_type), num_of_nodes + 2)
+
+        if operand is not None and operand.get_data_type() is data_type:
+            # the expression, its operator and the literal are dropped
+            return self.__replace(operand, 3)
+
+        return expression
+
+    @visitor(AST.AST_Program)
+    def visit(self, program, context):
+        for function in program.get_functions():
+            yield self.visit(function, context)
+
+        return program
+
+    @visitor(AST.AST_Function)
+    def visit(self, function, context):
+        yield self.visit(function.get_code_block(), context)
+
+        return function
+
+    @visitor(AST.AST_CodeBlock)
+    def visit(self, code_block, context):
+        for statement in code_block.get_all_statements():
+            if statement is None:
+                continue
+
+            yield self.visit(statement, context)
+
+        return code_block
+
+    @visitor(AST.AST_Integer)
+    def visit(self, integer, context):
+        return integer
+
+    @visitor(AST.AST_ArrayCell)
+    def visit(self, get_value_from_array, context):
+        get_value_from_array.set_index((yield self.visit(get_value_from_array.get_index(), context)))
+
+        return get_value_from_array
+
+    @visitor(AST.AST_Variable)
+    def visit(self, variable, context):
+        return variable
+
+    @visitor(AST.AST_Array)
+    def visit(self, array, context):
+        return array
+
+    @visitor(AST.AST_Expression)
+    def visit(self, expression, context):
+        expression_1 = yield self.visit(expression.get_expression_1(), context)
+        expression_2 = yield self.visit(expression.get_expression_2(), context)
+
+        expression.set_expressions(expression_1, expression_2)
+
+        return self.__simplify(expression)
+
+    @visitor(AST.AST_DefVar)
+    def visit(self, def_var, context):
+        yield self.visit(def_var.get_assignment(), context)
+
+        return def_var
+
+    @visitor(AST.AST_Assignment)
+    def visit(self, assignment, context):
+        assignment.set_value((yield self.visit(assignment.get_value(), context)))
+
+        return assignment
+
+    @visitor(AST.AST_IfStatement)
+    def visit(self, if_statement, context):
+        yield self.visit(if_statement.get_condition(), context)
+        yield self.visit(if_statement.get_then_part(), context)
+
+        if if_statement.get_else_part() is not None:
+            yield self.visit(if_statement.get_else_part(), context)
+
+        return if_statement
+
+    @visitor(AST.AST_ElseStatement)
+    def visit(self, else_statement, context):
+        yield self.visit(else_statement.get_code_block(), context)
+
+        return else_statement
+
+    @visitor(AST.AST_WhileLoopStatement)
+    def visit(self, while_loop_statement, context):
+        yield self.visit(while_loop_statement.get_condition(), context)
+        yield self.visit(while_loop_statement.get_code_block(), context)
+
+        return while_loop_statement
+
+    @visitor(AST.AST_Condition)
+    def visit(self, condition, context):
+        expression_1 = yield self.visit(condition.get_expression_1(), context)
+        expression_2 = yield self.visit(condition.get_expression_2(), context)
+
+        condition.set_expressions(expression_1, expression_2)
+
+        return condition
+
+    @visitor(AST.AST_ComplexCondition)
+    def visit(self, condition, context):
+        yield self.visit(condition.get_condition_1(), context)
+        yield self.visit(condition.get_condition_2(), context)
+
+        return condition
+
+    @visitor(AST.AST_ReadLine)
+    def visit(self, read_line_statement, context):
+        read_line_statement.set_num_of_chars((yield self.visit(read_line_statement.get_num_of_chars(), context)))
+
+        return read_line_statement
+
+    @visitor(AST.AST_Print)
+    def visit(self, print_statement, context):
+        print_statement.set_value((yield self.visit(print_statement.get_value(), context)))
+
+        return print_statement
+
+    @visitor(AST.AST_PrintArray)
+    def visit(self, print_array, context):
+        return print_array
+
+    @visitor(AST.AST_PrintString)
+    def visit(self, print_statement, context):
+        return print_statement
+
+    @visitor(AST.AST_Exit)
+    def visit(self, exit_statement, context):
+        exit_statement.set_exit_code((yield self.visit(exit_statement.get_exit_code(), context)))
+
+        return exit_statement
+
+    @visitor(AST.AST_FunctionCall)
+    def visit(self, function_call, context):
+        parameters = function_call.get_parameters()
+
+        for index, parameter in enumerate(parameters.get_all_parameters()):
+            parameters.set_parameter(index, (yield self.visit(parameter, context)))
+
+        return function_call
+
+    @visitor(AST.AST_ReturnStatement)
+    def visit(self, return_statement, context):
+        if return_statement.get_value() is not None:
+            return_statement.set_value((yield self.visit(return_statement.get_value(), context)))
+
+        return return_statement
+
+    @visitor(AST.AST_FunctionCallReturnValue)
+    def visit(self, function_call_return_value, context):
+        yield self.visit(function_call_return_value.get_function_call(), context)
+
+        return function_call_return_value
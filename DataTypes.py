@@ -13,25 +13,64 @@ CHAR_PRINT_FORMAT: Final[str] = "\"%c\\n\""
 ARRAY_PRINT_FORMAT: Final[str] = "\"%s\\n\""
 
 
+# the small integer id of every data type
+VOID_TYPE_ID: Final[int] = 0
+INT_32_TYPE_ID: Final[int] = 1
+CHAR_TYPE_ID: Final[int] = 2
+ARRAY_TYPE_ID: Final[int] = 3
+
+# the most arrays kept in the table of the shared arrays, it lives as long as
+# the process (--serve compiles many programs in one)
+MAX_SHARED_ARRAYS: Final[int] = 4096
+
+# whether a type accepts a value, by type id and whether the value is None.
+# void only takes no value, every other type takes any value
+COMPATIBILITY_TABLE: Final[tuple] = ((False, True),
+                                     (True, False),
+                                     (True, False),
+                                     (True, False))
+
+
 class FunctionRetType:
-    @abstractmethod
-    def is_compatible_with(self, value):
-        pass
+    __slots__ = ()
 
+    type_id = None
 
-class void(FunctionRetType):
     def is_compatible_with(self, value):
-        if value is None:
-            return True
+        return COMPATIBILITY_TABLE[self.type_id][value is None]
+
+
+class ScalarType(FunctionRetType):
+    """
+    The scalar types hold no state, so every type has a single instance
+    """
 
-        return False
+    __slots__ = ()
+
+    __instances = {}
+
+    def __new__(cls):
+        instance = ScalarType.__instances.get(cls)
+
+        if instance is None:
+            instance = ScalarType.__instances.setdefault(cls, super().__new__(cls))
+
+        return instance
+
+
+class void(ScalarType):
+    __slots__ = ()
+
+    type_id = VOID_TYPE_ID
 
 
 class FunctionParameter:
-    pass
+    __slots__ = ()
 
 
 class DataType(FunctionRetType, FunctionParameter):
+    __slots__ = ()
+
     @abstractmethod
     def get_size_in_bites(self):
         pass
@@ -41,44 +80,60 @@ class DataType(FunctionRetType, FunctionParameter):
         pass
 
 
-class int_32(DataType):
-    def __init__(self):
-        self.__size_in_bites = INT_32_SIZE_IN_BITES
+class int_32(ScalarType, DataType):
+    __slots__ = ()
+
+    type_id = INT_32_TYPE_ID
 
     def get_size_in_bites(self):
-        return self.__size_in_bites
+        return INT_32_SIZE_IN_BITES
 
     def get_print_format(self):
         return INT_32_PRINT_FORMAT
 
-    def is_compatible_with(self, value):
-        if value is not None:
-            return True
-
-        return False
 
+class char(ScalarType, DataType):
+    __slots__ = ()
 
-class char(DataType):
-    def __init__(self):
-        self.__size_in_bites = CHAR_SIZE_IN_BITES
+    type_id = CHAR_TYPE_ID
 
     def get_size_in_bites(self):
-        return self.__size_in_bites
+        return CHAR_SIZE_IN_BITES
 
     def get_print_format(self):
         return CHAR_PRINT_FORMAT
 
-    def is_compatible_with(self, value):
-        if value is not None:
-            return True
 
-        return False
+class Array(DataType):
+    """
+    Arrays are shared by their element type and size. The size is kept as an
+    int, the AST of the definition isn't kept alive by the type, and at most
+    MAX_SHARED_ARRAYS arrays are shared, the next ones get their own instance
+    """
 
+    __slots__ = ("__data_type", "__size")
 
-class Array(DataType):
-    def __init__(self, data_type, size):
-        self.__data_type = data_type
-        self.__size = size
+    __instances = {}
+
+    type_id = ARRAY_TYPE_ID
+
+    def __new__(cls, data_type, size):
+        key = (data_type, size)
+
+        instance = Array.__instances.get(key)
+
+        if instance is None:
+            instance = super().__new__(cls)
+            instance.__data_type = data_type
+            instance.__size = size
+
+            if len(Array.__instances) < MAX_SHARED_ARRAYS:
+                instance = Array.__instances.setdefault(key, instance)
+
+        return instance
+
+    def __getnewargs__(self):
+        return self.__data_type, self.__size
 
     def get_size_in_bites(self):
         return self.__data_type.get_size_in_bites()
@@ -91,9 +146,3 @@ class Array(DataType):
 
     def get_print_format(self):
         return ARRAY_PRINT_FORMAT
-
-    def is_compatible_with(self, value):
-        if value is not None:
-            return True
-
-        return False
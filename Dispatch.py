@@ -0,0 +1,89 @@
+def _qualname(obj):
+    return obj.__module__ + '.' + obj.__qualname__
+
+
+def _declaring_class(obj):
+    name = _qualname(obj)
+    return name[:name.rfind('.')]
+
+
+class Dispatcher:
+    """
+    Picks the method of a visitor for a node by the type of the node. The methods
+    are registered by the name of the class that declares them, since the class
+    doesn't exist yet when its methods are decorated. The first call with a visitor
+    class builds its jump table from the methods of the classes in its MRO, a node
+    type that has no method of its own takes the method of its closest base class
+    and the result is kept in the table, also when there is no method at all.
+    """
+
+    def __init__(self):
+        # declaring class name -> {node type: method}
+        self.__methods = {}
+
+        # visitor class -> {node type: method}
+        self.__tables = {}
+
+        self.__dispatch = self.__make_dispatch()
+
+    def register(self, arg_type):
+        def decorator(fn):
+            # the abstract declarations of the interface only document it
+            if not getattr(fn, "__isabstractmethod__", False):
+                self.__methods.setdefault(_declaring_class(fn), {})[arg_type] = fn
+
+            # a new method can change the table of any visitor class
+            self.__tables.clear()
+
+            return self.__dispatch
+
+        return decorator
+
+    def get_table(self, visitor_class):
+        table = self.__tables.get(visitor_class)
+
+        if table is None:
+            table = {}
+
+            # the base classes first, so the methods of the subclasses override theirs
+            for cls in reversed(visitor_class.__mro__):
+                table.update(self.__methods.get(_qualname(cls), {}))
+
+            self.__tables[visitor_class] = table
+
+        return table
+
+    def __resolve(self, table, visitor_class, arg_type):
+        for base in arg_type.__mro__[1:]:
+            method = table.get(base)
+
+            if method is not None:
+                break
+        else:
+            def method(visitor, arg, arg_2):
+                raise KeyError((_qualname(visitor_class), arg_type))
+
+        table[arg_type] = method
+
+        return method
+
+    def __make_dispatch(self):
+        tables = self.__tables
+        get_table = self.get_table
+        resolve = self.__resolve
+
+        # a plain function, so it binds to the visitor like the methods it replaces
+        def dispatch(visitor, arg, arg_2):
+            visitor_class = type(visitor)
+
+            table = tables.get(visitor_class)
+            if table is None:
+                table = get_table(visitor_class)
+
+            method = table.get(type(arg))
+            if method is None:
+                method = resolve(table, visitor_class, type(arg))
+
+            return method(visitor, arg, arg_2)
+
+        return dispatch
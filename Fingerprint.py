@@ -0,0 +1,304 @@
+import hashlib
+
+import Constance
+import DataTypes
+import Traversal
+from AST_Visitor import *
+
+
+class AST_Fingerprint(AST_Visitor):
+    """
+    Hashes everything the code of a function depends on: its AST, its
+    symbol tables, its prototype and the prototypes of the functions it calls
+    """
+
+    def __init__(self, functions_table):
+        self.__functions_table = functions_table
+
+        # the records of the function, they are hashed together at the end
+        self.__records = None
+
+    def fingerprint(self, function):
+        self.__records = []
+
+        self.__write(Constance.COMPILER_VERSION)
+        Traversal.run(self.visit(function, None))
+
+        string = "\x1e".join(self.__records) + "\x1e"
+        return hashlib.sha256(string.encode("utf-8")).hexdigest()
+
+    def __write(self, *parts):
+        self.__records.append("\x1f".join(map(str, parts)))
+
+    def _write_name(self, name):
+        self.__write("name", name)
+
+    def __write_data_type(self, data_type):
+        if isinstance(data_type, DataTypes.Array):
+            self.__write("array", data_type.get_array_size())
+            self.__write_data_type(data_type.get_data_type())
+            return
+
+        self.__write("data type", type(data_type).__name__)
+
+    def __write_prototype(self, function_name, prototype):
+        self.__write("prototype")
+        self._write_name(function_name)
+        self.__write_data_type(prototype.get_return_value_type())
+
+        for parameter in prototype.get_parameters().get_all_parameters():
+            self._write_name(parameter.get_name())
+            self.__write_data_type(parameter.get_data_type())
+
+    def __write_tables(self, tables):
+        for table in tables:
+            self.__write("table")
+
+            for var in table.get_all_vars():
+                self._write_name(var.get_name())
+                self.__write_data_type(var.get_data_type())
+
+            for array in table.get_all_arrays():
+                self._write_name(array.get_name())
+                self.__write_data_type(array.get_data())
+
+    def __visit_optional(self, node):
+        if node is None:
+            self.__write("none")
+            return
+
+        yield self.visit(node, None)
+
+    @visitor(AST.AST_Function)
+    def visit(self, function, context):
+        self.__write_prototype(function.get_name(), function.get_prototype())
+        self.__write_tables(function.get_all_tables())
+
+        yield self.visit(function.get_code_block(), None)
+
+    @visitor(AST.AST_CodeBlock)
+    def visit(self, code_block, context):
+        statements = code_block.get_all_statements()
+
+        self.__write("code block", len(statements))
+
+        for statement in statements:
+            yield self.__visit_optional(statement)
+
+    @visitor(AST.AST_Integer)
+    def visit(self, integer, context):
+        self.__write("integer", integer.get_value())
+        self.__write_data_type(integer.get_data_type())
+
+    @visitor(AST.AST_ArrayCell)
+    def visit(self, get_value_from_array, context):
+        self.__write("array cell")
+
+        yield self.visit(get_value_from_array.get_array_name(), None)
+        yield self.visit(get_value_from_array.get_index(), None)
+
+    @visitor(AST.AST_Variable)
+    def visit(self, variable, context):
+        self.__write("variable")
+
+        self._write_name(variable.get_name())
+        self.__write_data_type(variable.get_data_type())
+
+    @visitor(AST.AST_Array)
+    def visit(self, array, context):
+        self.__write("array")
+
+        self._write_name(array.get_name())
+        self.__write_data_type(array.get_data_type())
+
+    @visitor(AST.AST_Expression)
+    def visit(self, expression, context):
+        self.__write("expression")
+        self.__write_data_type(expression.get_data_type())
+
+        yield self.visit(expression.get_expression_1(), None)
+        yield self.visit(expression.get_operator(), None)
+        yield self.visit(expression.get_expression_2(), None)
+
+    @visitor(AST.AST_DefVar)
+    def visit(self, def_var, context):
+        self.__write("def var")
+
+        self._write_name(def_var.get_name())
+        yield self.visit(def_var.get_assignment(), None)
+
+    @visitor(AST.AST_Assignment)
+    def visit(self, assignment, context):
+        self.__write("assignment")
+
+        yield self.visit(assignment.get_dest(), None)
+        yield self.visit(assignment.get_value(), None)
+
+    @visitor(AST.AST_Add_Operator)
+    def visit(self, add_operator, context):
+        self.__write("+")
+
+    @visitor(AST.AST_Sub_Operator)
+    def visit(self, sub_operator, context):
+        self.__write("-")
+
+    @visitor(AST.AST_Mul_Operator)
+    def visit(self, mul_operator, context):
+        self.__write("*")
+
+    @visitor(AST.AST_Div_Operator)
+    def visit(self, dev_operator, context):
+        self.__write("/")
+
+    @visitor(AST.AST_Remainder_Operator)
+    def visit(self, dev_res_operator, context):
+        self.__write("%")
+
+    @visitor(AST.AST_LessOperator)
+    def visit(self, less_operator, context):
+        self.__write("<")
+
+    @visitor(AST.AST_GreaterOperator)
+    def visit(self, greater_operator, context):
+        self.__write(">")
+
+    @visitor(AST.AST_EqualityOperator)
+    def visit(self, equality_operator, context):
+        self.__write("==")
+
+    @visitor(AST.AST_NotEqualsOperator)
+    def visit(self, not_equals_operator, context):
+        self.__write("!=")
+
+    @visitor(AST.AST_AndOperator)
+    def visit(self, and_operator, context):
+        self.__write("&&")
+
+    @visitor(AST.AST_OrOperator)
+    def visit(self, or_operator, context):
+        self.__write("||")
+
+    @visitor(AST.AST_IfStatement)
+    def visit(self, if_statement, context):
+        self.__write("if")
+
+        yield self.visit(if_statement.get_condition(), None)
+        yield self.visit(if_statement.get_then_part(), None)
+        yield self.__visit_optional(if_statement.get_else_part())
+
+    @visitor(AST.AST_ElseStatement)
+    def visit(self, else_statement, context):
+        self.__write("else")
+
+        yield self.visit(else_statement.get_code_block(), None)
+
+    @visitor(AST.AST_WhileLoopStatement)
+    def visit(self, while_loop_statement, context):
+        self.__write("while")
+
+        yield self.visit(while_loop_statement.get_condition(), None)
+        yield self.visit(while_loop_statement.get_code_block(), None)
+
+    @visitor(AST.AST_Condition)
+    def visit(self, condition, context):
+        self.__write("condition")
+
+        yield self.visit(condition.get_expression_1(), None)
+        yield self.visit(condition.get_operator(), None)
+        yield self.visit(condition.get_expression_2(), None)
+
+    @visitor(AST.AST_ComplexCondition)
+    def visit(self, condition, context):
+        self.__write("complex condition")
+
+        yield self.visit(condition.get_condition_1(), None)
+        yield self.visit(condition.get_operator(), None)
+        yield self.visit(condition.get_condition_2(), None)
+
+    @visitor(AST.AST_ReadLine)
+    def visit(self, read_line_statement, context):
+        self.__write("read line")
+
+        self._write_name(read_line_statement.get_array_name())
+        yield self.visit(read_line_statement.get_num_of_chars(), None)
+
+    @visitor(AST.AST_Print)
+    def visit(self, print_statement, context):
+        self.__write("print", print_statement.get_print_format())
+
+        yield self.visit(print_statement.get_value(), None)
+
+    @visitor(AST.AST_PrintArray)
+    def visit(self, print_array, context):
+        self.__write("print array")
+
+        self._write_name(print_array.get_array_name())
+
+    @visitor(AST.AST_PrintString)
+    def visit(self, print_statement, context):
+        self.__write("print string", print_statement.get_string())
+
+    @visitor(AST.AST_Exit)
+    def visit(self, exit_statement, context):
+        self.__write("exit")
+
+        yield self.visit(exit_statement.get_exit_code(), None)
+
+    @visitor(AST.AST_FunctionCall)
+    def visit(self, function_call, context):
+        function_name = function_call.get_name()
+        parameters = function_call.get_parameters().get_all_parameters()
+
+        self.__write("function call", len(parameters))
+
+        function = self.__functions_table.get_function(function_name)
+        self.__write_prototype(function_name, function.get_function_prototype())
+
+        for parameter in parameters:
+            yield self.visit(parameter, None)
+
+    @visitor(AST.AST_ReturnStatement)
+    def visit(self, return_statement, context):
+        self.__write("return")
+
+        yield self.__visit_optional(return_statement.get_value())
+
+    @visitor(AST.AST_FunctionCallReturnValue)
+    def visit(self, function_call_return_value, context):
+        self.__write("function return value")
+        self.__write_data_type(function_call_return_value.get_data_type())
+
+        yield self.visit(function_call_return_value.get_function_call(), None)
+
+
+class AST_StructuralHash(AST_Fingerprint):
+    """
+    Hashes a function like AST_Fingerprint but without the names the symbol tables
+    gave it: its own name is replaced by "self" and the names of its variables and
+    parameters by the order they first appear in, so two functions with the same
+    code under different names get the same hash. The functions it calls are
+    still written by their names.
+    """
+
+    def __init__(self, functions_table):
+        super().__init__(functions_table)
+
+        self.__functions_table = functions_table
+        self.__function_name = None
+
+        # name -> its index in the function being hashed
+        self.__names = {}
+
+    def fingerprint(self, function):
+        self.__function_name = function.get_name()
+        self.__names = {}
+
+        return super().fingerprint(function)
+
+    def _write_name(self, name):
+        if name == self.__function_name:
+            super()._write_name("self")
+        elif self.__functions_table.get_function(name) is not None:
+            super()._write_name(name)
+        else:
+            super()._write_name("#" + str(self.__names.setdefault(name, len(self.__names))))
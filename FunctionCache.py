@@ -0,0 +1,81 @@
+import collections
+import threading
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class FunctionCacheEntry:
+    def __init__(self, ir_function, code):
+        self.__ir_function = ir_function
+        self.__code = code
+
+    # None when the entry was loaded from the disk cache
+    def get_ir_function(self):
+        return self.__ir_function
+
+    def get_code(self):
+        return self.__code
+
+
+class FunctionCache:
+    """
+    Keeps the IR and the proc of every compiled function by its fingerprint,
+    the least recently used entries are dropped past max_entries. When a
+    compile cache is given the procs are also stored on disk.
+    """
+
+    def __init__(self, compile_cache=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.__entries = collections.OrderedDict()
+        self.__compile_cache = compile_cache
+        self.__max_entries = max_entries
+
+        self.__hits = 0
+        self.__misses = 0
+
+        self.__lock = threading.Lock()
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
+
+    def get(self, fingerprint):
+        with self.__lock:
+            entry = self.__entries.get(fingerprint)
+
+            if entry is not None:
+                self.__entries.move_to_end(fingerprint)
+                self.__hits += 1
+                return entry
+
+        if self.__compile_cache is not None:
+            code = self.__compile_cache.load_function(fingerprint)
+
+            if code is not None:
+                entry = FunctionCacheEntry(None, code)
+                self.__put_entry(fingerprint, entry)
+
+                with self.__lock:
+                    self.__hits += 1
+
+                return entry
+
+        with self.__lock:
+            self.__misses += 1
+
+        return None
+
+    def put(self, fingerprint, ir_function, code):
+        self.__put_entry(fingerprint, FunctionCacheEntry(ir_function, code))
+
+        if self.__compile_cache is not None:
+            self.__compile_cache.store_function(fingerprint, code)
+
+    def __put_entry(self, fingerprint, entry):
+        with self.__lock:
+            self.__entries[fingerprint] = entry
+            self.__entries.move_to_end(fingerprint)
+
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
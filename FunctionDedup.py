@@ -0,0 +1,73 @@
+import AST
+import Fingerprint
+
+
+class FunctionDeduplicator:
+    """
+    Keeps one function of every group of functions with the same code, the calls
+    of the others are redirected to it and they are dropped from the program, so
+    their procs are never generated. The functions are compared by their
+    Fingerprint.AST_StructuralHash. main always keeps its own proc, the program
+    starts with a call to it.
+    """
+
+    def __init__(self, compilation_context):
+        self.__functions_table = compilation_context.get_functions_table()
+        self.__structural_hash = Fingerprint.AST_StructuralHash(self.__functions_table)
+
+        # function table name -> the table name of the function kept for it
+        self.__representatives = {}
+
+        # function table name -> structural hash, of the kept functions
+        self.__hashes = {}
+
+    def get_representatives(self):
+        return self.__representatives
+
+    def get_hashes(self):
+        return self.__hashes
+
+    def deduplicate(self, main_AST):
+        """
+        Returns the number of functions dropped from main_AST
+        """
+
+        main_function_name = self.__functions_table.get_function_table_name("main")
+
+        # structural hash -> the table name of the first function with it
+        kept_functions = {}
+
+        functions = []
+
+        for function in main_AST.get_functions():
+            # a function only calls the functions before it, their duplicates are already known
+            self.__redirect_calls(function)
+
+            function_name = function.get_name()
+            structural_hash = self.__structural_hash.fingerprint(function)
+
+            if function_name != main_function_name:
+                representative = kept_functions.setdefault(structural_hash, function_name)
+
+                if representative != function_name:
+                    self.__representatives[function_name] = representative
+                    continue
+
+            self.__hashes[function_name] = structural_hash
+            functions.append(function)
+
+        num_of_removed_functions = len(main_AST.get_functions()) - len(functions)
+        main_AST.set_functions(functions)
+
+        return num_of_removed_functions
+
+    def __redirect_calls(self, function):
+        if len(self.__representatives) == 0:
+            return
+
+        for node in AST.iter_nodes(function.get_code_block()):
+            if isinstance(node, AST.AST_FunctionCall):
+                representative = self.__representatives.get(node.get_name())
+
+                if representative is not None:
+                    node.set_name(representative)
@@ -0,0 +1,6 @@
+import LexAndYacc
+
+# run after changing the tokens or the grammar rules, the compiler
+# falls back to building the tables on startup while they are stale
+if __name__ == "__main__":
+    LexAndYacc.write_tables()
@@ -1,4 +1,5 @@
 import DataTypes
+import Traversal
 import Utils
 
 from AST_Visitor import *
@@ -71,21 +72,15 @@ class IR_FreeInteger(IR_FreeValue):
         self.__integer = integer
 
 
+# labels are numbered per function and prefixed with the function
+# name, so the code of a function doesn't depend on the functions before it
 class IR_Labels:
-    __instance = None
-
-    @classmethod
-    def get_instance(cls):
-        if cls.__instance is None:
-            cls.__instance = IR_Labels()
-
-        return cls.__instance
-
-    def __init__(self):
+    def __init__(self, prefix):
+        self.__prefix = prefix
         self.__count = 0
 
     def get_new_label_name(self):
-        string = "L" + str(self.__count)
+        string = self.__prefix + "_" + "L" + str(self.__count)
 
         self.__count += 1
 
@@ -405,7 +400,12 @@ class IR_Function(IR_Interface):
         self.__symbol_table = symbol_table
         self.__name = name
 
-        basic_block = IR_BasicBlock(IR_Label(IR_Labels.get_instance().get_new_label_name()), None)
+        self.__labels = IR_Labels(name)
+
+        # set when the function code should be stored in the function cache
+        self.__fingerprint = None
+
+        basic_block = IR_BasicBlock(IR_Label(self.__labels.get_new_label_name()), None)
 
         self.__current_basic_block.append(basic_block)
         self.__basic_blocks.append(basic_block)
@@ -423,17 +423,20 @@ class IR_Function(IR_Interface):
         self.__basic_blocks.append(basic_block)
 
     def write_basic_blocks(self):
-        string = ""
+        lines = []
 
         for basic_block in self.__basic_blocks:
-            string += "label: " + str(basic_block.get_label()) + "\n"
+            lines.append("label: " + str(basic_block.get_label()))
 
             for statement in basic_block.get_statements():
-                string += str(statement) + "\n"
+                lines.append(str(statement))
 
             if basic_block.get_jump_block() is not None:
-                string += "goto block: " + str(basic_block.get_jump_block()) + "\n"
+                lines.append("goto block: " + str(basic_block.get_jump_block()))
 
+        lines.append("")
+
+        string = "\n".join(lines)
         return string
 
     def add_free_operation(self, current_basic_block):
@@ -451,6 +454,41 @@ class IR_Function(IR_Interface):
     def get_function_prototype(self):
         return self.__function_prototype
 
+    def get_labels(self):
+        return self.__labels
+
+    def set_fingerprint(self, fingerprint):
+        self.__fingerprint = fingerprint
+
+    def get_fingerprint(self):
+        return self.__fingerprint
+
+
+# a function whose code was taken from the function cache instead of being generated
+class IR_PrecompiledFunction(IR_Interface):
+    def __init__(self, name, ir_function, code):
+        self.__name = name
+        self.__ir_function = ir_function
+        self.__code = code
+
+    def get_name(self):
+        return self.__name
+
+    def get_ir_function(self):
+        return self.__ir_function
+
+    def get_code(self):
+        return self.__code
+
+    def write_basic_blocks(self):
+        if self.__ir_function is None:
+            return "precompiled: " + self.__name + "\n"
+
+        return self.__ir_function.write_basic_blocks()
+
+    def add_free_operation(self, current_basic_block):
+        pass
+
 
 class IR_BasicBlock(IR_Interface):
     def __init__(self, label, jump_block):
@@ -463,9 +501,6 @@ class IR_BasicBlock(IR_Interface):
         self.__statements = []
 
     def add_statement(self, statement):
-        if type(statement) == IR_DefTemp:
-            print()
-
         self.__statements.append(statement)
 
     def set_jump_block(self, jump_block):
@@ -673,13 +708,16 @@ class IR_PopState(IR_Interface):
 
 
 class IR_Generator(AST_Visitor):
-    def __init__(self):
+    def __init__(self, compilation_context):
         self.__program = IR_Program()
 
     def gen(self, main_AST):
-        self.visit(main_AST, Context())
+        Traversal.run(self.visit(main_AST, Context()))
         return self.__program
 
+    def gen_function(self, function):
+        return Traversal.run(self.visit(function, Context()))
+
     # creates an ir symbol table from a symbol table(class implemented in file SymbolTable.py)
     def __create_ir_symbol_table(self, symbol_tables, context):
         ir_table = IR_SymbolTable()
@@ -690,14 +728,14 @@ class IR_Generator(AST_Visitor):
 
         for table in symbol_tables:
             for array in table.get_all_arrays():
-                ir_table.add_array(array, self.visit(array.get_size(), context))
+                ir_table.add_array(array, IR_Integer(str(array.get_size()), DataTypes.int_32()))
 
         return ir_table
 
     @visitor(AST.AST_Program)
     def visit(self, program, context):
         for function in program.get_functions():
-            self.visit(function, context)
+            self.__program.add_function((yield self.visit(function, context)))
 
     @visitor(AST.AST_Function)
     def visit(self, function, context):
@@ -708,9 +746,9 @@ class IR_Generator(AST_Visitor):
         
         context.set_current_function(ir_function)
 
-        self.visit(function.get_code_block(), context)
-        
-        self.__program.add_function(ir_function)
+        yield self.visit(function.get_code_block(), context)
+
+        return ir_function
 
     @visitor(AST.AST_CodeBlock)
     def visit(self, code_block, context):
@@ -718,7 +756,7 @@ class IR_Generator(AST_Visitor):
             if statement is None:
                 continue
 
-            self.visit(statement, context)
+            yield self.visit(statement, context)
 
     @visitor(AST.AST_Integer)
     def visit(self, integer, context):
@@ -729,8 +767,8 @@ class IR_Generator(AST_Visitor):
     @visitor(AST.AST_ArrayCell)
     def visit(self, get_value_from_array, context):
 
-        array = self.visit(get_value_from_array.get_array_name(), context)
-        index = self.visit(get_value_from_array.get_index(), context)
+        array = yield self.visit(get_value_from_array.get_array_name(), context)
+        index = yield self.visit(get_value_from_array.get_index(), context)
 
         data_type_size_in_bites = \
             IR_Integer(get_value_from_array.get_data_type().get_size_in_bites(),
@@ -772,14 +810,14 @@ class IR_Generator(AST_Visitor):
 
     @visitor(AST.AST_Array)
     def visit(self, array, context):
-        array = IR_Array(array.get_name(), array.get_data_type(), self.visit(array.get_size(), context))
+        array = IR_Array(array.get_name(), array.get_data_type(), IR_Integer(str(array.get_size()), DataTypes.int_32()))
 
         return array
 
     @visitor(AST.AST_Expression)
     def visit(self, expression, context):
-        expression_1 = self.visit(expression.get_expression_1(), context)
-        expression_2 = self.visit(expression.get_expression_2(), context)
+        expression_1 = yield self.visit(expression.get_expression_1(), context)
+        expression_2 = yield self.visit(expression.get_expression_2(), context)
 
         def_dest_temp = IR_DefTemp()
         #def_src_temp = IR_DefTemp()
@@ -801,7 +839,7 @@ class IR_Generator(AST_Visitor):
         """
 
         operation = \
-            self.visit(expression.get_operator(), context)
+            yield self.visit(expression.get_operator(), context)
 
         operation.set_temps(dest_temp, expression_2)
 
@@ -817,12 +855,12 @@ class IR_Generator(AST_Visitor):
 
     @visitor(AST.AST_DefVar)
     def visit(self, def_var, context):
-        self.visit(def_var.get_assignment(), context)
+        yield self.visit(def_var.get_assignment(), context)
 
     @visitor(AST.AST_Assignment)
     def visit(self, assignment, context):
-        value = self.visit(assignment.get_value(), context)
-        dest = self.visit(assignment.get_dest(), context)
+        value = yield self.visit(assignment.get_value(), context)
+        dest = yield self.visit(assignment.get_dest(), context)
 
         def_temp = IR_DefTemp()
         temp = def_temp.get_temp()
@@ -883,7 +921,7 @@ class IR_Generator(AST_Visitor):
 
         condition = context.get_condition()
 
-        new_basic_block_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+        new_basic_block_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
 
         current_function = \
             context.get_current_function()
@@ -916,7 +954,7 @@ class IR_Generator(AST_Visitor):
 
         condition = context.get_condition()
 
-        new_basic_block_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+        new_basic_block_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
 
         current_function = \
             context.get_current_function()
@@ -957,11 +995,11 @@ class IR_Generator(AST_Visitor):
             current_function.get_current_basic_block().get_jump_block()
 
         # this label can be for the else part or the merge block
-        else_part_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
-        than_part_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+        else_part_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
+        than_part_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
 
         context.set_if_statement_labels(IR_IfStatementLabels(than_part_label, else_part_label))
-        condition = self.visit(if_statement.get_condition(), context)
+        condition = yield self.visit(if_statement.get_condition(), context)
 
         jump_to_than_part = condition.get_operator()
         jump_to_than_part.set_label(than_part_label)
@@ -970,7 +1008,7 @@ class IR_Generator(AST_Visitor):
         jump_to_else_part.set_label(else_part_label)
 
         if contains_else_part:
-            merge_block_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+            merge_block_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
         else:
             merge_block_label = else_part_label
 
@@ -992,7 +1030,7 @@ class IR_Generator(AST_Visitor):
 
         condition.add_free_operation(current_function.get_current_basic_block())
 
-        self.visit(if_statement.get_then_part(), context)
+        yield self.visit(if_statement.get_then_part(), context)
 
         if contains_else_part:
             # gen else part code
@@ -1002,7 +1040,7 @@ class IR_Generator(AST_Visitor):
 
             condition.add_free_operation(current_function.get_current_basic_block())
 
-            self.visit(if_statement.get_else_part(), context)
+            yield self.visit(if_statement.get_else_part(), context)
 
             current_function.pop_current_basic_block()
 
@@ -1014,7 +1052,7 @@ class IR_Generator(AST_Visitor):
 
     @visitor(AST.AST_ElseStatement)
     def visit(self, else_statement, context):
-        self.visit(else_statement.get_code_block(), context)
+        yield self.visit(else_statement.get_code_block(), context)
 
     @visitor(AST.AST_WhileLoopStatement)
     def visit(self, while_loop_statement, context):
@@ -1024,7 +1062,7 @@ class IR_Generator(AST_Visitor):
         last_jump_block = \
             current_function.get_current_basic_block().get_jump_block()
 
-        cmp_block_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+        cmp_block_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
         cmp_block = IR_BasicBlock(cmp_block_label, None)
 
         jump_to_cmp_block = IR_Jump()
@@ -1035,12 +1073,12 @@ class IR_Generator(AST_Visitor):
         current_function.add_basic_block(cmp_block)
         current_function.push_current_basic_block(cmp_block)
 
-        merge_block_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+        merge_block_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
 
-        than_part_label = IR_Label(IR_Labels.get_instance().get_new_label_name())
+        than_part_label = IR_Label(context.get_current_function().get_labels().get_new_label_name())
 
         context.set_if_statement_labels(IR_IfStatementLabels(than_part_label, merge_block_label))
-        condition = self.visit(while_loop_statement.get_condition(), context)
+        condition = yield self.visit(while_loop_statement.get_condition(), context)
 
         jump_to_than_part = condition.get_operator()
         jump_to_than_part.set_label(than_part_label)
@@ -1063,7 +1101,7 @@ class IR_Generator(AST_Visitor):
 
         condition.add_free_operation(current_function.get_current_basic_block())
 
-        self.visit(while_loop_statement.get_code_block(), context)
+        yield self.visit(while_loop_statement.get_code_block(), context)
 
         current_function.pop_current_basic_block()
 
@@ -1079,7 +1117,7 @@ class IR_Generator(AST_Visitor):
         def_temp = IR_DefTemp()
         temp_1 = def_temp.get_temp()
 
-        expression_1 = self.visit(condition.get_expression_1(), context)
+        expression_1 = yield self.visit(condition.get_expression_1(), context)
 
         assign_temp = IR_AssignTemp(temp_1, expression_1)
 
@@ -1094,7 +1132,7 @@ class IR_Generator(AST_Visitor):
         def_temp = IR_DefTemp()
         temp_2 = def_temp.get_temp()
 
-        expression_2 = self.visit(condition.get_expression_2(), context)
+        expression_2 = yield self.visit(condition.get_expression_2(), context)
 
         assign_temp = IR_AssignTemp(temp_2, expression_2)
 
@@ -1103,7 +1141,7 @@ class IR_Generator(AST_Visitor):
 
         expression_2.add_free_operation(current_function.get_current_basic_block())
 
-        operator = self.visit(condition.get_operator(), context)
+        operator = yield self.visit(condition.get_operator(), context)
 
         ir_condition = \
             IR_Condition(temp_1, operator, temp_2)
@@ -1112,27 +1150,27 @@ class IR_Generator(AST_Visitor):
 
     @visitor(AST.AST_ComplexCondition)
     def visit(self, condition, context):
-        condition_1 = self.visit(condition.get_condition_1(), context)
+        condition_1 = yield self.visit(condition.get_condition_1(), context)
 
         context.set_condition(condition_1)
 
-        self.visit(condition.get_operator(), context)
+        yield self.visit(condition.get_operator(), context)
 
-        condition_2 = self.visit(condition.get_condition_2(), context)
+        condition_2 = yield self.visit(condition.get_condition_2(), context)
         return condition_2
 
     @visitor(AST.AST_ReadLine)
     def visit(self, read_line_statement, context):
         ir_read_line = \
             IR_ReadLine(read_line_statement.get_array_name(),
-                        self.visit(read_line_statement.get_num_of_chars(), context))
+                        (yield self.visit(read_line_statement.get_num_of_chars(), context)))
 
         context.get_current_function().\
             get_current_basic_block().add_statement(ir_read_line)
 
     @visitor(AST.AST_Print)
     def visit(self, print_statement, context):
-        value = self.visit(print_statement.get_value(), context)
+        value = yield self.visit(print_statement.get_value(), context)
 
         ir_print = IR_Print(print_statement.get_print_format(),
                             value)
@@ -1164,7 +1202,7 @@ class IR_Generator(AST_Visitor):
     @visitor(AST.AST_Exit)
     def visit(self, exit_statement, context):
         ir_exit_statement = \
-            IR_Exit(self.visit(exit_statement.get_exit_code(), context))
+            IR_Exit((yield self.visit(exit_statement.get_exit_code(), context)))
 
         context.get_current_function().\
             get_current_basic_block().add_statement(ir_exit_statement)
@@ -1181,17 +1219,15 @@ class IR_Generator(AST_Visitor):
         ir_function_call = \
             IR_FunctionCall(function_call.get_name(), function_call.get_parameters())
 
-        call_parameters = \
-            function_call.get_parameters().get_all_parameters()
-
         # the calling convention is stdcall so i
         # need to pass the parameters from the end to the start
-        call_parameters.reverse()
+        call_parameters = \
+            list(reversed(function_call.get_parameters().get_all_parameters()))
 
         for parameter in call_parameters:
 
             ir_parameter = \
-                self.visit(parameter, context)
+                yield self.visit(parameter, context)
 
             ir_pass_parameter_to_function = \
                 IR_PassParameterToFunction(ir_parameter)
@@ -1218,7 +1254,7 @@ class IR_Generator(AST_Visitor):
         if return_value is not None:
 
             return_value = \
-                self.visit(return_value, context)
+                yield self.visit(return_value, context)
 
             def_return_from_function_value_temp = \
                 IR_DefReturnFromFunctionValueTemp()
@@ -1253,7 +1289,7 @@ class IR_Generator(AST_Visitor):
         current_basic_block = \
             context.get_current_function().get_current_basic_block()
 
-        self.visit(function_call_return_value.get_function_call(), context)
+        yield self.visit(function_call_return_value.get_function_call(), context)
 
         data_type = \
             function_call_return_value.get_data_type()
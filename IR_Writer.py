@@ -1,231 +1,218 @@
 import IR
+import Dispatch
 
 from abc import abstractmethod
 
-IR_Writer_methods = {}
-
-
-def _qualname(obj):
-    return obj.__module__ + '.' + obj.__qualname__
-
-
-def _declaring_class(obj):
-    name = _qualname(obj)
-    return name[:name.rfind('.')]
-
-
-def _visitor_impl(self, arg, arg_2):
-    method = IR_Writer_methods[(_qualname(type(self)), type(arg))]
-    return method(self, arg, arg_2)
+# the methods of every IR writer, see Dispatch.Dispatcher
+IR_Writer_dispatcher = Dispatch.Dispatcher()
 
 
 def writer(arg_type):
-    def decorator(fn):
-        declaring_class = _declaring_class(fn)
-        IR_Writer_methods[(declaring_class, arg_type)] = fn
-
-        return _visitor_impl
-
-    return decorator
+    return IR_Writer_dispatcher.register(arg_type)
 
 
 class IR_Writer:
-    @abstractmethod
     @writer(IR.IR_Program)
+    @abstractmethod
     def write(self, program, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Function)
+    @abstractmethod
     def write(self, function, context):
         pass
 
+    @writer(IR.IR_PrecompiledFunction)
     @abstractmethod
+    def write(self, precompiled_function, context):
+        pass
+
     @writer(IR.IR_Label)
+    @abstractmethod
     def write(self, label, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_SymbolTable)
+    @abstractmethod
     def write(self, symbol_table, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_FreeVariable)
+    @abstractmethod
     def write(self, free_variable, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_FreeInteger)
+    @abstractmethod
     def write(self, free_integer, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_FreeTemp)
+    @abstractmethod
     def write(self, free_temp, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_DefTemp)
+    @abstractmethod
     def write(self, def_temp, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Assignment)
+    @abstractmethod
     def write(self, assignment, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_AssignTemp)
+    @abstractmethod
     def write(self, assign_temp, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_ArrayCell)
+    @abstractmethod
     def write(self, get_value_from_array, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Integer)
+    @abstractmethod
     def write(self, integer, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Variable)
+    @abstractmethod
     def write(self, variable, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_TempValue)
+    @abstractmethod
     def write(self, temp_value, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_AddOperation)
+    @abstractmethod
     def write(self, add_operation, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_SUbOperation)
+    @abstractmethod
     def write(self, sub_operation, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_MulOperation)
+    @abstractmethod
     def write(self, mul_operation, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_DivOperation)
+    @abstractmethod
     def writ(self, dev_operation, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_DivRestOperation)
+    @abstractmethod
     def write(self, dev_res_operation, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Condition)
+    @abstractmethod
     def write(self, condition, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_IfStatement)
+    @abstractmethod
     def write(self, if_statement, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_JumpStatement)
+    @abstractmethod
     def write(self, jump_statement, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_JumpLess)
+    @abstractmethod
     def write(self, jump_less, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_JumpGreater)
+    @abstractmethod
     def write(self, jump_greater, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_JumpEquals)
+    @abstractmethod
     def write(self, jump_equals, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_JumpNotEquals)
+    @abstractmethod
     def write(self, jump_not_equals, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_BasicBlock)
+    @abstractmethod
     def write(self, basic_block, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_ReadLine)
+    @abstractmethod
     def write(self, ir_read_line, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Print)
+    @abstractmethod
     def write(self, print_statement, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_PrintArray)
+    @abstractmethod
     def write(self, print_array, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_PrintString)
+    @abstractmethod
     def write(self, print_string, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_Exit)
+    @abstractmethod
     def write(self, exit_statement, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_FunctionCall)
+    @abstractmethod
     def write(self, function_call, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_ReturnFromFunction)
+    @abstractmethod
     def write(self, return_from_function, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_DefReturnFromFunctionValueTemp)
+    @abstractmethod
     def write(self, def_return_from_value_function_temp, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_ReturnFromFunctionValueTemp)
+    @abstractmethod
     def write(self, return_from_function_value_temp):
         pass
 
-    @abstractmethod
     @writer(IR.IR_PassParameterToFunction)
+    @abstractmethod
     def write(self, function_call_parameters, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_ReturnFromFunctionValue)
+    @abstractmethod
     def write(self, ir_return_from_function_value, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_PushState)
+    @abstractmethod
     def write(self, ir_push_state, context):
         pass
 
-    @abstractmethod
     @writer(IR.IR_PopState)
+    @abstractmethod
     def write(self, ir_pop_state, context):
         pass
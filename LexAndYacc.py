@@ -1,8 +1,16 @@
+import copy
+import hashlib
+import importlib
+import os
+import re
+import threading
+from array import array
+
 import ply.lex as lex
 import ply.yacc as yacc
 
-import Constance
 import DataTypes
+import SourceBuffer
 import Utils
 import SymbolTable
 import AST
@@ -59,85 +67,39 @@ tokens = ('int_32_keyword',
           'exit',
 
           'semicolon',
-          'comma',
-
-          'new_line')
-
-
-def t_assert(t):
-    r"""@assert"""
-
-    return t
-
-
-def t_new_line(t):
-    r"""\n+"""
-
-    t.lexer.lineno += len(t.value)
-
-
-def t_int_32_keyword(t):
-    r"""int_32"""
-
-    t.value = DataTypes.int_32()
-
-    return t
-
-
-def t_char_keyword(t):
-    r"""char"""
-
-    t.value = DataTypes.char()
-
-    return t
-
-
-def t_void_keyword(t):
-    r"""void"""
-
-    t.value = DataTypes.void()
-
-    return t
-
-
-def t_return(t):
-    r"""return"""
-    return t
-
-
-def t_if_keyword(t):
-    r"""if"""
-    return t
-
-
-def t_else_keyword(t):
-    r"""else"""
-    return t
+          'comma')
 
 
-def t_while_keyword(t):
-    r"""while"""
-    return t
+# the keywords and the @ directives are matched by the name and directive
+# rules and then looked up here, so a name like iffy is never split
+reserved_words = {'int_32': 'int_32_keyword',
+                  'char': 'char_keyword',
+                  'void': 'void_keyword',
 
+                  'return': 'return',
 
-def t_print_array(t):
-    r"""@print_array"""
-    return t
+                  'if': 'if_keyword',
+                  'else': 'else_keyword',
+                  'while': 'while_keyword'}
 
+directives = {'@assert': 'assert',
 
-def t_print(t):
-    r"""@print"""
-    return t
+              '@print': 'print',
+              '@print_array': 'print_array',
 
+              '@read_line': 'read_line',
 
-def t_read_line(t):
-    r"""@read_line"""
-    return t
+              '@exit': 'exit'}
 
+data_type_keywords = {'int_32': DataTypes.int_32,
+                      'char': DataTypes.char,
+                      'void': DataTypes.void}
 
-def t_exit(t):
-    r"""@exit"""
-    return t
+# the rules that pick the token type by the matched word, with the type of the
+# words that are not in the table (None for an error). the scanner looks the
+# type up on the source bytes so the token value can still be built lazily
+keyword_tables = {'name': (reserved_words, 'name'),
+                  'directive': (directives, None)}
 
 
 t_open_parenthesise = r'\('
@@ -179,7 +141,33 @@ def t_int_32_value(t):
     return t
 
 
-t_name = r'\w+'
+def t_directive(t):
+    r"""@\w+"""
+
+    token_type = directives.get(t.value)
+
+    if token_type is None:
+        Utils.Utils.handle_compiler_error(t.value + " " + "Is not a directive in line" + " " + str(t.lineno))
+
+    t.type = token_type
+
+    return t
+
+
+def t_name(t):
+    r"""\w+"""
+
+    token_type = reserved_words.get(t.value)
+    if token_type is None:
+        return t
+
+    t.type = token_type
+
+    data_type = data_type_keywords.get(t.value)
+    if data_type is not None:
+        t.value = data_type()
+
+    return t
 
 t_comma = r','
 t_semicolon = r';'
@@ -201,7 +189,10 @@ t_not_equals_operator = r'!='
 t_less_operator = r'<'
 t_greater_operator = r'>'
 
-t_ignore = " "
+# the line numbers come from the new line offsets of the source buffer, they are
+# only looked up for the tokens whose line is read. the sources are read as bytes
+# so windows line ends are ignored here
+t_ignore = " \r\n"
 
 
 def t_error(t):
@@ -213,12 +204,23 @@ precedence = (
     ('left', 'asterisk', 'dev_operator', 'dev_rest_operator'))
 
 
+# the actions only build the AST, the names are resolved and the types
+# are checked afterwards by SemanticAnalyzer. the errors it reports
+# carry the line the parser was at, so some nodes keep p.lexer.lineno.
+# the functions are added to the program given to the parse, when there
+# is one, as soon as they are reduced
+
+
 def p_program(p):
     """program : function_impl
                 | program function_impl"""
 
     if len(p) == 2:
-        program = AST.AST_Program()
+        program = p.lexer.get_program()
+
+        if program is None:
+            program = AST.AST_Program()
+
         program.add_function(p[1])
         p[0] = program
     else:
@@ -229,43 +231,13 @@ def p_program(p):
 def p_return_statement(p):
     """return_statement : return return_value"""
 
-    return_value = p[2]
-
-    current_function =  \
-        SymbolTable.FunctionsTable.get_instance().get_current_function()
-
-    current_function_prototype = \
-        current_function.get_function_prototype()
-
-    current_function_return_value_type = \
-        current_function_prototype.get_return_value_type()
-
-    res = \
-        current_function_return_value_type.is_compatible_with(return_value)
-
-    if not res:
-        Utils.Utils.handle_compiler_error("Try's to return incompatible value from function" + " " +
-                                          current_function_prototype.get_name() + " " + "in line" + " " +
-                                          str(p.lexer.lineno))
-
-    return_statement = AST.AST_ReturnStatement(return_value)
-
-    p[0] = return_statement
+    p[0] = AST.AST_ReturnStatement(p[2], p.lexer.lineno)
 
 
 def p_assert_statement(p):
     """assert_statement : assert condition"""
 
-    condition = p[2]
-
-    then_part = AST.AST_CodeBlock()
-    else_part = AST.AST_CodeBlock()
-    else_part.add_statement(AST.AST_PrintString("Assertion failed in line " + str(p.lexer.lineno) + ": " + p[2].write()))
-    then_part.add_statement(AST.AST_Exit(AST.AST_Integer(1, DataTypes.int_32())))
-
-    if_statement = AST.AST_IfStatement(condition, then_part, else_part)
-
-    p[0] = if_statement
+    p[0] = AST.AST_AssertStatement(p[2], p.lexer.lineno)
 
 
 def p_return_value(p):
@@ -284,23 +256,14 @@ def p_function_parameters(p):
                                   | data_type new_function_parameter_name
                                   | function_impl_parameters comma data_type new_function_parameter_name"""
     if len(p) == 1:
-        parameters = SymbolTable.FunctionParameters()
+        parameters = []
 
     elif len(p) == 3:
-        parameters = SymbolTable.FunctionParameters()
-
-        new_parameter = \
-            SymbolTable.FunctionParameter(p[2], p[1])
-
-        parameters.add_parameter(new_parameter.get_name(), new_parameter)
+        parameters = [SymbolTable.FunctionParameter(p[2], p[1])]
 
     else:
         parameters = p[1]
-
-        new_parameter = \
-            SymbolTable.FunctionParameter(p[4], p[3])
-
-        parameters.add_parameter(new_parameter.get_name(), new_parameter)
+        parameters.append(SymbolTable.FunctionParameter(p[4], p[3]))
 
     p[0] = parameters
 
@@ -308,32 +271,16 @@ def p_function_parameters(p):
 def p_function_prototype_start(p):
     """function_prototype_start : function_ret_type function_name"""
 
-    function_prototype = \
-        SymbolTable.SymbolTableFunctionPrototype(p[2], p[1])
-
-    SymbolTable.FunctionsTable.get_instance().\
-        set_current_prototype(function_prototype)
-
-    p[0] = function_prototype
+    p[0] = AST.AST_FunctionDeclaration(p[2], p[1])
 
 
 def p_function_prototype(p):
     """function_prototype : function_prototype_start open_parenthesise function_impl_parameters close_parenthesise """
 
-    function_prototype = p[1]
-    function_name = function_prototype.get_name()
+    function_declaration = p[1]
+    function_declaration.set_parameters(p[3])
 
-    function_prototype.set_parameters(p[3])
-
-    function_table_name = \
-        SymbolTable.FunctionsTable.get_instance().map_function_name_to_table_name(function_name)
-
-    symbol_table_function = \
-        SymbolTable.SymbolTableFunction(function_table_name, function_prototype)
-
-    SymbolTable.FunctionsTable.get_instance().add_function(symbol_table_function)
-
-    p[0] = symbol_table_function
+    p[0] = function_declaration
 
 
 def p_function_call_parameters(p):
@@ -361,20 +308,7 @@ def p_function_call_parameters(p):
 def p_function_call(p):
     """function_call : function_name open_parenthesise function_call_parameters close_parenthesise"""
 
-    function_name = p[1]
-    parameters = p[3]
-
-    if not parameters.is_matching_function_parameters_list(function_name):
-        Utils.Utils.handle_compiler_error("function call dose not match parameters list in line" + " " + str(p.lexer.lineno))
-        return
-
-    function_table_name = \
-        SymbolTable.FunctionsTable.get_instance().get_function_table_name(function_name)
-
-    function_call = \
-        AST.AST_FunctionCall(function_table_name, parameters)
-
-    p[0] = function_call
+    p[0] = AST.AST_FunctionCall(p[1], p[3], p.lexer.lineno)
 
 
 def p_function_impl(p):
@@ -444,18 +378,12 @@ def p_block(p):
 def p_scope_start(p):
     """scope_start : open_curly_brackets"""
 
-    SymbolTable.FunctionsTable.get_instance().\
-        get_current_function().push_table()
-
     p[0] = p[1]
 
 
 def p_scope_end(p):
     """scope_end : close_curly_brackets"""
 
-    SymbolTable.FunctionsTable.get_instance(). \
-        get_current_function().pop_table()
-
     p[0] = p[1]
 
 
@@ -574,38 +502,22 @@ def p_def_var(p):
                  | data_type new_var_name equals_operator value"""
 
     data_type = p[1]
-    var = AST.AST_Variable(p[2], data_type)
 
-    SymbolTable.FunctionsTable.get_instance().get_current_table().\
-        add_var(var.get_name(), data_type)
+    # the name is resolved by the semantic analysis
+    var = AST.AST_Variable(None, data_type)
 
     if len(p) == 3:
         AST_assignment = AST.AST_Assignment(var, AST.AST_Integer(0, data_type))
-        AST_def_var = AST.AST_DefVar(p[2], AST_assignment)
     else:
         AST_assignment = AST.AST_Assignment(var, p[4])
-        AST_def_var = AST.AST_DefVar(p[2], AST_assignment)
 
-    p[0] = AST_def_var
+    p[0] = AST.AST_DefVar(p[2], AST_assignment)
 
 
 def p_def_array(p):
     """def_array : data_type new_var_name open_brackets simple_int_value close_brackets"""
 
-    array_len = p[4]
-
-    if int(array_len.get_value()) > Constance.MAX_ARRAY_SIZE:
-        Utils.Utils.handle_compiler_error("Try's to define an array of size greater than" + " " +
-                                          str(Constance.MAX_ARRAY_SIZE) + " " + "in line" + " " + str(p.lexer.lineno))
-        return
-
-    data_type = p[1]
-    new_var = p[2]
-
-    data_type = DataTypes.Array(data_type, array_len)
-
-    SymbolTable.FunctionsTable.get_instance().get_current_table().\
-        add_array(new_var, data_type)
+    p[0] = AST.AST_DefArray(p[2], p[1], p[4], p.lexer.lineno)
 
 
 def p_array_cell(p):
@@ -656,16 +568,7 @@ def p_value(p):
 def p_function_call_value(p):
     """function_call_value : function_call"""
 
-    function_call = p[1]
-    function_name = function_call.get_name()
-
-    function_data_type = SymbolTable.FunctionsTable.get_instance().\
-        get_function(function_name).get_function_prototype().get_return_value_type()
-
-    AST_function_call_return_value = \
-        AST.AST_FunctionCallReturnValue(function_call, function_data_type)
-
-    p[0] = AST_function_call_return_value
+    p[0] = AST.AST_FunctionCallReturnValue(p[1], None)
 
 
 def p_int_expression(p):
@@ -680,14 +583,6 @@ def p_int_expression(p):
                         | dev_expression
                         | dev_rest_expression"""
 
-    value = p[1]
-
-    res = value.get_data_type().\
-        is_compatible_with(DataTypes.int_32())
-
-    if not res:
-        Utils.Utils.handle_compiler_error("Values are not compatible at line" + " " + str(p.lexer.lineno))
-
     p[0] = p[1]
 
 
@@ -709,8 +604,6 @@ def p_add_expression(p):
     AST_AddExpression = AST.AST_Expression(p[1], AST.AST_Add_Operator(), p[3])
     p[0] = AST_AddExpression
 
-    p[0].set_data_type(p[1].get_data_type())
-
 
 def p_sub_expression(p):
     """sub_expression : expression sub_operator expression"""
@@ -718,8 +611,6 @@ def p_sub_expression(p):
     AST_SubExpression = AST.AST_Expression(p[1], AST.AST_Sub_Operator(), p[3])
     p[0] = AST_SubExpression
 
-    p[0].set_data_type(p[1].get_data_type())
-
 
 def p_mul_expression(p):
     """mul_expression : expression asterisk expression"""
@@ -727,8 +618,6 @@ def p_mul_expression(p):
     AST_MulExpression = AST.AST_Expression(p[1], AST.AST_Mul_Operator(), p[3])
     p[0] = AST_MulExpression
 
-    p[0].set_data_type(p[1].get_data_type())
-
 
 def p_dev_expression(p):
     """dev_expression : expression dev_operator expression"""
@@ -736,8 +625,6 @@ def p_dev_expression(p):
     AST_DevExpression = AST.AST_Expression(p[1], AST.AST_Div_Operator(), p[3])
     p[0] = AST_DevExpression
 
-    p[0].set_data_type(p[1].get_data_type())
-
 
 def p_dev_rest_expression(p):
     """dev_rest_expression : expression dev_rest_operator expression"""
@@ -745,84 +632,29 @@ def p_dev_rest_expression(p):
     AST_DevRestExpression = AST.AST_Expression(p[1], AST.AST_Remainder_Operator(), p[3])
     p[0] = AST_DevRestExpression
 
-    p[0].set_data_type(p[1].get_data_type())
-
 
 def p_var_name(p):
     """var_name : name"""
 
-    current_table =\
-        SymbolTable.FunctionsTable.get_instance().get_current_table()
-
-    res = \
-        current_table.var_accessible_in_scope(p[1])
-
-    if not res:
-        Utils.Utils.handle_compiler_error("Var " + p[1] + " dose not exist in current scope")
-        return
-    else:
-        var_name = \
-            current_table.get_var_name(p[1])
-
-        var_data_type = \
-            current_table.get_var(var_name)
-
-    AST_var = AST.AST_Variable(var_name, var_data_type.get_data_type())
-    p[0] = AST_var
+    p[0] = AST.AST_Variable(None, None, p[1])
 
 
 def p_array_name(p):
     """array_name : name"""
 
-    current_table =\
-        SymbolTable.FunctionsTable.get_instance().get_current_table()
-
-    res = current_table\
-        .array_accessible_in_scope(p[1])
-
-    if not res:
-        Utils.Utils.handle_compiler_error("Array " + p[1] + " dose not exist in current scope")
-        return
-
-    else:
-        var_name = \
-            current_table.get_var_name(p[1])
-
-        var_data_type = \
-            current_table.get_array(var_name)
-
-    AST_var = AST.AST_Array(var_name, var_data_type)
-    p[0] = AST_var
+    p[0] = AST.AST_Array(None, None, p[1])
 
 
 def p_new_function_parameter_name(p):
     """new_function_parameter_name : name"""
 
-    new_name = p[1]
-
-    table_name = SymbolTable.FunctionsTable.get_instance().get_current_prototype().\
-        map_arg_name_to_table_name(new_name)
-
-    p[0] = table_name
+    p[0] = p[1]
 
 
 def p_new_var_name(p):
     """new_var_name : name"""
 
-    current_table =\
-        SymbolTable.FunctionsTable.get_instance().get_current_table()
-
-    res = \
-        current_table.var_exist_in_scope(p[1])
-
-    if res:
-        Utils.Utils.handle_compiler_error("Var " + p[1] + " already exist in current scope")
-        return
-
-    var_name = \
-        current_table.map_var_name_to_symbol_table_name(p[1])
-
-    p[0] = var_name
+    p[0] = p[1]
 
 
 def p_function_name(p):
@@ -841,7 +673,7 @@ def p_exit(p):
 def p_read_line_statement(p):
     """read_line_statement : read_line array_name comma simple_int_value"""
 
-    p[0] = AST.AST_ReadLine(p[2].get_name(), p[4])
+    p[0] = AST.AST_ReadLine(p[2].get_source_name(), p[4])
 
 
 def p_print_statement(p):
@@ -855,13 +687,13 @@ def p_print_statement(p):
 def p_print_array(p):
     """print_array_statement : print_array array_name"""
 
-    p[0] = AST.AST_PrintArray(p[2].get_name())
+    p[0] = AST.AST_PrintArray(p[2].get_source_name())
 
 
 def p_print_value(p):
     """print_value_statement : print value"""
 
-    p[0] = AST.AST_Print(p[2].get_data_type().get_print_format(), p[2])
+    p[0] = AST.AST_Print(None, p[2])
 
 
 def p_print_string(p):
@@ -871,43 +703,471 @@ def p_print_string(p):
 
 
 def p_error(p):
+    # yacc passes no token when the input ends in the middle of a rule
+    if p is None:
+        Utils.Utils.handle_compiler_error("Failed to parse tokens, unexpected end of file")
+
     Utils.Utils.handle_compiler_error("Failed to parse tokens in line" + " " +
                                       str(p.lineno) + " " + "token" + " " + "\"" + str(p.value) + "\"")
 
     p[0] = None
 
 
+def get_grammar_signature():
+    """
+    Returns a string that changes whenever the tokens or the grammar rules change
+    """
+
+    module_globals = globals()
+    parts = [repr(tokens), repr(precedence), repr(reserved_words), repr(directives), repr(t_ignore)]
+
+    for name in sorted(module_globals.keys()):
+        if not name.startswith("t_") and not name.startswith("p_"):
+            continue
+
+        rule = module_globals[name]
+
+        if isinstance(rule, str):
+            parts.append(name + " " + rule)
+        else:
+            parts.append(name + " " + str(rule.__doc__))
+
+    return "\n".join(parts)
+
+
+# the pre-generated lexer and parser tables, written by GenerateTables.py.
+# the parser tables are pickled since building the dicts of a ply table module is slow
+LEX_TABLES_MODULE = "LexTables"
+PARSE_TABLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ParseTables.pickle")
+
+_grammar_hash = None
+
+
+def get_grammar_hash():
+    global _grammar_hash
+
+    if _grammar_hash is None:
+        _grammar_hash = hashlib.sha256(get_grammar_signature().encode("utf-8")).hexdigest()
+
+    return _grammar_hash
+
+
+def load_tables(module_name):
+    """
+    Returns the pre-generated tables module, or None when it is missing,
+    was generated from another grammar or UCOMPILER_NO_FROZEN_TABLES is set
+    """
+
+    if os.environ.get("UCOMPILER_NO_FROZEN_TABLES"):
+        return None
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+    if getattr(module, "_grammar_hash", None) != get_grammar_hash():
+        return None
+
+    return module
+
+
+def write_tables():
+    output_dir = os.path.dirname(PARSE_TABLES_FILE)
+
+    lex.lex().writetab(LEX_TABLES_MODULE, output_dir)
+
+    # ply doesn't validate optimized lexer tables, so they carry the grammar hash
+    with open(os.path.join(output_dir, LEX_TABLES_MODULE + ".py"), "a") as file:
+        file.write("_grammar_hash = " + repr(get_grammar_hash()) + "\n")
+
+    # ply keeps tables whose signature still matches, so always start over
+    if os.path.exists(PARSE_TABLES_FILE):
+        os.remove(PARSE_TABLES_FILE)
+
+    yacc.yacc(debug=False, picklefile=PARSE_TABLES_FILE)
+
+
+class BufferToken:
+    """
+    A view of one token of a TokenStream, made when the parser reads the
+    token. The value and the line are read from the stream when asked for.
+    """
+
+    def __init__(self, token_stream, index, token_type):
+        self.type = token_type
+
+        self.__token_stream = token_stream
+        self.__index = index
+
+    @property
+    def value(self):
+        return self.__token_stream.get_value(self.__index)
+
+    @value.setter
+    def value(self, value):
+        self.__token_stream.set_value(self.__index, value)
+
+    @property
+    def lineno(self):
+        return self.__token_stream.get_line(self.__index)
+
+    @property
+    def lexpos(self):
+        return self.__token_stream.get_start(self.__index)
+
+    @property
+    def endlexpos(self):
+        return self.__token_stream.get_end(self.__index)
+
+    def get_index(self):
+        return self.__index
+
+    def get_text(self):
+        return self.__token_stream.get_text(self.__index)
+
+    def get_column(self):
+        return self.__token_stream.get_column(self.__index)
+
+
+class Scanner:
+    """
+    Scans a source buffer with the master regex of the ply lexer compiled for bytes.
+    The tokens are kept as columns of a TokenStream so no text is copied while scanning.
+    """
+
+    def __init__(self, lexer):
+        self.__master_regexes = []
+
+        # token kinds are the indexes of the token types
+        self.__token_types = list(tokens)
+        self.__kinds = {token_type: kind for kind, token_type in enumerate(self.__token_types)}
+
+        # the rule that builds the value of every kind
+        self.__kind_rules = [None] * len(self.__token_types)
+
+        for regex, index in lexer.lexre:
+            bytes_regex = re.compile(regex.pattern.encode("utf-8"), regex.flags & ~re.UNICODE)
+
+            kind_index = [None] * len(index)
+
+            for group, rule_and_type in enumerate(index):
+                if rule_and_type is None or rule_and_type[1] is None:
+                    continue
+
+                rule, token_type = rule_and_type
+                kind_index[group] = (rule, self.__kinds.get(token_type), token_type)
+
+            self.__master_regexes.append((bytes_regex, kind_index))
+
+        self.__ignore = lexer.lexignore.encode("utf-8")
+        self.__error_rule = lexer.lexerrorf
+
+        self.__keyword_tables = {}
+
+        for token_type, (table, default_type) in keyword_tables.items():
+            bytes_table = {word.encode("utf-8"): self.__kinds[word_type] for word, word_type in table.items()}
+
+            default_kind = None
+            if default_type is not None:
+                default_kind = self.__kinds[default_type]
+
+            self.__keyword_tables[token_type] = (bytes_table, default_kind)
+
+        for regex, kind_index in self.__master_regexes:
+            for rule_and_kind in kind_index:
+                if rule_and_kind is None:
+                    continue
+
+                rule, kind, token_type = rule_and_kind
+
+                if kind is not None:
+                    self.__kind_rules[kind] = rule
+
+                if token_type in self.__keyword_tables:
+                    for word_kind in self.__keyword_tables[token_type][0].values():
+                        self.__kind_rules[word_kind] = rule
+
+    def get_token_type(self, kind):
+        return self.__token_types[kind]
+
+    def get_num_of_kinds(self):
+        return len(self.__token_types)
+
+    def get_kind_rule(self, kind):
+        return self.__kind_rules[kind]
+
+    def scan(self, source):
+        buffer = source.get_buffer()
+        length = len(buffer)
+
+        ignore = self.__ignore
+        master_regexes = self.__master_regexes
+        keyword_tables = self.__keyword_tables
+
+        kinds = array("i")
+        starts = array("q")
+        lengths = array("i")
+
+        position = 0
+
+        # the lines are not counted here, the source buffer finds the
+        # line of an offset in its new line offsets when it is asked for
+        while position < length:
+            if buffer[position] in ignore:
+                position += 1
+                continue
+
+            for regex, kind_index in master_regexes:
+                match = regex.match(buffer, position)
+                if match is not None:
+                    break
+            else:
+                self.__report_error(source, position)
+                position += 1
+                continue
+
+            end = match.end()
+            rule, kind, token_type = kind_index[match.lastindex]
+
+            keyword_table = keyword_tables.get(token_type)
+            if keyword_table is not None:
+                bytes_table, default_kind = keyword_table
+                kind = bytes_table.get(buffer[position:end], default_kind)
+
+                if kind is None:
+                    # the rule reports the error
+                    self.__report_rule_error(source, rule, token_type, position, end)
+
+            kinds.append(kind)
+            starts.append(position)
+            lengths.append(end - position)
+
+            position = end
+
+        return TokenStream(source, self, kinds, starts, lengths)
+
+    def __report_rule_error(self, source, rule, token_type, start, end):
+        token = lex.LexToken()
+        token.type = token_type
+        token.value = source.get_text(start, end)
+        token.lineno = source.get_line_number(start)
+        token.lexpos = start
+
+        rule(token)
+
+    def __report_error(self, source, position):
+        token = lex.LexToken()
+        token.type = "error"
+        token.value = source.get_text(position)
+        token.lineno = source.get_line_number(position)
+        token.lexpos = position
+
+        self.__error_rule(token)
+
+
+class TokenStream:
+    """
+    Holds the tokens of a whole source file as parallel columns of kinds, offsets
+    and lengths. The values of the tokens are built on first use and kept in a
+    side table, their lines are looked up in the source buffer when asked for.
+    The parser reads the tokens through the same interface as a
+    ply lexer, input rewinds the stream without scanning again.
+    """
+
+    def __init__(self, source, scanner, kinds, starts, lengths):
+        self.__source = source
+        self.__scanner = scanner
+
+        self.__kinds = kinds
+        self.__starts = starts
+        self.__lengths = lengths
+
+        self.__values = {}
+
+        self.__position = 0
+
+        # takes the functions of the parse instead of an AST_Program, see p_program
+        self.__program = None
+
+    def get_source(self):
+        return self.__source
+
+    def get_columns(self):
+        return self.__kinds, self.__starts, self.__lengths
+
+    def get_last_line_number(self):
+        return self.__source.get_line_number(self.__source.get_size())
+
+    def get_num_of_tokens(self):
+        return len(self.__kinds)
+
+    def get_kind(self, index):
+        return self.__kinds[index]
+
+    def get_token_type(self, index):
+        return self.__scanner.get_token_type(self.__kinds[index])
+
+    def get_start(self, index):
+        return self.__starts[index]
+
+    def get_end(self, index):
+        return self.__starts[index] + self.__lengths[index]
+
+    def get_line(self, index):
+        return self.__source.get_line_number(self.__starts[index])
+
+    def get_column(self, index):
+        return self.__source.get_column(self.__starts[index])
+
+    def get_text(self, index):
+        return self.__source.get_text(self.get_start(index), self.get_end(index))
+
+    def get_value(self, index):
+        if index in self.__values:
+            return self.__values[index]
+
+        value = self.__make_value(index)
+        self.__values[index] = value
+
+        return value
+
+    def set_value(self, index, value):
+        self.__values[index] = value
+
+    def set_program(self, program):
+        self.__program = program
+
+    def get_program(self):
+        return self.__program
+
+    def __make_value(self, index):
+        text = self.get_text(index)
+        rule = self.__scanner.get_kind_rule(self.__kinds[index])
+
+        if rule is None:
+            return text
+
+        # the rule functions build the value from a ply token
+        token = lex.LexToken()
+        token.type = self.get_token_type(index)
+        token.value = text
+        token.lineno = self.get_line(index)
+        token.lexpos = self.__starts[index]
+
+        return rule(token).value
+
+    def get_token(self, index):
+        return BufferToken(self, index, self.get_token_type(index))
+
+    def iter_tokens(self, start=0):
+        for index in range(start, len(self.__kinds)):
+            yield self.get_token(index)
+
+    @property
+    def lineno(self):
+        # the line of the last token that was read, or the last line at the end
+        if self.__position == 0:
+            return 1
+
+        if self.__position > len(self.__kinds):
+            return self.get_last_line_number()
+
+        return self.get_line(self.__position - 1)
+
+    def input(self, text):
+        self.__position = 0
+
+    def token(self):
+        if self.__position >= len(self.__kinds):
+            self.__position = len(self.__kinds) + 1
+            return None
+
+        token = self.get_token(self.__position)
+        self.__position += 1
+
+        return token
+
+
 class Lex:
     __instance = None
+    __instance_lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
-        if cls.__instance is None:
-            cls.__instance = Lex()
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                cls.__instance = Lex()
 
         return cls.__instance
 
     def __init__(self):
-        self.__lex = lex.lex()
-        self.__line_number = 0
+        lex_tables = load_tables(LEX_TABLES_MODULE)
+
+        # the ply lexer validates the rules and builds the master regex the scanner uses
+        if lex_tables is not None:
+            self.__lex = lex.lex(optimize=1, lextab=lex_tables)
+        else:
+            self.__lex = lex.lex()
+
+        self.__scanner = Scanner(self.__lex)
+
+    def scan(self, source, token_cache=None):
+        """
+        Returns the TokenStream of the SourceBuffer, the tokens of
+        an unchanged source are loaded from token_cache when one is given
+        """
+
+        if token_cache is not None:
+            token_stream = token_cache.load(source, self.__scanner)
+
+            if token_stream is not None:
+                return token_stream
+
+        token_stream = self.__scanner.scan(source)
 
-    def parse_to_tokens(self, text):
-        self.__lex.input(text)
+        if token_cache is not None:
+            token_cache.store(source, token_stream)
+
+        return token_stream
+
+    def parse_to_tokens(self, text, token_cache=None):
+        return self.scan(SourceBuffer.SourceBuffer.from_text(text), token_cache)
 
 
 class Yacc:
     __instance = None
+    __instance_lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
-        if cls.__instance is None:
-            cls.__instance = Yacc()
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                cls.__instance = Yacc()
 
         return cls.__instance
 
     def __init__(self):
-        self.__parser = yacc.yacc()
+        # ply checks the signature of the pickled tables and builds new ones when they are stale
+        if os.path.exists(PARSE_TABLES_FILE) and not os.environ.get("UCOMPILER_NO_FROZEN_TABLES"):
+            self.__parser = yacc.yacc(debug=False, write_tables=False, picklefile=PARSE_TABLES_FILE)
+        else:
+            self.__parser = yacc.yacc(debug=False)
+
+        # the parse tables are shared, the parser stacks are per thread
+        self.__thread_data = threading.local()
+
+    def __get_parser(self):
+        parser = getattr(self.__thread_data, "parser", None)
+
+        if parser is None:
+            parser = copy.copy(self.__parser)
+            self.__thread_data.parser = parser
+
+        return parser
+
+    def pars(self, token_stream, program=None):
+        token_stream.set_program(program)
 
-    def pars(self, text):
-        AST_code_block = self.__parser.parse(text)
+        AST_code_block = self.__get_parser().parse(lexer=token_stream)
         return AST_code_block
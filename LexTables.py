@@ -0,0 +1,11 @@
+# LexTables.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('add_operator', 'and_operator', 'assert', 'asterisk', 'char_keyword', 'char_value', 'close_brackets', 'close_curly_brackets', 'close_parenthesise', 'comma', 'dev_operator', 'dev_rest_operator', 'else_keyword', 'equality_operator', 'equals_operator', 'exit', 'greater_operator', 'if_keyword', 'int_32_keyword', 'int_32_value', 'less_operator', 'name', 'not_equals_operator', 'open_brackets', 'open_curly_brackets', 'open_parenthesise', 'or_operator', 'print', 'print_array', 'read_line', 'return', 'semicolon', 'string', 'sub_operator', 'void_keyword', 'while_keyword'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_string>\\".+\\")|(?P<t_char_value>\'.\')|(?P<t_int_32_value>\\d+)|(?P<t_directive>@\\w+)|(?P<t_name>\\w+)|(?P<t_or_operator>\\|\\|)|(?P<t_open_parenthesise>\\()|(?P<t_close_parenthesise>\\))|(?P<t_open_curly_brackets>\\{)|(?P<t_close_curly_brackets>\\})|(?P<t_open_brackets>\\[)|(?P<t_close_brackets>\\])|(?P<t_add_operator>\\+)|(?P<t_sub_operator>\\-)|(?P<t_asterisk>\\*)|(?P<t_and_operator>&&)|(?P<t_equality_operator>==)|(?P<t_not_equals_operator>!=)|(?P<t_comma>,)|(?P<t_semicolon>;)|(?P<t_equals_operator>=)|(?P<t_dev_operator>/)|(?P<t_dev_rest_operator>%)|(?P<t_less_operator><)|(?P<t_greater_operator>>)', [None, ('t_string', 'string'), ('t_char_value', 'char_value'), ('t_int_32_value', 'int_32_value'), ('t_directive', 'directive'), ('t_name', 'name'), (None, 'or_operator'), (None, 'open_parenthesise'), (None, 'close_parenthesise'), (None, 'open_curly_brackets'), (None, 'close_curly_brackets'), (None, 'open_brackets'), (None, 'close_brackets'), (None, 'add_operator'), (None, 'sub_operator'), (None, 'asterisk'), (None, 'and_operator'), (None, 'equality_operator'), (None, 'not_equals_operator'), (None, 'comma'), (None, 'semicolon'), (None, 'equals_operator'), (None, 'dev_operator'), (None, 'dev_rest_operator'), (None, 'less_operator'), (None, 'greater_operator')])]}
+_lexstateignore = {'INITIAL': ' \r\n'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
+_grammar_hash = 'e50df7287b9a75e7de3065169b0ced8ad4897c6a8f59e9262437c8eb030f69eb'
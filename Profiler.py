@@ -0,0 +1,158 @@
+import contextlib
+import json
+import time
+import tracemalloc
+
+import AST
+import Constance
+import IR
+
+
+class StageProfile:
+    def __init__(self, name):
+        self.__name = name
+        self.__calls = 0
+        self.__wall_time = 0.0
+        self.__cpu_time = 0.0
+        self.__peak_memory = 0
+
+    def get_name(self):
+        return self.__name
+
+    def get_calls(self):
+        return self.__calls
+
+    def get_wall_time(self):
+        return self.__wall_time
+
+    def get_cpu_time(self):
+        return self.__cpu_time
+
+    def get_peak_memory(self):
+        return self.__peak_memory
+
+    def add_call(self, wall_time, cpu_time, peak_memory):
+        self.__calls += 1
+        self.__wall_time += wall_time
+        self.__cpu_time += cpu_time
+        self.__peak_memory = max(self.__peak_memory, peak_memory)
+
+
+class Profiler:
+    """
+    Records the wall time, the cpu time and the peak traced memory of every
+    stage, and counts of the AST and IR. Stages with the same name are summed
+    over all the compiled files, the peak memory is the largest one.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.__stages = {}
+        self.__counts = {}
+
+        self.__trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.__trace_memory:
+            tracemalloc.reset_peak()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+
+            peak_memory = 0
+            if self.__trace_memory:
+                peak_memory = tracemalloc.get_traced_memory()[1]
+
+            if name not in self.__stages:
+                self.__stages[name] = StageProfile(name)
+
+            self.__stages[name].add_call(wall_time, cpu_time, peak_memory)
+
+    def add_count(self, name, count):
+        self.__counts[name] = self.__counts.get(name, 0) + count
+
+    def get_stages(self):
+        return list(self.__stages.values())
+
+    def get_counts(self):
+        return self.__counts
+
+    def count_ast(self, main_AST):
+        self.add_count("ast nodes", count_ast_nodes(main_AST))
+
+    def count_ir(self, ir_program):
+        for function in ir_program.get_all_functions():
+            # functions taken from the function cache have no IR
+            if not isinstance(function, IR.IR_Function):
+                self.add_count("cached functions", 1)
+                continue
+
+            for basic_block in function.get_all_basic_blocks():
+                statements = basic_block.get_all_statements()
+
+                self.add_count("basic blocks", 1)
+                self.add_count("ir statements", len(statements))
+                self.add_count("temps", sum(1 for statement in statements
+                                            if isinstance(statement, IR.IR_DefTemp)))
+
+    def to_json(self):
+        report = {"compiler version": Constance.COMPILER_VERSION, "stages": [], "counts": self.__counts}
+
+        for stage in self.__stages.values():
+            report["stages"].append({"name": stage.get_name(),
+                                     "calls": stage.get_calls(),
+                                     "wall time": stage.get_wall_time(),
+                                     "cpu time": stage.get_cpu_time(),
+                                     "peak memory": stage.get_peak_memory()})
+
+        return json.dumps(report, indent=4)
+
+    def write_table(self):
+        string = "{:<16}{:>8}{:>12}{:>12}{:>14}\n".format("stage", "calls", "wall ms", "cpu ms", "peak KB")
+
+        for stage in self.__stages.values():
+            string += "{:<16}{:>8}{:>12.2f}{:>12.2f}{:>14.1f}\n".format(stage.get_name(),
+                                                                       stage.get_calls(),
+                                                                       stage.get_wall_time() * 1000,
+                                                                       stage.get_cpu_time() * 1000,
+                                                                       stage.get_peak_memory() / 1024)
+
+        for name, count in self.__counts.items():
+            string += "{:<16}{:>8}\n".format(name, count)
+
+        return string
+
+
+class NullProfiler:
+    """
+    Used when profiling is off, so the stages don't have to check for a profiler
+    """
+
+    def stage(self, name):
+        return contextlib.nullcontext()
+
+    def add_count(self, name, count):
+        pass
+
+    def count_ast(self, main_AST):
+        pass
+
+    def count_ir(self, ir_program):
+        pass
+
+
+def count_ast_nodes(main_AST):
+    count = 0
+
+    for node in AST.iter_nodes(main_AST):
+        count += 1
+
+    return count
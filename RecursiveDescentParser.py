@@ -0,0 +1,525 @@
+from types import GeneratorType
+
+import LexAndYacc
+import Traversal
+
+END_OF_FILE = -1
+
+# the token kinds of the scanner are the indexes of the token types
+KINDS = {token_type: kind for kind, token_type in enumerate(LexAndYacc.tokens)}
+
+INT_32_KEYWORD = KINDS['int_32_keyword']
+CHAR_KEYWORD = KINDS['char_keyword']
+VOID_KEYWORD = KINDS['void_keyword']
+
+RETURN = KINDS['return']
+ASSERT = KINDS['assert']
+
+IF_KEYWORD = KINDS['if_keyword']
+ELSE_KEYWORD = KINDS['else_keyword']
+WHILE_KEYWORD = KINDS['while_keyword']
+
+OPEN_PARENTHESISE = KINDS['open_parenthesise']
+CLOSE_PARENTHESISE = KINDS['close_parenthesise']
+OPEN_CURLY_BRACKETS = KINDS['open_curly_brackets']
+CLOSE_CURLY_BRACKETS = KINDS['close_curly_brackets']
+OPEN_BRACKETS = KINDS['open_brackets']
+CLOSE_BRACKETS = KINDS['close_brackets']
+
+INT_32_VALUE = KINDS['int_32_value']
+CHAR_VALUE = KINDS['char_value']
+STRING = KINDS['string']
+
+NAME = KINDS['name']
+
+EQUALS_OPERATOR = KINDS['equals_operator']
+
+PRINT = KINDS['print']
+PRINT_ARRAY = KINDS['print_array']
+READ_LINE = KINDS['read_line']
+EXIT = KINDS['exit']
+
+SEMICOLON = KINDS['semicolon']
+COMMA = KINDS['comma']
+
+EXPRESSION_ACTIONS = {'add_operator': LexAndYacc.p_add_expression,
+                      'sub_operator': LexAndYacc.p_sub_expression,
+                      'asterisk': LexAndYacc.p_mul_expression,
+                      'dev_operator': LexAndYacc.p_dev_expression,
+                      'dev_rest_operator': LexAndYacc.p_dev_rest_expression}
+
+COMPARISON_ACTIONS = {KINDS['less_operator']: LexAndYacc.p_les_condition,
+                      KINDS['greater_operator']: LexAndYacc.p_greater_condition,
+                      KINDS['equality_operator']: LexAndYacc.p_equality_condition,
+                      KINDS['not_equals_operator']: LexAndYacc.p_not_equals_condition}
+
+CONDITION_ACTIONS = {KINDS['and_operator']: LexAndYacc.p_and_condition,
+                     KINDS['or_operator']: LexAndYacc.p_or_condition}
+
+DATA_TYPE_KINDS = (INT_32_KEYWORD, CHAR_KEYWORD)
+RET_TYPE_KINDS = (INT_32_KEYWORD, CHAR_KEYWORD, VOID_KEYWORD)
+SIMPLE_INT_VALUE_KINDS = (INT_32_VALUE, CHAR_VALUE)
+
+
+def make_binary_operators():
+    """
+    Maps the kind of every expression operator to its binding power, the binding
+    power of its right operand and its grammar action, from the precedence table
+    """
+
+    binary_operators = {}
+
+    for level, (associativity, *operators) in enumerate(LexAndYacc.precedence, 1):
+        right_level = level + 1
+        if associativity == 'right':
+            right_level = level
+
+        for operator in operators:
+            binary_operators[KINDS[operator]] = (level, right_level, EXPRESSION_ACTIONS[operator])
+
+    return binary_operators
+
+
+BINARY_OPERATORS = make_binary_operators()
+
+
+class Production(list):
+    """
+    Stands in for the ply production the grammar actions are called with,
+    p[0] is the result and p[1:] are the values of the symbols
+    """
+
+    __slots__ = ("lexer",)
+
+
+class RecursiveDescentParser:
+    """
+    Parses a TokenStream by recursive descent, the expressions by precedence
+    climbing over the precedence table of the grammar. The p_* actions of the
+    grammar are called in the order the LALR parser reduces them, so the AST is
+    the same as with Yacc. The rules that only pass a value up (statement, block,
+    value, int_expression, scope, data_type...) are not called.
+    The values of the punctuation are never read by the actions and are not built.
+    The rules that can nest are generators that yield the rules under them and are
+    run by Traversal.run, so deeply nested sources don't hit the recursion limit.
+    """
+
+    def __init__(self, token_stream, program=None):
+        self.__token_stream = token_stream
+        self.__program = program
+
+        kinds, starts, lengths = token_stream.get_columns()
+
+        # a copy with an end marker, so looking ahead never runs past the tokens
+        self.__kinds = kinds[:]
+        self.__kinds.append(END_OF_FILE)
+
+        self.__index = 0
+
+    # the grammar actions use the parser as p.lexer
+    @property
+    def lineno(self):
+        # the line of the look ahead token, like the ply lexer after the parser read it
+        if self.__index >= self.__token_stream.get_num_of_tokens():
+            return self.__token_stream.get_last_line_number()
+
+        return self.__token_stream.get_line(self.__index)
+
+    def get_program(self):
+        return self.__program
+
+    def pars(self):
+        program = self.__reduce(LexAndYacc.p_program, Traversal.run(self.__parse_function_impl()))
+
+        while self.__kinds[self.__index] != END_OF_FILE:
+            program = self.__reduce(LexAndYacc.p_program, program, Traversal.run(self.__parse_function_impl()))
+
+        return program
+
+    def __reduce(self, action, *values):
+        p = Production((None,) + values)
+        p.lexer = self
+
+        action(p)
+
+        return p[0]
+
+    def __error(self):
+        # yacc reports the end of the input without a token
+        if self.__kinds[self.__index] == END_OF_FILE:
+            LexAndYacc.p_error(None)
+
+        LexAndYacc.p_error(self.__token_stream.get_token(self.__index))
+
+    def __expect(self, kind):
+        if self.__kinds[self.__index] != kind:
+            self.__error()
+
+        self.__index += 1
+
+    def __expect_value(self, kinds):
+        index = self.__index
+
+        if self.__kinds[index] not in kinds:
+            self.__error()
+
+        self.__index += 1
+        return self.__token_stream.get_value(index)
+
+    def __parse_function_impl(self):
+        function_prototype = self.__parse_function_prototype()
+
+        self.__expect(OPEN_CURLY_BRACKETS)
+        code_block = yield self.__parse_code_block()
+        self.__expect(CLOSE_CURLY_BRACKETS)
+
+        return self.__reduce(LexAndYacc.p_function_impl, function_prototype, None, code_block, None)
+
+    def __parse_function_prototype(self):
+        ret_type = self.__expect_value(RET_TYPE_KINDS)
+        function_name = self.__expect_value((NAME,))
+
+        function_prototype_start = \
+            self.__reduce(LexAndYacc.p_function_prototype_start, ret_type, function_name)
+
+        self.__expect(OPEN_PARENTHESISE)
+        parameters = self.__parse_function_impl_parameters()
+        self.__expect(CLOSE_PARENTHESISE)
+
+        return self.__reduce(LexAndYacc.p_function_prototype, function_prototype_start, None, parameters, None)
+
+    def __parse_function_impl_parameters(self):
+        if self.__kinds[self.__index] == CLOSE_PARENTHESISE:
+            return self.__reduce(LexAndYacc.p_function_parameters)
+
+        data_type = self.__expect_value(DATA_TYPE_KINDS)
+        parameters = self.__reduce(LexAndYacc.p_function_parameters, data_type, self.__expect_value((NAME,)))
+
+        while self.__kinds[self.__index] == COMMA:
+            self.__index += 1
+
+            data_type = self.__expect_value(DATA_TYPE_KINDS)
+            parameters = self.__reduce(LexAndYacc.p_function_parameters, parameters, None, data_type,
+                                       self.__expect_value((NAME,)))
+
+        return parameters
+
+    def __parse_code_block(self):
+        # like the LALR parser, the first statement is shifted instead of reducing an empty block
+        if self.__kinds[self.__index] == CLOSE_CURLY_BRACKETS:
+            return self.__reduce(LexAndYacc.p_code_block)
+
+        code_block = self.__reduce(LexAndYacc.p_code_block, (yield self.__parse_statement()))
+
+        while self.__kinds[self.__index] != CLOSE_CURLY_BRACKETS:
+            code_block = self.__reduce(LexAndYacc.p_code_block, code_block, (yield self.__parse_statement()))
+
+        return code_block
+
+    def __parse_scope(self):
+        self.__expect(OPEN_CURLY_BRACKETS)
+        code_block = yield self.__parse_code_block()
+        self.__expect(CLOSE_CURLY_BRACKETS)
+
+        return code_block
+
+    def __parse_statement(self):
+        kind = self.__kinds[self.__index]
+
+        if kind == NAME:
+            statement = yield self.__parse_name_statement()
+        elif kind == INT_32_KEYWORD or kind == CHAR_KEYWORD:
+            statement = yield self.__parse_def_var()
+        elif kind == PRINT:
+            statement = yield self.__parse_print_statement()
+        elif kind == RETURN:
+            statement = yield self.__parse_return_statement()
+        elif kind == IF_KEYWORD:
+            return (yield self.__parse_if_statement())
+        elif kind == WHILE_KEYWORD:
+            return (yield self.__parse_while_statement())
+        elif kind == ASSERT:
+            self.__index += 1
+            statement = self.__reduce(LexAndYacc.p_assert_statement, None, (yield self.__parse_condition()))
+        elif kind == PRINT_ARRAY:
+            self.__index += 1
+            statement = self.__reduce(LexAndYacc.p_print_array, None, self.__parse_array_name())
+        elif kind == READ_LINE:
+            statement = self.__parse_read_line_statement()
+        elif kind == EXIT:
+            self.__index += 1
+            statement = self.__reduce(LexAndYacc.p_exit, None, (yield self.__parse_int_expression(0)))
+        else:
+            statement = None
+            self.__error()
+
+        self.__expect(SEMICOLON)
+
+        return statement
+
+    def __parse_name_statement(self):
+        next_kind = self.__kinds[self.__index + 1]
+
+        if next_kind == OPEN_PARENTHESISE:
+            return (yield self.__parse_function_call())
+
+        if next_kind == OPEN_BRACKETS:
+            dest_var = yield self.__parse_array_cell()
+        else:
+            dest_var = self.__parse_var_name()
+
+        self.__expect(EQUALS_OPERATOR)
+
+        return self.__reduce(LexAndYacc.p_int_assignment, dest_var, None, (yield self.__parse_int_expression(0)))
+
+    def __parse_def_var(self):
+        data_type = self.__expect_value(DATA_TYPE_KINDS)
+        new_var_name = self.__expect_value((NAME,))
+
+        kind = self.__kinds[self.__index]
+
+        if kind == OPEN_BRACKETS:
+            self.__index += 1
+            array_len = self.__expect_value(SIMPLE_INT_VALUE_KINDS)
+            self.__expect(CLOSE_BRACKETS)
+
+            return self.__reduce(LexAndYacc.p_def_array, data_type, new_var_name, None, array_len, None)
+
+        if kind == EQUALS_OPERATOR:
+            self.__index += 1
+
+            return self.__reduce(LexAndYacc.p_def_var, data_type, new_var_name, None,
+                                 (yield self.__parse_int_expression(0)))
+
+        return self.__reduce(LexAndYacc.p_def_var, data_type, new_var_name)
+
+    def __parse_print_statement(self):
+        self.__index += 1
+
+        if self.__kinds[self.__index] == STRING:
+            return self.__reduce(LexAndYacc.p_print_string, None, self.__expect_value((STRING,)))
+
+        return self.__reduce(LexAndYacc.p_print_value, None, (yield self.__parse_int_expression(0)))
+
+    def __parse_return_statement(self):
+        self.__index += 1
+
+        return_value = None
+        if self.__kinds[self.__index] != SEMICOLON:
+            return_value = yield self.__parse_int_expression(0)
+
+        return self.__reduce(LexAndYacc.p_return_statement, None, return_value)
+
+    def __parse_read_line_statement(self):
+        self.__index += 1
+
+        array_name = self.__parse_array_name()
+        self.__expect(COMMA)
+        size = self.__expect_value(SIMPLE_INT_VALUE_KINDS)
+
+        return self.__reduce(LexAndYacc.p_read_line_statement, None, array_name, None, size)
+
+    def __parse_if_statement(self):
+        self.__index += 1
+
+        self.__expect(OPEN_PARENTHESISE)
+        condition = yield self.__parse_condition()
+        self.__expect(CLOSE_PARENTHESISE)
+
+        scope = yield self.__parse_scope()
+
+        if self.__kinds[self.__index] != ELSE_KEYWORD:
+            return self.__reduce(LexAndYacc.p_if_statement, None, None, condition, None, scope)
+
+        self.__index += 1
+        else_statement = self.__reduce(LexAndYacc.p_else_statement, None, (yield self.__parse_scope()))
+
+        return self.__reduce(LexAndYacc.p_if_statement, None, None, condition, None, scope, else_statement)
+
+    def __parse_while_statement(self):
+        self.__index += 1
+
+        self.__expect(OPEN_PARENTHESISE)
+        condition = yield self.__parse_condition()
+        self.__expect(CLOSE_PARENTHESISE)
+
+        return self.__reduce(LexAndYacc.p_while_statement, None, None, condition, None,
+                             (yield self.__parse_scope()))
+
+    def __parse_condition(self, condition=None):
+        """
+        The && and || operators have the same precedence and are left associative
+        """
+
+        if condition is None:
+            condition = yield self.__parse_simple_condition()
+
+        while True:
+            action = CONDITION_ACTIONS.get(self.__kinds[self.__index])
+            if action is None:
+                return condition
+
+            self.__index += 1
+            condition = self.__reduce(action, condition, None, (yield self.__parse_simple_condition()))
+
+    def __parse_simple_condition(self):
+        if self.__kinds[self.__index] != OPEN_PARENTHESISE:
+            return (yield self.__parse_comparison((yield self.__parse_int_expression(0))))
+
+        value, is_condition = yield self.__parse_parenthesised()
+        if is_condition:
+            return value
+
+        return (yield self.__parse_comparison((yield self.__parse_int_expression(0, value))))
+
+    def __parse_parenthesised(self):
+        """
+        A parenthesis in a condition opens either a condition or an expression,
+        which is only known after the expression. Returns the value and whether
+        it was a condition.
+        """
+
+        self.__index += 1
+
+        if self.__kinds[self.__index] == OPEN_PARENTHESISE:
+            value, is_condition = yield self.__parse_parenthesised()
+
+            if is_condition:
+                condition = yield self.__parse_condition(value)
+                self.__expect(CLOSE_PARENTHESISE)
+
+                return condition, True
+
+            int_expression = yield self.__parse_int_expression(0, value)
+        else:
+            int_expression = yield self.__parse_int_expression(0)
+
+        if self.__kinds[self.__index] in COMPARISON_ACTIONS:
+            condition = yield self.__parse_condition((yield self.__parse_comparison(int_expression)))
+            self.__expect(CLOSE_PARENTHESISE)
+
+            return condition, True
+
+        self.__expect(CLOSE_PARENTHESISE)
+
+        return int_expression, False
+
+    def __parse_comparison(self, left):
+        action = COMPARISON_ACTIONS.get(self.__kinds[self.__index])
+        if action is None:
+            self.__error()
+
+        self.__index += 1
+
+        return self.__reduce(action, left, None, (yield self.__parse_int_expression(0)))
+
+    def __parse_int_expression(self, min_level, left=None):
+        """
+        Precedence climbing on an explicit stack, an operator binds while its level
+        is at least min_level. The stack keeps the left operands with the operators
+        waiting for their right operand, an operator is reduced once the next one
+        binds less tightly than its right operand, in the order of the recursive
+        version.
+        """
+
+        if left is None:
+            left = self.__parse_operand()
+
+            if type(left) is GeneratorType:
+                left = yield left
+
+        kinds = self.__kinds
+        pending = []
+
+        while True:
+            binary_operator = BINARY_OPERATORS.get(kinds[self.__index])
+
+            while len(pending) != 0 and (binary_operator is None or binary_operator[0] < pending[-1][1][1]):
+                pending_left, (level, right_level, action) = pending.pop()
+                left = self.__reduce(action, pending_left, None, left)
+
+            if binary_operator is None or binary_operator[0] < min_level:
+                return left
+
+            self.__index += 1
+            pending.append((left, binary_operator))
+
+            left = self.__parse_operand()
+
+            if type(left) is GeneratorType:
+                left = yield left
+
+    def __parse_operand(self):
+        """
+        A name or a literal is returned right away, the operands with nested
+        expressions return the generator that parses them, see Traversal.run
+        """
+
+        kind = self.__kinds[self.__index]
+
+        if kind == NAME:
+            next_kind = self.__kinds[self.__index + 1]
+
+            if next_kind == OPEN_PARENTHESISE:
+                return self.__parse_function_call_value()
+
+            if next_kind == OPEN_BRACKETS:
+                return self.__parse_array_cell()
+
+            return self.__parse_var_name()
+
+        if kind == INT_32_VALUE or kind == CHAR_VALUE:
+            value = self.__token_stream.get_value(self.__index)
+            self.__index += 1
+
+            return value
+
+        if kind == OPEN_PARENTHESISE:
+            return self.__parse_parenthesised_expression()
+
+        self.__error()
+
+    def __parse_parenthesised_expression(self):
+        self.__index += 1
+        value = yield self.__parse_int_expression(0)
+        self.__expect(CLOSE_PARENTHESISE)
+
+        return value
+
+    def __parse_function_call_value(self):
+        return self.__reduce(LexAndYacc.p_function_call_value, (yield self.__parse_function_call()))
+
+    def __parse_function_call(self):
+        function_name = self.__expect_value((NAME,))
+
+        self.__expect(OPEN_PARENTHESISE)
+
+        if self.__kinds[self.__index] == CLOSE_PARENTHESISE:
+            parameters = self.__reduce(LexAndYacc.p_function_call_parameters)
+        else:
+            parameters = self.__reduce(LexAndYacc.p_function_call_parameters,
+                                       (yield self.__parse_int_expression(0)))
+
+            while self.__kinds[self.__index] == COMMA:
+                self.__index += 1
+                parameters = self.__reduce(LexAndYacc.p_function_call_parameters, parameters, None,
+                                           (yield self.__parse_int_expression(0)))
+
+        self.__expect(CLOSE_PARENTHESISE)
+
+        return self.__reduce(LexAndYacc.p_function_call, function_name, None, parameters, None)
+
+    def __parse_array_cell(self):
+        array_name = self.__parse_array_name()
+
+        self.__expect(OPEN_BRACKETS)
+        index = yield self.__parse_int_expression(0)
+        self.__expect(CLOSE_BRACKETS)
+
+        return self.__reduce(LexAndYacc.p_array_cell, array_name, None, index, None)
+
+    def __parse_array_name(self):
+        return self.__reduce(LexAndYacc.p_array_name, self.__expect_value((NAME,)))
+
+    def __parse_var_name(self):
+        return self.__reduce(LexAndYacc.p_var_name, self.__expect_value((NAME,)))
@@ -0,0 +1,355 @@
+import Constance
+import DataTypes
+import SymbolTable
+import Utils
+import Traversal
+from AST_Visitor import *
+
+
+class AnalysisContext:
+    def __init__(self, function_index, symbol_table_function):
+        self.__function_index = function_index
+        self.__symbol_table_function = symbol_table_function
+
+    def get_function_index(self):
+        return self.__function_index
+
+    def get_symbol_table_function(self):
+        return self.__symbol_table_function
+
+    def get_current_table(self):
+        return self.__symbol_table_function.get_current_table()
+
+
+class SemanticAnalyzer(AST_Visitor):
+    """
+    Resolves the names of the parsed AST to their symbol table names, fills the
+    symbol tables and checks the types, in the order the grammar actions used to.
+    The prototypes are declared first, after that every function is analyzed on
+    its own and only reads the functions table. A function still only sees the
+    functions declared before it, so it can also be analyzed right after it was
+    declared, before the functions after it are parsed.
+    """
+
+    def __init__(self, compilation_context):
+        self.__functions_table = compilation_context.get_functions_table()
+
+        self.__function_indexes = {}
+
+        # the table names of every function name, with the index of the function that declared it
+        self.__declarations = {}
+
+    def analyze(self, main_AST):
+        self.declare_functions(main_AST)
+
+        for function in main_AST.get_functions():
+            self.analyze_function(function)
+
+        return main_AST
+
+    def declare_functions(self, main_AST):
+        for function in main_AST.get_functions():
+            self.declare_function(function)
+
+    def analyze_function(self, function):
+        # the functions it calls have to be declared already
+        context = AnalysisContext(self.__function_indexes[function], function.get_symbol_table_function())
+        Traversal.run(self.visit(function.get_code_block(), context))
+
+    def declare_function(self, function):
+        declaration = function.get_declaration()
+        function_name = declaration.get_name()
+
+        function_prototype = \
+            SymbolTable.SymbolTableFunctionPrototype(function_name, declaration.get_return_value_type())
+
+        parameters = SymbolTable.FunctionParameters()
+
+        for parameter in declaration.get_parameters():
+            table_name = function_prototype.map_arg_name_to_table_name(parameter.get_name())
+
+            parameters.add_parameter(table_name, SymbolTable.FunctionParameter(table_name,
+                                                                               parameter.get_data_type()))
+
+        function_prototype.set_parameters(parameters)
+
+        function_table_name = \
+            self.__functions_table.map_function_name_to_table_name(function_name)
+
+        symbol_table_function = \
+            SymbolTable.SymbolTableFunction(function_table_name, function_prototype)
+
+        self.__functions_table.add_function(symbol_table_function)
+        function.set_symbol_table_function(symbol_table_function)
+
+        function_index = len(self.__function_indexes)
+        self.__function_indexes[function] = function_index
+
+        self.__declarations.setdefault(function_name, []).append((function_index, function_table_name))
+
+    def __get_function_table_name(self, function_name, context):
+        for function_index, function_table_name in reversed(self.__declarations.get(function_name, [])):
+            if function_index <= context.get_function_index():
+                return function_table_name
+
+        return None
+
+    def __map_new_var_name(self, name, context):
+        current_table = context.get_current_table()
+
+        if current_table.var_exist_in_scope(name):
+            Utils.Utils.handle_compiler_error("Var " + name + " already exist in current scope")
+
+        var_name = \
+            current_table.map_var_name_to_symbol_table_name(name)
+
+        return var_name
+
+    def __resolve_array(self, name, context):
+        current_table = context.get_current_table()
+
+        if not current_table.array_accessible_in_scope(name):
+            Utils.Utils.handle_compiler_error("Array " + name + " dose not exist in current scope")
+
+        var_name = \
+            current_table.get_var_name(name)
+
+        return var_name, current_table.get_array(var_name)
+
+    def __visit_scope(self, code_block, context):
+        symbol_table_function = context.get_symbol_table_function()
+
+        symbol_table_function.push_table()
+        yield self.visit(code_block, context)
+        symbol_table_function.pop_table()
+
+    @visitor(AST.AST_CodeBlock)
+    def visit(self, code_block, context):
+        statements = code_block.get_all_statements()
+
+        # array definitions are dropped and asserts are lowered, so the statements are replaced
+        for index in range(len(statements)):
+            if statements[index] is None:
+                continue
+
+            code_block.set_statement(index, (yield self.visit(statements[index], context)))
+
+        return code_block
+
+    @visitor(AST.AST_Integer)
+    def visit(self, integer, context):
+        return integer
+
+    @visitor(AST.AST_ArrayCell)
+    def visit(self, get_value_from_array, context):
+        yield self.visit(get_value_from_array.get_array_name(), context)
+        yield self.visit(get_value_from_array.get_index(), context)
+
+        return get_value_from_array
+
+    @visitor(AST.AST_Variable)
+    def visit(self, variable, context):
+        current_table = context.get_current_table()
+        source_name = variable.get_source_name()
+
+        if not current_table.var_accessible_in_scope(source_name):
+            Utils.Utils.handle_compiler_error("Var " + source_name + " dose not exist in current scope")
+
+        var_name = \
+            current_table.get_var_name(source_name)
+
+        variable.set_name(var_name)
+        variable.set_data_type(current_table.get_var(var_name).get_data_type())
+
+        return variable
+
+    @visitor(AST.AST_Array)
+    def visit(self, array, context):
+        var_name, symbol_table_array = self.__resolve_array(array.get_source_name(), context)
+
+        array.set_name(var_name)
+        array.set_data_type(symbol_table_array)
+
+        return array
+
+    @visitor(AST.AST_Expression)
+    def visit(self, expression, context):
+        yield self.visit(expression.get_expression_1(), context)
+        yield self.visit(expression.get_expression_2(), context)
+
+        expression.set_data_type(expression.get_expression_1().get_data_type())
+
+        return expression
+
+    @visitor(AST.AST_DefVar)
+    def visit(self, def_var, context):
+        assignment = def_var.get_assignment()
+        var = assignment.get_dest()
+
+        # the name is mapped before the value is resolved, like the parser did
+        var_name = self.__map_new_var_name(def_var.get_name(), context)
+
+        yield self.visit(assignment.get_value(), context)
+
+        context.get_current_table().add_var(var_name, var.get_data_type())
+
+        var.set_name(var_name)
+        def_var.set_name(var_name)
+
+        return def_var
+
+    @visitor(AST.AST_DefArray)
+    def visit(self, def_array, context):
+        var_name = self.__map_new_var_name(def_array.get_name(), context)
+        array_len = def_array.get_size()
+
+        if int(array_len.get_value()) > Constance.MAX_ARRAY_SIZE:
+            Utils.Utils.handle_compiler_error("Try's to define an array of size greater than" + " " +
+                                              str(Constance.MAX_ARRAY_SIZE) + " " + "in line" + " " +
+                                              str(def_array.get_line()))
+
+        data_type = DataTypes.Array(def_array.get_data_type(), int(array_len.get_value()))
+
+        context.get_current_table().add_array(var_name, data_type)
+
+        # the array only lives in the symbol table
+        return None
+
+    @visitor(AST.AST_Assignment)
+    def visit(self, assignment, context):
+        yield self.visit(assignment.get_dest(), context)
+        yield self.visit(assignment.get_value(), context)
+
+        return assignment
+
+    @visitor(AST.AST_IfStatement)
+    def visit(self, if_statement, context):
+        yield self.visit(if_statement.get_condition(), context)
+        yield self.__visit_scope(if_statement.get_then_part(), context)
+
+        if if_statement.get_else_part() is not None:
+            yield self.__visit_scope(if_statement.get_else_part().get_code_block(), context)
+
+        return if_statement
+
+    @visitor(AST.AST_WhileLoopStatement)
+    def visit(self, while_loop_statement, context):
+        yield self.visit(while_loop_statement.get_condition(), context)
+        yield self.__visit_scope(while_loop_statement.get_code_block(), context)
+
+        return while_loop_statement
+
+    @visitor(AST.AST_Condition)
+    def visit(self, condition, context):
+        yield self.visit(condition.get_expression_1(), context)
+        yield self.visit(condition.get_expression_2(), context)
+
+        return condition
+
+    @visitor(AST.AST_ComplexCondition)
+    def visit(self, condition, context):
+        yield self.visit(condition.get_condition_1(), context)
+        yield self.visit(condition.get_condition_2(), context)
+
+        return condition
+
+    @visitor(AST.AST_AssertStatement)
+    def visit(self, assert_statement, context):
+        condition = yield self.visit(assert_statement.get_condition(), context)
+
+        then_part = AST.AST_CodeBlock()
+        else_part = AST.AST_CodeBlock()
+        else_part.add_statement(AST.AST_PrintString("Assertion failed in line " + str(assert_statement.get_line()) +
+                                                    ": " + condition.write()))
+        then_part.add_statement(AST.AST_Exit(AST.AST_Integer(1, DataTypes.int_32())))
+
+        return AST.AST_IfStatement(condition, then_part, else_part)
+
+    @visitor(AST.AST_ReadLine)
+    def visit(self, read_line_statement, context):
+        var_name, symbol_table_array = self.__resolve_array(read_line_statement.get_array_name(), context)
+        read_line_statement.set_array_name(var_name)
+
+        return read_line_statement
+
+    @visitor(AST.AST_Print)
+    def visit(self, print_statement, context):
+        value = yield self.visit(print_statement.get_value(), context)
+        print_statement.set_print_format(value.get_data_type().get_print_format())
+
+        return print_statement
+
+    @visitor(AST.AST_PrintArray)
+    def visit(self, print_array, context):
+        var_name, symbol_table_array = self.__resolve_array(print_array.get_array_name(), context)
+        print_array.set_array_name(var_name)
+
+        return print_array
+
+    @visitor(AST.AST_PrintString)
+    def visit(self, print_statement, context):
+        return print_statement
+
+    @visitor(AST.AST_Exit)
+    def visit(self, exit_statement, context):
+        yield self.visit(exit_statement.get_exit_code(), context)
+
+        return exit_statement
+
+    @visitor(AST.AST_FunctionCall)
+    def visit(self, function_call, context):
+        function_name = function_call.get_name()
+        parameters = function_call.get_parameters()
+
+        for parameter in parameters.get_all_parameters():
+            yield self.visit(parameter, context)
+
+        function_table_name = self.__get_function_table_name(function_name, context)
+
+        if function_table_name is None:
+            Utils.Utils.handle_compiler_error("Function " + function_name + " dose not exist in line" + " " +
+                                              str(function_call.get_line()))
+
+        function_prototype = \
+            self.__functions_table.get_function(function_table_name).get_function_prototype()
+
+        if not parameters.is_matching_function_prototype(function_prototype):
+            Utils.Utils.handle_compiler_error("function call dose not match parameters list in line" + " " +
+                                              str(function_call.get_line()))
+
+        function_call.set_name(function_table_name)
+
+        return function_call
+
+    @visitor(AST.AST_ReturnStatement)
+    def visit(self, return_statement, context):
+        return_value = return_statement.get_value()
+
+        if return_value is not None:
+            yield self.visit(return_value, context)
+
+        current_function_prototype = \
+            context.get_symbol_table_function().get_function_prototype()
+
+        if not current_function_prototype.get_return_value_type().is_compatible_with(return_value):
+            Utils.Utils.handle_compiler_error("Try's to return incompatible value from function" + " " +
+                                              current_function_prototype.get_name() + " " + "in line" + " " +
+                                              str(return_statement.get_line()))
+
+        return return_statement
+
+    @visitor(AST.AST_FunctionCallReturnValue)
+    def visit(self, function_call_return_value, context):
+        function_call = yield self.visit(function_call_return_value.get_function_call(), context)
+
+        function_data_type = self.__functions_table.get_function(function_call.get_name()).\
+            get_function_prototype().get_return_value_type()
+
+        function_call_return_value.set_data_type(function_data_type)
+
+        # a value has to be an int, so calls to void functions can't be used as one
+        if not function_data_type.is_compatible_with(DataTypes.int_32()):
+            Utils.Utils.handle_compiler_error("Values are not compatible at line" + " " +
+                                              str(function_call.get_line()))
+
+        return function_call_return_value
@@ -0,0 +1,91 @@
+import bisect
+import mmap
+import re
+from array import array
+
+NEW_LINE_REGEX = re.compile(b"\n")
+
+
+class SourceBuffer:
+    """
+    The bytes of a source file, memory mapped when read from a file. Tokens
+    keep offsets into the buffer, their text is only decoded when asked for
+    and the line numbers come from an index of the new line offsets that is
+    built on the first lookup, like the columns.
+    """
+
+    def __init__(self, buffer, path=None, mapped_file=None):
+        self.__buffer = buffer
+        self.__path = path
+        self.__mapped_file = mapped_file
+
+        self.__new_line_offsets = None
+
+    @classmethod
+    def from_file(cls, path):
+        file = open(path, "rb")
+
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            file.close()
+            return cls(b"", path)
+
+        return cls(buffer, path, file)
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(text.encode("utf-8"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.__mapped_file is None:
+            return
+
+        self.__buffer.close()
+        self.__mapped_file.close()
+
+        self.__buffer = b""
+        self.__mapped_file = None
+
+    def get_path(self):
+        return self.__path
+
+    def get_buffer(self):
+        return self.__buffer
+
+    def get_size(self):
+        return len(self.__buffer)
+
+    def get_text(self, start=0, end=None):
+        if end is None:
+            end = len(self.__buffer)
+
+        return self.__buffer[start:end].decode("utf-8")
+
+    def __get_new_line_offsets(self):
+        if self.__new_line_offsets is None:
+            self.__new_line_offsets = array("q", (match.start() for match in
+                                                  NEW_LINE_REGEX.finditer(self.__buffer)))
+
+        return self.__new_line_offsets
+
+    def get_line_number(self, offset):
+        return bisect.bisect_left(self.__get_new_line_offsets(), offset) + 1
+
+    def get_column(self, offset):
+        new_line_offsets = self.__get_new_line_offsets()
+        line_index = bisect.bisect_left(new_line_offsets, offset)
+
+        line_start = 0
+        if line_index != 0:
+            line_start = new_line_offsets[line_index - 1] + 1
+
+        column = offset - line_start + 1
+        return column
@@ -34,13 +34,19 @@ class FunctionCallParameters:
     def add_parameter(self, parameter):
         self.__parameters.append(parameter)
 
-    def is_matching_function_parameters_list(self, function_name):
+    def is_matching_function_parameters_list(self, function_name, functions_table):
         function_table_name = \
-            FunctionsTable.get_instance().get_function_table_name(function_name)
+            functions_table.get_function_table_name(function_name)
+
+        if function_table_name is None:
+            return False
 
         function_prototype = \
-            FunctionsTable.get_instance().get_function(function_table_name).get_function_prototype()
+            functions_table.get_function(function_table_name).get_function_prototype()
 
+        return self.is_matching_function_prototype(function_prototype)
+
+    def is_matching_function_prototype(self, function_prototype):
         function_prototype_parameters = \
             function_prototype.get_parameters().get_all_parameters()
 
@@ -58,6 +64,9 @@ class FunctionCallParameters:
     def get_all_parameters(self):
         return self.__parameters
 
+    def set_parameter(self, index, parameter):
+        self.__parameters[index] = parameter
+
 
 class SymbolTableFunctionPrototype:
     def __init__(self, name, return_value_type):
@@ -111,7 +120,7 @@ class SymbolTableFunctionPrototype:
 class SymbolTableFunction:
     def __init__(self, name, prototype):
         self.__name = name
-        self.__current_table = SymbolTable(None)
+        self.__current_table = SymbolTable(None, self)
         self.__prototype = prototype
 
         self.__vars_count = 0
@@ -142,8 +151,8 @@ class SymbolTableFunction:
         return new_var_name
 
     def push_table(self):
-        self.__tables.append(SymbolTable(self.__current_table))
-        self.__all_tables.append(SymbolTable(self.__current_table))
+        self.__tables.append(SymbolTable(self.__current_table, self))
+        self.__all_tables.append(SymbolTable(self.__current_table, self))
 
     def pop_table(self):
         self.__tables.pop()
@@ -159,15 +168,6 @@ class SymbolTableFunction:
 
 
 class FunctionsTable:
-    __instance = None
-
-    @classmethod
-    def get_instance(cls):
-        if cls.__instance is None:
-            cls.__instance = FunctionsTable()
-
-        return cls.__instance
-
     def __init__(self):
         self.__functions = {}
         self.__names = {}
@@ -204,7 +204,7 @@ class FunctionsTable:
         return new_name
 
     def get_function_table_name(self, name):
-        table_name = self.__names[name]
+        table_name = self.__names.get(name)
         return table_name
 
     def get_function(self, name):
@@ -261,7 +261,7 @@ class Array(SymbolTableVar):
 
 
 class SymbolTable:
-    def __init__(self, parent):
+    def __init__(self, parent, function):
         self.__vars = {}
         self.__arrays = {}
 
@@ -269,6 +269,9 @@ class SymbolTable:
 
         self.__parent = parent
 
+        # the SymbolTableFunction that owns this scope
+        self.__function = function
+
     def add_var(self, name, data_type):
         new_var = Var(name, data_type)
         self.__vars[name] = new_var
@@ -324,7 +327,7 @@ class SymbolTable:
         if self.__parent is not None:
             var = self.__parent.get_var(name)
         else:
-            var = FunctionsTable.get_instance().get_current_function().\
+            var = self.__function.\
                 get_function_prototype().get_parameters().get_parameter(name)
 
         return var
@@ -342,7 +345,7 @@ class SymbolTable:
             var_name = \
                 self.__parent.get_var_name(name)
         else:
-            var_name = FunctionsTable.get_instance().get_current_function().\
+            var_name = self.__function.\
                 get_function_prototype().get_parameter_name(name)
 
         return var_name
@@ -358,7 +361,7 @@ class SymbolTable:
 
     def __var_accessible_in_parent_scope(self, name):
         if self.__parent is None:
-            if FunctionsTable.get_instance().get_current_function().get_function_prototype().var_in_parameters(name):
+            if self.__function.get_function_prototype().var_in_parameters(name):
                 return True
 
             return False
@@ -402,8 +405,7 @@ class SymbolTable:
         return self.__arrays.values()
 
     def map_var_name_to_symbol_table_name(self, name):
-        new_name = FunctionsTable.get_instance().\
-            get_current_function().get_new_var_name()
+        new_name = self.__function.get_new_var_name()
 
         self.__old_names[name] = new_name
 
@@ -1,20 +1,81 @@
 import os
 import glob
 
-skip = ("examples\\test_15.u", "")
+import Benchmark
+import Compiler
 
-files = glob.glob("examples\\*.u")
+skip = (os.path.join("examples", "test_15.u"), "")
+
+files = [file for file in glob.glob(os.path.join("examples", "*.u")) if file not in skip]
+
+# the recursive descent parser has to build the same AST and code as yacc,
+# on the examples and on generated programs
+sources = []
 
 for file in files:
-    if file in skip:
-        continue
+    with open(file, "r") as src:
+        sources.append((file, src.read()))
 
-    ret = os.system("python main.py" + " " + "\"" + file + "\"")
+for num_of_functions in (1, 10, 100):
+    sources.append(("generated program of" + " " + str(num_of_functions) + " " + "functions",
+                    Benchmark.generate_program(num_of_functions)))
 
-    if ret != 0:
+for name, code in sources:
+    for emit in (Compiler.EMIT_AST, Compiler.EMIT_ASM):
+        yacc_output = Compiler.compile_source(code, emit, parser=Compiler.PARSER_YACC)
+        rd_output = Compiler.compile_source(code, emit, parser=Compiler.PARSER_RD)
+
+        if yacc_output != rd_output:
+            print("\nthe parsers build a different" + " " + emit + " " + "for" + " " + name)
+            exit(-1)
+
+    # -O0 lowers the functions while parsing, the code has to be the same as the one of the
+    # whole AST at -O0, which the ast dump builds (-O1 folds and deduplicates before the IR)
+    for parser in Compiler.PARSERS:
+        pipeline = Compiler.Pipeline(Compiler.EMIT_ASM, (Compiler.EMIT_AST,), parser=parser, opt_level=0)
+        asm_code = pipeline.run(code).get_artifact(Compiler.STAGE_ASM)
+        direct_asm_code = Compiler.compile_source(code, Compiler.EMIT_ASM, parser=parser, opt_level=0)
+
+        if asm_code != direct_asm_code:
+            print("\n-O0 generates different code for" + " " + name + " " + "with the" + " " + parser + " " + "parser")
+            exit(-1)
+
+# the helpers have the same code, only the first one and main get a proc
+asm_code = Compiler.compile_source(Benchmark.generate_duplicated_program(20), Compiler.EMIT_ASM)
+
+if sum(1 for line in asm_code.splitlines() if " proc " in line) != 2:
+    print("\nthe duplicated functions were not removed")
+    exit(-1)
+
+# the constant expressions are folded, 5 * (6 + 7) is one literal and x * 1 is x
+asm_code = Compiler.compile_source("void main()\n{\n    int_32 x = 5 * (6 + 7);\n    @print x * 1;\n}\n",
+                                  Compiler.EMIT_ASM)
+
+if ",65" not in asm_code or "imul" in asm_code:
+    print("\nthe constant expressions were not folded")
+    exit(-1)
+
+# all the files are compiled in this process so the lexer and
+# the parser tables are built only once. masm32 only runs on windows,
+# elsewhere the files are compiled to assembly and not run
+run_programs = os.name == "nt"
+
+results = Compiler.Compiler(Compiler.EMIT_EXE if run_programs else Compiler.EMIT_ASM).compile_files(files)
+
+for result in results:
+    file = result.get_path()
+
+    if not result.succeeded():
         print("\nerror in file" + " " + file)
+
+        if result.get_error() is not None:
+            print(result.get_error())
+
         exit(-1)
 
+    if not run_programs:
+        continue
+
     ret = os.system(file.rsplit('.u', maxsplit=1)[0] + ".exe")
 
     if ret != 0:
@@ -0,0 +1,128 @@
+import hashlib
+import operator
+import struct
+import sys
+import threading
+from array import array
+
+import Constance
+import LexAndYacc
+
+# magic, format version, big endian flag, number of tokens
+HEADER = struct.Struct("<4sBB2xq")
+MAGIC = b"UTOK"
+FORMAT_VERSION = 2
+
+# the type codes of the kind, start and length columns,
+# the lines are found from the starts in the source
+COLUMN_TYPE_CODES = ("i", "q", "i")
+
+
+def write_token_stream(token_stream):
+    """
+    Serializes the columns of the token stream, the values are not
+    stored since they are built from the source on first use
+    """
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == "big", token_stream.get_num_of_tokens())
+
+    data = b"".join([header] + [column.tobytes() for column in token_stream.get_columns()])
+    return data
+
+
+def read_token_stream(data, source, scanner):
+    """
+    Returns the TokenStream in data, or None when data is not a valid token stream
+    """
+
+    if len(data) < HEADER.size:
+        return None
+
+    magic, format_version, big_endian, num_of_tokens = HEADER.unpack_from(data)
+
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        return None
+
+    columns = [array(type_code) for type_code in COLUMN_TYPE_CODES]
+
+    if len(data) != HEADER.size + num_of_tokens * sum(column.itemsize for column in columns):
+        return None
+
+    offset = HEADER.size
+
+    for column in columns:
+        size = num_of_tokens * column.itemsize
+        column.frombytes(data[offset:offset + size])
+        offset += size
+
+        if big_endian != (sys.byteorder == "big"):
+            column.byteswap()
+
+    kinds, starts, lengths = columns
+
+    # a corrupted entry of the right size still has to name real token types
+    # and stay inside the source
+    if num_of_tokens > 0:
+        if min(kinds) < 0 or max(kinds) >= scanner.get_num_of_kinds():
+            return None
+
+        if min(starts) < 0 or min(lengths) < 0 or \
+                max(map(operator.add, starts, lengths)) > source.get_size():
+            return None
+
+    return LexAndYacc.TokenStream(source, scanner, kinds, starts, lengths)
+
+
+class TokenCache:
+    """
+    Keeps the token streams of the scanned sources in the compile cache,
+    keyed by the source bytes and the version of the lexer
+    """
+
+    def __init__(self, compile_cache):
+        self.__compile_cache = compile_cache
+
+        self.__hits = 0
+        self.__misses = 0
+
+        self.__lock = threading.Lock()
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
+
+    @classmethod
+    def make_key(cls, source):
+        key = hashlib.sha256()
+
+        key.update(b"tokens\0")
+        key.update(Constance.COMPILER_VERSION.encode("utf-8") + b"\0")
+        key.update(LexAndYacc.get_grammar_hash().encode("utf-8") + b"\0")
+        key.update(source.get_buffer())
+
+        return key.hexdigest()
+
+    def load(self, source, scanner):
+        key = self.make_key(source)
+        data = self.__compile_cache.load_tokens(key)
+
+        token_stream = None
+        if data is not None:
+            token_stream = read_token_stream(data, source, scanner)
+
+            # an entry that can't be read is a miss and is dropped, the tokens are stored again
+            if token_stream is None:
+                self.__compile_cache.remove_tokens(key)
+
+        with self.__lock:
+            if token_stream is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+
+        return token_stream
+
+    def store(self, source, token_stream):
+        self.__compile_cache.store_tokens(self.make_key(source), write_token_stream(token_stream))
@@ -0,0 +1,70 @@
+from types import GeneratorType
+
+
+def run(task):
+    """
+    Runs a visit to the end on an explicit stack instead of the Python stack, so
+    the depth of the tree doesn't matter. A visit method that has children is a
+    generator, it yields self.visit(child, context) and is sent back the result
+    of the child. A method without children returns its result like before, and
+    it is sent back right away. The result of the root visit is returned.
+    """
+
+    if type(task) is not GeneratorType:
+        return task
+
+    stack = []
+    value = None
+
+    while True:
+        try:
+            child = task.send(value)
+        except StopIteration as stop:
+            if len(stack) == 0:
+                return stop.value
+
+            value = stop.value
+            task = stack.pop()
+            continue
+
+        if type(child) is GeneratorType:
+            stack.append(task)
+            task = child
+            value = None
+        else:
+            value = child
+
+
+def iter_pre_order(root, get_children):
+    """
+    Yields root and the nodes under it, every node before its children
+    and the children in the order get_children returns them
+    """
+
+    nodes = [root]
+
+    while len(nodes) != 0:
+        node = nodes.pop()
+
+        yield node
+
+        nodes.extend(reversed(get_children(node)))
+
+
+def iter_post_order(root, get_children):
+    """
+    Yields the nodes under root and then root, every node after its children
+    """
+
+    # the node and whether its children were already pushed
+    nodes = [(root, False)]
+
+    while len(nodes) != 0:
+        node, expanded = nodes.pop()
+
+        if expanded:
+            yield node
+            continue
+
+        nodes.append((node, True))
+        nodes.extend((child, False) for child in reversed(get_children(node)))
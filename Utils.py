@@ -1,6 +1,9 @@
+class CompilerError(Exception):
+    pass
+
+
 class Utils:
 
     @classmethod
     def handle_compiler_error(cls, error_msg):
-        print(error_msg)
-        exit(-1)
+        raise CompilerError(error_msg)
@@ -1,7 +1,149 @@
-import sys
+import argparse
+import os
 
+import ASTDump
+import CompileCache
 import Compiler
 
-path = sys.argv[1]
-compiler = Compiler.Compiler(path)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="ucompiler")
+
+    parser.add_argument("paths", nargs="*", metavar="path",
+                        help="source files, directories are searched for .u files")
+    parser.add_argument("--emit", choices=list(Compiler.EMIT_STAGES.keys()), default=Compiler.EMIT_EXE,
+                        help="the artifact to produce, later stages are not run")
+    parser.add_argument("--dump", choices=list(Compiler.DUMP_STAGES.keys()), action="append", default=[],
+                        help="print an intermediate representation, can be given more than once")
+    parser.add_argument("--ast-format", choices=list(ASTDump.DUMP_FORMATS), default=ASTDump.DEFAULT_DUMP_FORMAT,
+                        help="the format of the ast dump, xml or json lines with a record for every node")
+    parser.add_argument("--ast-file", metavar="PATH",
+                        help="stream the ast dump of the source file to PATH instead of printing it")
+    parser.add_argument("--parser", choices=list(Compiler.PARSERS), default=Compiler.PARSER_YACC,
+                        help="the parser front end, rd is the hand written recursive descent parser")
+    parser.add_argument("-O", dest="opt_level", type=int, choices=list(Compiler.OPT_LEVELS),
+                        default=Compiler.DEFAULT_OPT_LEVEL,
+                        help="the optimization level, -O0 lowers every function to IR while parsing "
+                             "instead of building the AST of the whole program")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes, 0 uses all the cores")
+    parser.add_argument("--cache-dir", default=CompileCache.get_default_cache_dir(),
+                        help="where compiled asm and object files are cached")
+    parser.add_argument("--cache-size", type=int, default=CompileCache.DEFAULT_MAX_SIZE_IN_BYTES // (1024 * 1024),
+                        help="the cache size limit in MB, least recently used entries are evicted past it")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always compile, don't read or write the cache")
+    parser.add_argument("--token-cache", action="store_true",
+                        help="also cache the tokens of the sources, for repeated dumps of unchanged files")
+    parser.add_argument("--ast-cache", action="store_true",
+                        help="also cache the analyzed ASTs of the sources, unchanged files skip the lexer and parser")
+    parser.add_argument("--profile", action="store_true",
+                        help="report the time and memory of every stage")
+    parser.add_argument("--profile-format", choices=["table", "json"], default="table",
+                        help="print the profile as a table or as json")
+    parser.add_argument("--serve", metavar="SOCKET",
+                        help="run a compile server on the unix socket instead of compiling")
+    parser.add_argument("--server", metavar="SOCKET", default=os.environ.get("UCOMPILER_SERVER"),
+                        help="forward the compilation to the server on the socket when one is running")
+
+    args = parser.parse_args()
+
+    if not args.paths and args.serve is None:
+        parser.error("no source files were given")
+
+    if args.ast_file is not None and len(args.paths) != 1:
+        parser.error("--ast-file needs exactly one source file")
+
+    return args
+
+
+def main():
+    args = parse_args()
+
+    jobs = args.jobs
+    if jobs == 0:
+        jobs = os.cpu_count()
+
+    cache = None
+    if not args.no_cache:
+        cache = CompileCache.CompileCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+    if args.serve is not None:
+        import CompileServer
+        CompileServer.CompileServer(args.serve, cache, args.token_cache, args.ast_cache).serve_forever()
+        return
+
+    src_files = Compiler.find_source_files(args.paths)
+
+    client = None
+    if args.server is not None:
+        import CompileServer
+        client = CompileServer.CompileClient(args.server)
+
+    profiler = None
+    if args.profile:
+        import Profiler
+        profiler = Profiler.Profiler()
+
+        # the stages have to run in this process to be measured
+        jobs = 1
+        client = None
+
+    ast_file = None
+    if args.ast_file is not None:
+        ast_file = open(args.ast_file, "w", encoding="utf-8")
+
+        # the dump is written by the pipeline of this process
+        client = None
+
+    try:
+        compiler = Compiler.Compiler(args.emit, args.dump, cache, client, profiler, args.token_cache, args.parser,
+                                     args.opt_level, args.ast_cache, args.ast_format, ast_file)
+        results = compiler.compile_files(src_files, jobs)
+    finally:
+        if ast_file is not None:
+            ast_file.close()
+
+    failed = 0
+
+    # the workers of a parallel build have their own caches, so count from the results
+    cache_statistics = CompileCache.CacheStatistics()
+
+    for result in results:
+        if result.get_output():
+            print(result.get_output())
+
+        if result.get_cache_hit() is True:
+            cache_statistics.add_hit()
+        elif result.get_cache_hit() is False:
+            cache_statistics.add_miss()
+
+        if result.succeeded():
+            continue
+
+        failed += 1
+
+        if result.get_error() is not None:
+            if len(results) > 1:
+                print("error in file" + " " + result.get_path() + ": " + result.get_error())
+            else:
+                print(result.get_error())
+
+    if len(results) > 1:
+        print(str(len(results) - failed) + " " + "files compiled," + " " + str(failed) + " " + "failed")
+
+        if cache is not None:
+            print(cache_statistics.write())
+
+    if profiler is not None:
+        if args.profile_format == "json":
+            print(profiler.to_json())
+        else:
+            print(profiler.write_table(), end="")
+
+    if failed != 0:
+        exit(-1)
+
+
+if __name__ == "__main__":
+    main()